@@ -17,23 +17,40 @@ SHIFT_DEFS = {
 PROTECTED_TEACHING = (time(14,0), time(16,30))  # Wednesday
 HANDOVER_BLOCKS = [(time(16,30), time(17,0)), (time(9,0), time(9,30))]
 
-def ewtd_check(daily_records: List[Tuple[datetime, datetime, str]]) -> Dict[str, bool]:
+def duty_periods(daily_records: List[Tuple[datetime, datetime, str]]) -> List[Tuple[datetime, datetime]]:
+    """Merge touching/overlapping records into continuous duty periods (sorted)."""
+    periods: List[Tuple[datetime, datetime]] = []
+    for start, end, _ in sorted(daily_records, key=lambda r: r[0]):
+        if periods and start <= periods[-1][1]:
+            periods[-1] = (periods[-1][0], max(periods[-1][1], end))
+        else:
+            periods.append((start, end))
+    return periods
+
+def ewtd_check(daily_records: List[Tuple[datetime, datetime, str]], min_rest_hours: float = 11.0) -> Dict[str, bool]:
     """Basic EWTD (European Working Time Directive) checks.
-    - duty length <= 24h
-    - daily rest >= 11h within any 24h
-    - weekly rest >= 24h (simplified)
+    - duty length <= 24h (back-to-back records count as one continuous duty)
+    - daily rest >= min_rest_hours between duty periods
+    - weekly rest >= 24h (simplified) — stub
     - average 48h/week (rolling) — stub
     """
     ok = True
     reasons = []
 
-    for start, end, t in daily_records:
+    periods = duty_periods(daily_records)
+    for start, end in periods:
         duration = (end - start).total_seconds() / 3600.0
         if duration > 24.0:
             ok = False
             reasons.append(f"Duty exceeds 24h: {duration:.1f}h")
 
-    # NOTE: Full rest and rolling averages require timeline accumulation — stubbed
+    for (_, prev_end), (next_start, _) in zip(periods, periods[1:]):
+        rest = (next_start - prev_end).total_seconds() / 3600.0
+        if rest < min_rest_hours:
+            ok = False
+            reasons.append(f"Rest below {min_rest_hours:g}h before {next_start:%Y-%m-%d %H:%M}: {rest:.1f}h")
+
+    # NOTE: Weekly rest and rolling averages require longer timeline accumulation — stubbed
     return {"ok": ok, "reasons": reasons}
 
 def fairness_score(assignments: List[Tuple[int, float]]) -> float:
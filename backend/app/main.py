@@ -1,17 +1,24 @@
 # backend/app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import logging
 import time
 from sqlalchemy.exc import OperationalError
 
-from .db import engine, Base, SessionLocal
-from .seed import seed
+from .db import engine, Base, SessionLocal, pool_status
+from .seed import seed, SeedScale
 from . import models  # ensure models are imported so metadata knows all tables
 
 # Import routers from the package (not the removed file!)
-from .routers import posts_router, groups_router
+from .routers import (posts_router, groups_router, stream_router, reports_router, scenarios_router, solve_router,
+                      coverage_router, rota_router, leave_router, preferences_router)
+from .services import changefeed, summaries, partitions
+from . import responses
 
-app = FastAPI(title="NCHD Rostering & Leave System API", version="0.1.0")
+log = logging.getLogger(__name__)
+
+app = FastAPI(title="NCHD Rostering & Leave System API", version="0.1.0",
+              default_response_class=responses.FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,15 +31,35 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip (brotli if installed) for large buffered responses; /stream is streamed and left alone
+responses.install(app)
 
 # Register routes
 app.include_router(posts_router)   # /posts
 app.include_router(groups_router)  # /groups
+app.include_router(stream_router)  # /stream (SSE change feed)
+app.include_router(reports_router)  # /reports
+app.include_router(scenarios_router)  # /scenarios
+app.include_router(solve_router)  # /solve
+app.include_router(coverage_router)  # /coverage (staffing demand + gaps)
+app.include_router(rota_router)  # /rota (range reads)
+app.include_router(leave_router)  # /leave (requests + batch evaluation)
+app.include_router(preferences_router)  # /preferences (solver soft/hard requests)
+
+# publish committed RotaSlot/Post/Group changes to /stream subscribers
+changefeed.install(SessionLocal)
+# keep /reports summary tables in step with rota_slots
+summaries.install(SessionLocal)
 
 @app.get("/health")
 def health():
     return {"ok": True}
 
+@app.get("/health/pool")
+def health_pool():
+    """DB connection-pool occupancy (sampled by the load test)."""
+    return pool_status()
+
 @app.on_event("startup")
 def on_startup():
     # retry for DB readiness (max ~30s)
@@ -45,8 +72,14 @@ def on_startup():
     else:
         Base.metadata.create_all(bind=engine)
 
+    # keep monthly partitions ahead of inserts (no-op until the partitioning migration has run)
+    try:
+        partitions.maintain(engine)
+    except Exception as e:  # never block startup on housekeeping; cron runs it too
+        log.warning("partition maintenance skipped: %s", e)
+
     db = SessionLocal()
     try:
-        seed(db)
+        seed(db, scale=SeedScale.from_env())
     finally:
         db.close()
@@ -1,7 +1,9 @@
 # backend/app/models.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Date, JSON
+from sqlalchemy import (Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Date, JSON, Index,
+                        PrimaryKeyConstraint, UniqueConstraint, func, text)
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.dialects.postgresql import JSONB
+from datetime import timedelta
 
 Base = declarative_base()
 
@@ -14,6 +16,7 @@ class User(Base):
     grade = Column(String)
     site = Column(String)
     active = Column(Boolean, default=True)
+    created_at = Column(DateTime, server_default=func.now())
 
 class Post(Base):
     __tablename__ = "posts"
@@ -28,6 +31,11 @@ class Post(Base):
     core_hours = Column(JSONB, default=dict)   # e.g. {"Mon":[["09:00","17:00"]], ...}
     eligibility = Column(JSONB, default=dict)  # e.g. {"call_policy":{...}}
     notes = Column(String)
+    # legacy post-builder fields (0001/0002); superseded by groups and activities
+    opd_day = Column(String)
+    opd = Column(JSON)
+    teaching = Column(JSON)
+    supervision = Column(JSON)
 
     groups = relationship("Group", secondary="post_groups", back_populates="posts")
 
@@ -55,12 +63,233 @@ class PostGroup(Base):
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
     group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True)
 
+# rota_slots and audits are range-partitioned by month in Postgres (migration 20251019_03,
+# maintained by services/partitions.py). Range queries should bound the partition column
+# on both sides so the planner can prune; no slot is longer than MAX_SLOT_SPAN.
+MAX_SLOT_SPAN = timedelta(days=2)
+
+# Postgres wants the partition column in the primary key, so the table key is (id, <column>);
+# ids stay unique on their own and the ORM identifies rows by id alone (db.get(RotaSlot, id)).
+# SQLite has no partitioning: there `id` is the rowid key (see the shim in app/db.py).
 class RotaSlot(Base):
     __tablename__ = "rota_slots"
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     post_id = Column(Integer, ForeignKey("posts.id"))
-    start = Column(DateTime, nullable=False)
+    start = Column(DateTime, primary_key=True)
     end = Column(DateTime, nullable=False)
     type = Column(String, default="night_call")  # night_call / day / evening / etc.
     labels = Column(JSONB, default=dict)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "start", name="rota_slots_pkey").ddl_if(dialect="postgresql"),
+        Index("ix_rota_slots_user_start", "user_id", "start"),
+        Index("ix_rota_slots_post_start", "post_id", "start"),
+        {"postgresql_partition_by": 'RANGE ("start")'},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+class Audit(Base):
+    __tablename__ = "audits"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    actor_id = Column(Integer, ForeignKey("users.id"))
+    action = Column(String, nullable=False)
+    before = Column(JSON)
+    after = Column(JSON)
+    reason = Column(String)
+    created_at = Column(DateTime, primary_key=True, server_default=func.now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at", name="audits_pkey").ddl_if(dialect="postgresql"),
+        Index("ix_audits_actor_created", "actor_id", "created_at"),
+        {"postgresql_partition_by": 'RANGE ("created_at")'},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+# --- leave (table from 0001_init; batch evaluation in services/leave.py) -------
+LEAVE_STATUSES = ("pending", "approved", "rejected", "cancelled")
+
+class Leave(Base):
+    __tablename__ = "leave"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime, nullable=False)          # exclusive; whole days end at 00:00 the next day
+    type = Column(String, nullable=False, default="annual")   # annual | study | sick | ...
+    reason = Column(String)
+    status = Column(String, default="pending")      # server default stays "approved" for legacy inserts
+    created_at = Column(DateTime, server_default=func.now())  # first-come order for approvals
+
+    __table_args__ = (
+        Index("ix_leave_user_start", "user_id", "start"),
+        Index("ix_leave_status_start", "status", "start"),
+    )
+
+# --- tables from 0001_init, 0002_post_builder and 20240929_01 ---------------------
+# Not used by any service yet; modelled so every schema built from the models (tests,
+# tenant provisioning in app/tenancy.py) has the same tables as the migrated public one.
+class Holiday(Base):
+    __tablename__ = "holidays"
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False, unique=True)
+    name = Column(String, nullable=False)
+    observed = Column(Boolean, server_default=text("true"))
+
+class Teaching(Base):
+    __tablename__ = "teaching"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime, nullable=False)
+    topic = Column(String)
+
+class Supervision(Base):
+    __tablename__ = "supervision"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime, nullable=False)
+    type = Column(String, nullable=False)  # academic | clinical
+
+class Alert(Base):
+    __tablename__ = "alerts"
+    id = Column(Integer, primary_key=True)
+    level = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    actor_id = Column(Integer, ForeignKey("users.id"))
+    slot_id = Column(Integer)  # rota_slots.id; no FK since rota_slots is partitioned (20251019_03)
+    created_at = Column(DateTime, server_default=func.now())
+    resolved_at = Column(DateTime)
+
+class VacancyWindow(Base):
+    __tablename__ = "vacancy_windows"
+    id = Column(Integer, primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date)
+
+class Team(Base):
+    __tablename__ = "teams"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    supervisor_id = Column(Integer, ForeignKey("users.id"))
+
+    __table_args__ = (
+        UniqueConstraint("name", name="uq_team_name"),
+    )
+
+class Contract(Base):
+    __tablename__ = "contracts"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+    team_id = Column(Integer, ForeignKey("teams.id"))
+    start = Column(Date, nullable=False)
+    end = Column(Date)
+
+    __table_args__ = (
+        Index("ix_contracts_user_post_dates", "user_id", "post_id", "start", "end"),
+    )
+
+class TeamMember(Base):
+    __tablename__ = "team_members"
+    id = Column(Integer, primary_key=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    role = Column(String, nullable=False, server_default="nchd")
+
+    __table_args__ = (
+        UniqueConstraint("team_id", "user_id", name="uq_team_user"),
+        Index("ix_team_members_team", "team_id"),
+        Index("ix_team_members_user", "user_id"),
+    )
+
+# --- NCHD preferences (solver soft/hard constraints; see services/preferences.py) --
+class Preference(Base):
+    __tablename__ = "preferences"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    start = Column(String)                          # "HH:MM"; NULL = whole day
+    end = Column(String)                            # may cross midnight
+    kind = Column(String, nullable=False, default="off")   # off | on
+    weight = Column(Float, nullable=False, default=1.0)
+    hard = Column(Boolean, nullable=False, default=False)
+    note = Column(String)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_preferences_user_date", "user_id", "date"),
+    )
+
+# --- minimum staffing (see services/coverage.py) ----------------------------
+class StaffingDemand(Base):
+    __tablename__ = "staffing_demand"
+    id = Column(Integer, primary_key=True, index=True)
+    site = Column(String, index=True)                 # one of site / group_id
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), index=True)
+    weekday = Column(String)                          # "Mon".."Sun"; NULL = every day
+    date = Column(Date)                               # one-off override day; wins over weekday
+    start = Column(String, nullable=False)            # "HH:MM", 15-minute aligned
+    end = Column(String, nullable=False)              # may cross midnight
+    min_staff = Column(Integer, nullable=False, default=1)
+    max_staff = Column(Integer)                       # NULL = no upper bound
+
+# --- tenant registry (public schema only; see app/tenancy.py) ------------------
+class Tenant(Base):
+    __tablename__ = "tenants"
+    id = Column(Integer, primary_key=True)
+    slug = Column(String(40), nullable=False, unique=True)   # X-Tenant header value
+    name = Column(String, nullable=False)
+    schema = Column(String(63), nullable=False, unique=True)  # tenant_<slug>
+    solver_workers = Column(Integer, nullable=False, default=2)   # concurrent solves
+    import_workers = Column(Integer, nullable=False, default=2)   # concurrent bulk writes
+    cache_mb = Column(Integer)                        # NULL = SOLVE_CACHE_MAX_MB
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+# --- what-if scenarios (copy-on-write overlays; see services/scenarios.py) -----
+class Scenario(Base):
+    __tablename__ = "scenarios"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    description = Column(String)
+    created_at = Column(DateTime, server_default=func.now())
+
+    overrides = relationship("ScenarioOverride", back_populates="scenario",
+                             cascade="all, delete-orphan", order_by="ScenarioOverride.id")
+
+class ScenarioOverride(Base):
+    __tablename__ = "scenario_overrides"
+    id = Column(Integer, primary_key=True)
+    scenario_id = Column(Integer, ForeignKey("scenarios.id", ondelete="CASCADE"), nullable=False, index=True)
+    entity = Column(String, nullable=False)   # post | group | post_group | rota_slot
+    entity_id = Column(Integer)               # NULL = new row that only exists in the scenario
+    op = Column(String, nullable=False, default="upsert")  # upsert | delete
+    data = Column(JSON, nullable=False, default=dict)
+    scenario = relationship("Scenario", back_populates="overrides")
+
+# --- reporting summaries (maintained by services/summaries.py) ----------------
+class WeeklySummary(Base):
+    __tablename__ = "summary_weekly"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    week_start = Column(Date, primary_key=True)      # Monday
+    hours = Column(Float, nullable=False, default=0.0)
+    slots = Column(Integer, nullable=False, default=0)
+    ewtd_breaches = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_summary_weekly_week", "week_start"),
+    )
+
+class MonthlyCallSummary(Base):
+    __tablename__ = "summary_monthly_calls"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)           # first day of month
+    type = Column(String, primary_key=True)          # RotaSlot.type
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_summary_monthly_calls_month", "month"),
+    )
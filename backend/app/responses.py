@@ -0,0 +1,178 @@
+# backend/app/responses.py
+"""
+Fast response encoding for large payloads (month previews, solves, coverage).
+
+FastAPI's default path runs every returned dict through `jsonable_encoder`
+(and response_model validation) before `json.dumps`; for payloads with
+thousands of windows that dominates the request. Routes that return big
+payloads call `respond(request, content)` instead, which hands the content
+straight to orjson (stdlib json if orjson is missing), or to MessagePack
+when the client sends `Accept: application/msgpack` and msgpack is
+installed.
+
+`SCHEMAS` lists the fields emitted for ORM rows and solver windows, so a
+route may return those objects as-is and skip building dicts by hand.
+`CompressionMiddleware` compresses buffered responses above a size
+threshold (brotli if available and accepted, else gzip); streamed
+responses such as /stream pass through untouched.
+"""
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import json
+import os
+from datetime import date, datetime, time
+from operator import attrgetter
+from typing import Any, Dict, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import models
+from .solver.interfaces import DatedWindow
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional wire format
+    msgpack = None
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional codec
+    brotli = None
+
+MSGPACK = "application/msgpack"
+
+# --- schemas ------------------------------------------------------------------
+SCHEMAS: Dict[type, Tuple[str, ...]] = {
+    models.Post: ("id", "title", "site", "grade", "fte", "status", "core_hours", "eligibility", "notes"),
+    models.Group: ("id", "name", "kind", "rules"),
+    models.RotaSlot: ("id", "user_id", "post_id", "start", "end", "type", "labels"),
+    DatedWindow: ("date", "start", "end", "tags", "source"),
+}
+_GETTERS = {cls: (fields, attrgetter(*fields)) for cls, fields in SCHEMAS.items()}
+
+
+def _row(obj: Any) -> Dict[str, Any] | None:
+    spec = _GETTERS.get(type(obj))
+    if spec is None:
+        return None
+    fields, get = spec
+    return dict(zip(fields, get(obj)))
+
+
+def _default(obj: Any) -> Any:
+    row = _row(obj)
+    if row is not None:
+        return row
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj):
+        return vars(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serialisable")
+
+
+# --- encoders -----------------------------------------------------------------
+# dataclasses go through _default too, so SCHEMAS decides their fields
+_ORJSON_OPTS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=_default, use_bin_type=True, datetime=False)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+def wants_msgpack(request: Request) -> bool:
+    return msgpack is not None and MSGPACK in request.headers.get("accept", "")
+
+
+def respond(request: Request, content: Any, status_code: int = 200) -> Response:
+    """JSON or MessagePack per the Accept header, bypassing jsonable_encoder."""
+    cls = MsgPackResponse if wants_msgpack(request) else FastJSONResponse
+    resp = cls(content, status_code=status_code)
+    resp.headers["Vary"] = "Accept"
+    return resp
+
+
+# --- compression --------------------------------------------------------------
+COMPRESSIBLE = ("application/json", MSGPACK, "text/")
+
+
+class CompressionMiddleware:
+    """gzip/brotli for single-chunk responses of at least `minimum_size` bytes."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        coding = "br" if brotli is not None and "br" in accept else "gzip" if "gzip" in accept else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def wrapped(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # hold until we know whether the body is a single chunk
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            held, start = start, None
+            headers = MutableHeaders(raw=list(held["headers"]))
+            body = message.get("body", b"")
+            if (message.get("more_body") or len(body) < self.minimum_size or "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(COMPRESSIBLE)):
+                await send(held)
+                await send(message)
+                return
+            if coding == "br":
+                body = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                body = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            held["headers"] = headers.raw
+            await send(held)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, wrapped)
+
+
+def install(app) -> None:
+    app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get("COMPRESS_MIN_BYTES", "1024")))
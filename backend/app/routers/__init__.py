@@ -2,5 +2,15 @@
 
 from .api import router as posts_router      # /posts
 from .groups import router as groups_router  # /groups
+from .stream import router as stream_router  # /stream
+from .reports import router as reports_router  # /reports
+from .scenarios import router as scenarios_router  # /scenarios
+from .solve import router as solve_router  # /solve
+from .coverage import router as coverage_router  # /coverage
+from .rota import router as rota_router  # /rota
+from .leave import router as leave_router  # /leave
+from .preferences import router as preferences_router  # /preferences
 
-__all__ = ["posts_router", "groups_router"]
+__all__ = ["posts_router", "groups_router", "stream_router", "reports_router", "scenarios_router", "solve_router",
+           "coverage_router", "rota_router", "leave_router",
+           "preferences_router"]
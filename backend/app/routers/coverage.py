@@ -0,0 +1,94 @@
+# backend/app/routers/coverage.py
+import re
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+
+from ..db import get_db
+from .. import models
+from ..responses import respond
+from ..services import coverage
+from ..solver.rules import RuleError, WEEKDAYS
+
+router = APIRouter(prefix="/coverage", tags=["coverage"])
+
+_HHMM = re.compile(r"^([01]\d|2[0-3]):(00|15|30|45)$")
+
+def _demand_to_dict(d: models.StaffingDemand) -> Dict[str, Any]:
+    return {
+        "id": d.id, "site": d.site, "group_id": d.group_id, "weekday": d.weekday,
+        "date": d.date.isoformat() if d.date else None,
+        "start": d.start, "end": d.end, "min_staff": d.min_staff, "max_staff": d.max_staff,
+    }
+
+@router.get("/demand", response_model=List[Dict[str, Any]])
+def list_demand(site: Optional[str] = Query(None), group_id: Optional[int] = Query(None),
+                db: Session = Depends(get_db)):
+    q = db.query(models.StaffingDemand)
+    if site:
+        q = q.filter(models.StaffingDemand.site == site)
+    if group_id is not None:
+        q = q.filter(models.StaffingDemand.group_id == group_id)
+    return [_demand_to_dict(d) for d in q.order_by(models.StaffingDemand.id).all()]
+
+@router.post("/demand", response_model=Dict[str, Any])
+def create_demand(payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """
+    {"site": "Newcastle" | "group_id": 3, "weekday": "Mon"? | "date": "2025-02-14"?,
+     "start": "09:00", "end": "17:00", "min_staff": 2, "max_staff": 4?}
+    Times are 15-minute aligned; end <= start means the window runs past midnight.
+    """
+    site, group_id = payload.get("site"), payload.get("group_id")
+    if bool(site) == (group_id is not None):
+        raise HTTPException(status_code=422, detail="exactly one of site or group_id is required")
+    if group_id is not None and not db.get(models.Group, group_id):
+        raise HTTPException(status_code=404, detail="Group not found")
+    for k in ("start", "end"):
+        if not isinstance(payload.get(k), str) or not _HHMM.match(payload[k]):
+            raise HTTPException(status_code=422, detail=f"{k} must be HH:MM on a 15-minute boundary")
+    weekday = payload.get("weekday")
+    if weekday is not None and weekday not in WEEKDAYS:
+        raise HTTPException(status_code=422, detail=f"weekday must be one of {list(WEEKDAYS)}")
+    try:
+        day = date.fromisoformat(payload["date"]) if payload.get("date") else None
+        min_staff = int(payload.get("min_staff", 1))
+        max_staff = int(payload["max_staff"]) if payload.get("max_staff") is not None else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="invalid date, min_staff or max_staff")
+    if min_staff < 0 or (max_staff is not None and max_staff < min_staff):
+        raise HTTPException(status_code=422, detail="need 0 <= min_staff <= max_staff")
+
+    d = models.StaffingDemand(site=site, group_id=group_id, weekday=weekday, date=day,
+                              start=payload["start"], end=payload["end"],
+                              min_staff=min_staff, max_staff=max_staff)
+    db.add(d)
+    db.commit()
+    db.refresh(d)
+    return _demand_to_dict(d)
+
+@router.delete("/demand/{demand_id}")
+def delete_demand(demand_id: int, db: Session = Depends(get_db)):
+    d = db.get(models.StaffingDemand, demand_id)
+    if not d:
+        raise HTTPException(status_code=404, detail="Demand not found")
+    db.delete(d)
+    db.commit()
+    return {"ok": True}
+
+@router.get("/gaps")
+def gaps(request: Request, month: int = Query(..., ge=1, le=12), year: int = Query(...),
+         site: Optional[str] = Query(None), group_id: Optional[int] = Query(None),
+         db: Session = Depends(get_db)):
+    """Every under-/over-staffed interval of the month (15-minute resolution), per site and group."""
+    try:
+        cov = coverage.compute(db, month, year)
+    except RuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    out = cov.gaps(site=site, group_id=group_id)
+    return respond(request, {
+        "month": f"{year:04d}-{month:02d}",
+        "under": sum(1 for g in out if g["kind"] == "under"),
+        "over": sum(1 for g in out if g["kind"] == "over"),
+        "gaps": out,
+    })
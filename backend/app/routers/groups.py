@@ -5,9 +5,18 @@ from typing import Any, Dict, List
 
 from ..db import get_db
 from .. import models
+from ..solver.rules import compile_rules, RuleError
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
+def _validated_rules(rules: Any) -> Dict[str, Any]:
+    rules = rules or {}
+    try:
+        compile_rules(rules)
+    except RuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return rules
+
 def _group_to_dict(g: models.Group) -> Dict[str, Any]:
     return {
         "id": g.id,
@@ -26,7 +35,7 @@ def create_group(payload: Dict[str, Any], db: Session = Depends(get_db)):
     g = models.Group(
         name=payload.get("name", "Untitled Group"),
         kind=payload.get("kind", "generic"),
-        rules=payload.get("rules") or {},
+        rules=_validated_rules(payload.get("rules")),
     )
     db.add(g); db.commit(); db.refresh(g)
     return _group_to_dict(g)
@@ -36,6 +45,8 @@ def update_group(group_id: int, payload: Dict[str, Any], db: Session = Depends(g
     g = db.query(models.Group).get(group_id)
     if not g:
         raise HTTPException(status_code=404, detail="Group not found")
+    if "rules" in payload:
+        payload = {**payload, "rules": _validated_rules(payload["rules"])}
     for k in ["name", "kind", "rules"]:
         if k in payload:
             setattr(g, k, payload[k])
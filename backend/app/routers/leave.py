@@ -0,0 +1,122 @@
+# backend/app/routers/leave.py
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+
+from ..db import get_db
+from .. import models, tenancy
+from ..responses import respond
+from ..services import leave
+from ..solver.rules import RuleError
+
+router = APIRouter(prefix="/leave", tags=["leave"])
+
+def _leave_to_dict(lv: models.Leave) -> Dict[str, Any]:
+    return {
+        "id": lv.id, "user_id": lv.user_id, "start": lv.start.isoformat(), "end": lv.end.isoformat(),
+        "type": lv.type, "reason": lv.reason, "status": lv.status,
+        "created_at": lv.created_at.isoformat() if lv.created_at else None,
+    }
+
+def _bound(value: Any, is_end: bool) -> datetime:
+    """ISO datetime as-is; a plain ISO date means the whole day (end dates are inclusive)."""
+    text = str(value)
+    if len(text) == 10:
+        d = date.fromisoformat(text)
+        return datetime.combine(d + timedelta(days=1) if is_end else d, time.min)
+    return datetime.fromisoformat(text)
+
+def _new_leave(payload: Dict[str, Any], users: set) -> models.Leave:
+    try:
+        user_id = int(payload["user_id"])
+        start, end = _bound(payload["start"], False), _bound(payload.get("end") or payload["start"], True)
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="user_id, start and end (ISO date or datetime) are required")
+    if user_id not in users:
+        raise HTTPException(status_code=404, detail=f"User {user_id} not found")
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    return models.Leave(user_id=user_id, start=start, end=end, type=payload.get("type") or "annual",
+                        reason=payload.get("reason"), status="pending")
+
+@router.get("", response_model=List[Dict[str, Any]])
+def list_leave(
+    status: Optional[str] = Query(None),
+    user_id: Optional[int] = Query(None),
+    start: Optional[date] = Query(None, description="overlapping this day or later"),
+    end: Optional[date] = Query(None, description="overlapping this day or earlier"),
+    db: Session = Depends(get_db),
+):
+    L = models.Leave
+    q = db.query(L)
+    if status:
+        q = q.filter(L.status == status)
+    if user_id is not None:
+        q = q.filter(L.user_id == user_id)
+    if start:
+        q = q.filter(L.end > datetime.combine(start, time.min))
+    if end:
+        q = q.filter(L.start < datetime.combine(end + timedelta(days=1), time.min))
+    return [_leave_to_dict(lv) for lv in q.order_by(L.start, L.id).all()]
+
+@router.post("", response_model=Dict[str, Any])
+def request_leave(payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """{"user_id": 3, "start": "2025-07-07", "end": "2025-07-11", "type": "annual"?, "reason": ".."?}"""
+    users = {u.id for u in db.query(models.User.id).filter(models.User.id == payload.get("user_id"))}
+    lv = _new_leave(payload, users)
+    db.add(lv)
+    db.commit()
+    db.refresh(lv)
+    return _leave_to_dict(lv)
+
+@router.post("/bulk", response_model=Dict[str, Any])
+def request_leave_bulk(payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """{"requests": [{...same shape as POST /leave...}, ...]} — all or nothing."""
+    items = payload.get("requests")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=422, detail="requests must be a non-empty list")
+    with tenancy.quotas.slot(tenancy.current(db), "import"):
+        users = {u.id for u in db.query(models.User.id)}
+        rows = [_new_leave(p, users) for p in items]
+        db.add_all(rows)
+        db.commit()
+    return {"ok": True, "ids": [lv.id for lv in rows]}
+
+@router.post("/evaluate")
+def evaluate(request: Request, payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """
+    Judge pending requests together: {"ids": [..]? | "start": "2025-07-01"?, "end": "2025-08-31"?,
+    "policy": "fifo" | "max_approvals"?, "apply": false?}. With apply, requests admitted outright are approved.
+    """
+    try:
+        start = date.fromisoformat(payload["start"]) if payload.get("start") else None
+        end = date.fromisoformat(payload["end"]) if payload.get("end") else None
+        ids = [int(i) for i in payload.get("ids") or []]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="ids must be integers; start/end ISO dates")
+    policy = payload.get("policy") or "fifo"
+    if policy not in leave.POLICIES:
+        raise HTTPException(status_code=422, detail=f"policy must be one of {list(leave.POLICIES)}")
+    try:
+        with tenancy.quotas.slot(tenancy.current(db), "solve"):
+            result = leave.evaluate(db, ids=ids or None, start=start, end=end, policy=policy)
+            if payload.get("apply"):
+                result["approved"] = leave.apply(db, result)
+    except RuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return respond(request, result)
+
+@router.post("/{leave_id}/decision", response_model=Dict[str, Any])
+def decide(leave_id: int, payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """{"status": "approved" | "rejected" | "cancelled"}"""
+    lv = db.get(models.Leave, leave_id)
+    if not lv:
+        raise HTTPException(status_code=404, detail="Leave request not found")
+    status = payload.get("status")
+    if status not in models.LEAVE_STATUSES or status == "pending":
+        raise HTTPException(status_code=422, detail="status must be approved, rejected or cancelled")
+    lv.status = status
+    db.commit()
+    db.refresh(lv)
+    return _leave_to_dict(lv)
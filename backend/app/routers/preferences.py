@@ -0,0 +1,101 @@
+# backend/app/routers/preferences.py
+import re
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+
+from ..db import get_db
+from .. import models, tenancy
+from ..services import preferences
+
+router = APIRouter(prefix="/preferences", tags=["preferences"])
+
+_HHMM = re.compile(r"^([01]\d|2[0-3]):[0-5]\d$")
+
+def _preference_to_dict(p: models.Preference) -> Dict[str, Any]:
+    return {
+        "id": p.id, "user_id": p.user_id, "date": p.date.isoformat(), "start": p.start, "end": p.end,
+        "kind": p.kind, "weight": p.weight, "hard": p.hard, "note": p.note,
+    }
+
+def _validated(payload: Dict[str, Any], users: set) -> Dict[str, Any]:
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="each preference must be an object")
+    try:
+        row = {
+            "user_id": int(payload["user_id"]),
+            "date": date.fromisoformat(str(payload["date"])),
+            "start": payload.get("start"), "end": payload.get("end"),
+            "kind": payload.get("kind") or "off",
+            "weight": float(payload.get("weight", 1.0)),
+            "hard": payload.get("hard", False),
+            "note": payload.get("note"),
+        }
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="user_id and date (ISO) are required; weight is a number")
+    if row["user_id"] not in users:
+        raise HTTPException(status_code=404, detail=f"User {row['user_id']} not found")
+    if row["kind"] not in preferences.KINDS:
+        raise HTTPException(status_code=422, detail=f"kind must be one of {list(preferences.KINDS)}")
+    if not isinstance(row["hard"], bool):
+        raise HTTPException(status_code=422, detail="hard must be true or false")
+    if row["weight"] < 0:
+        raise HTTPException(status_code=422, detail="weight must be >= 0 (kind says on/off)")
+    if (row["start"] is None) != (row["end"] is None):
+        raise HTTPException(status_code=422, detail="give both start and end, or neither for the whole day")
+    for k in ("start", "end"):
+        if row[k] is not None and not _HHMM.match(str(row[k])):
+            raise HTTPException(status_code=422, detail=f"{k} must be HH:MM")
+    return row
+
+@router.get("", response_model=List[Dict[str, Any]])
+def list_preferences(
+    user_id: Optional[int] = Query(None),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+):
+    P = models.Preference
+    q = db.query(P)
+    if user_id is not None:
+        q = q.filter(P.user_id == user_id)
+    if start:
+        q = q.filter(P.date >= start)
+    if end:
+        q = q.filter(P.date <= end)
+    return [_preference_to_dict(p) for p in q.order_by(P.user_id, P.date, P.id).all()]
+
+@router.post("", response_model=Dict[str, Any])
+def add_preferences(payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """
+    One preference, or {"items": [...]} for a rotation's worth at once (single bulk insert):
+    {"user_id": 3, "date": "2025-02-14", "kind": "off" | "on", "start": "17:00"?, "end": "09:00"?,
+     "weight": 2.0?, "hard": false?, "note": ".."?}
+    """
+    items = payload["items"] if isinstance(payload.get("items"), list) else [payload]
+    if not items:
+        raise HTTPException(status_code=422, detail="items must not be empty")
+    ids = {int(i["user_id"]) for i in items if isinstance(i, dict) and str(i.get("user_id", "")).isdigit()}
+    users = {u.id for u in db.query(models.User.id).filter(models.User.id.in_(ids))}
+    rows = [_validated(i, users) for i in items]
+    if len(rows) == 1 and "items" not in payload:
+        p = models.Preference(**rows[0])
+        db.add(p)
+        db.commit()
+        db.refresh(p)
+        return _preference_to_dict(p)
+    with tenancy.quotas.slot(tenancy.current(db), "import"):
+        db.execute(insert(models.Preference), rows)
+        db.commit()
+    return {"ok": True, "created": len(rows)}
+
+@router.delete("/{preference_id}", response_model=Dict[str, bool])
+def delete_preference(preference_id: int, db: Session = Depends(get_db)):
+    p = db.get(models.Preference, preference_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Preference not found")
+    db.delete(p)
+    db.commit()
+    return {"ok": True}
@@ -0,0 +1,126 @@
+# backend/app/routers/reports.py
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from typing import Any, Dict, List, Optional
+
+from ..db import get_db
+from .. import models, tenancy
+from ..services import compliance, summaries
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+# Every endpoint here reads the maintained summary tables only; nothing scans rota_slots
+# except /compliance.csv, which streams through them with bounded memory.
+
+def _period(start: Optional[date], end: Optional[date]):
+    if start and end and end < start:
+        raise HTTPException(status_code=422, detail="end must not be before start")
+    return start, end
+
+@router.get("/weekly-hours", response_model=List[Dict[str, Any]])
+def weekly_hours(
+    start: Optional[date] = Query(None, description="first week included (any day in it)"),
+    end: Optional[date] = Query(None, description="last week included (any day in it)"),
+    user_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+):
+    start, end = _period(start, end)
+    q = db.query(models.WeeklySummary)
+    if start:
+        q = q.filter(models.WeeklySummary.week_start >= summaries.week_start(start))
+    if end:
+        q = q.filter(models.WeeklySummary.week_start <= summaries.week_start(end))
+    if user_id is not None:
+        q = q.filter(models.WeeklySummary.user_id == user_id)
+    rows = q.order_by(models.WeeklySummary.week_start, models.WeeklySummary.user_id).all()
+    return [
+        {"user_id": r.user_id, "week_start": r.week_start.isoformat(), "hours": r.hours,
+         "slots": r.slots, "ewtd_breaches": r.ewtd_breaches}
+        for r in rows
+    ]
+
+@router.get("/calls", response_model=List[Dict[str, Any]])
+def call_counts(
+    start: Optional[date] = Query(None, description="first month included (any day in it)"),
+    end: Optional[date] = Query(None, description="last month included (any day in it)"),
+    user_id: Optional[int] = Query(None),
+    type: Optional[str] = Query(None, description="RotaSlot.type, e.g. night_call"),
+    db: Session = Depends(get_db),
+):
+    start, end = _period(start, end)
+    q = db.query(models.MonthlyCallSummary)
+    if start:
+        q = q.filter(models.MonthlyCallSummary.month >= summaries.month_start(start))
+    if end:
+        q = q.filter(models.MonthlyCallSummary.month <= summaries.month_start(end))
+    if user_id is not None:
+        q = q.filter(models.MonthlyCallSummary.user_id == user_id)
+    if type:
+        q = q.filter(models.MonthlyCallSummary.type == type)
+    rows = q.order_by(models.MonthlyCallSummary.month, models.MonthlyCallSummary.user_id).all()
+    return [
+        {"user_id": r.user_id, "month": r.month.isoformat()[:7], "type": r.type, "count": r.count}
+        for r in rows
+    ]
+
+@router.get("/breaches", response_model=List[Dict[str, Any]])
+def breach_counts(
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """EWTD breach totals per user over the period (users with none are omitted)."""
+    start, end = _period(start, end)
+    S = models.WeeklySummary
+    q = db.query(S.user_id, func.sum(S.ewtd_breaches), func.count(), func.max(S.hours)) \
+        .filter(S.ewtd_breaches > 0)
+    if start:
+        q = q.filter(S.week_start >= summaries.week_start(start))
+    if end:
+        q = q.filter(S.week_start <= summaries.week_start(end))
+    rows = q.group_by(S.user_id).order_by(func.sum(S.ewtd_breaches).desc()).all()
+    return [
+        {"user_id": uid, "breaches": int(total), "weeks_with_breaches": weeks, "max_week_hours": peak}
+        for uid, total, weeks, peak in rows
+    ]
+
+@router.post("/rebuild", response_model=Dict[str, Any])
+def rebuild(since: Optional[date] = Query(None), db: Session = Depends(get_db)):
+    """Backfill summaries from rota_slots (initial deploy or after out-of-band SQL edits)."""
+    with tenancy.quotas.slot(tenancy.current(db), "import"):
+        return {"ok": True, **summaries.rebuild_all(db, since=since)}
+
+@router.get("/compliance.csv")
+def compliance_csv(
+    request: Request,
+    start: date = Query(...),
+    end: date = Query(..., description="inclusive; rounded out to whole weeks"),
+    kind: str = Query("findings", pattern="^(findings|weeks)$"),
+    user_id: Optional[int] = Query(None),
+):
+    """
+    EWTD / HSE audit (services/compliance.py) streamed as CSV while it runs: one row per breach,
+    or per user-week. Multi-year reports for inspectors: `python -m app.services.compliance`
+    (parallel workers, resumable). Holds one of the tenant's solver_workers slots while it streams
+    (429 up front when they are all busy).
+    """
+    start, end = _period(start, end)
+    tenant = tenancy.resolve(request)
+    release = tenancy.quotas.acquire(tenant, "solve")
+
+    def body():
+        try:
+            yield from compliance.stream_csv(tenant, start, end, kind=kind, user_id=user_id)
+        finally:
+            release()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="compliance-{kind}-{start}-{end}.csv"'},
+        background=BackgroundTask(release),  # also frees the slot if the client leaves before the first row
+    )
@@ -0,0 +1,40 @@
+# backend/app/routers/rota.py
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..db import get_db
+from .. import models
+from ..responses import respond
+
+router = APIRouter(prefix="/rota", tags=["rota"])
+
+MAX_RANGE_DAYS = 93
+
+@router.get("")
+def rota_range(
+    request: Request,
+    start: date = Query(..., description="first day included"),
+    end: date = Query(..., description="last day included"),
+    post_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    site: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Rota slots overlapping [start, end] (dashboard calendar reads); at most ~3 months per call."""
+    if end < start:
+        raise HTTPException(status_code=422, detail="end must not be before start")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=422, detail=f"range is limited to {MAX_RANGE_DAYS} days")
+    lo, hi = datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+    S = models.RotaSlot
+    # lower bound on start lets Postgres prune partitions and use the (post_id|user_id, start) indexes
+    q = db.query(S).filter(S.start >= lo - models.MAX_SLOT_SPAN, S.start < hi, S.end > lo)
+    if post_id is not None:
+        q = q.filter(S.post_id == post_id)
+    if user_id is not None:
+        q = q.filter(S.user_id == user_id)
+    if site:
+        q = q.join(models.Post, models.Post.id == S.post_id).filter(models.Post.site == site)
+    return respond(request, q.order_by(S.start, S.id).all())
@@ -0,0 +1,101 @@
+# backend/app/routers/scenarios.py
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+
+from ..db import get_db
+from .. import models, tenancy
+from ..responses import respond
+from ..services import scenarios
+from ..solver.rules import RuleError
+
+router = APIRouter(prefix="/scenarios", tags=["scenarios"])
+
+def _override_to_dict(o: models.ScenarioOverride) -> Dict[str, Any]:
+    return {"id": o.id, "entity": o.entity, "entity_id": o.entity_id, "op": o.op, "data": o.data or {}}
+
+def _scenario_to_dict(s: models.Scenario) -> Dict[str, Any]:
+    return {
+        "id": s.id,
+        "name": s.name,
+        "description": s.description,
+        "created_at": s.created_at.isoformat() if s.created_at else None,
+        "overrides": [_override_to_dict(o) for o in s.overrides],
+    }
+
+def _get(db: Session, scenario_id: int) -> models.Scenario:
+    s = db.get(models.Scenario, scenario_id)
+    if not s:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return s
+
+@router.get("", response_model=List[Dict[str, Any]])
+def list_scenarios(db: Session = Depends(get_db)):
+    return [_scenario_to_dict(s) for s in db.query(models.Scenario).order_by(models.Scenario.id).all()]
+
+@router.post("", response_model=Dict[str, Any])
+def create_scenario(payload: Dict[str, Any], db: Session = Depends(get_db)):
+    s = models.Scenario(name=payload.get("name", "Untitled Scenario"), description=payload.get("description"))
+    db.add(s); db.commit(); db.refresh(s)
+    return _scenario_to_dict(s)
+
+@router.delete("/{scenario_id}", response_model=Dict[str, bool])
+def delete_scenario(scenario_id: int, db: Session = Depends(get_db)):
+    db.delete(_get(db, scenario_id)); db.commit()
+    return {"ok": True}
+
+@router.post("/{scenario_id}/overrides", response_model=Dict[str, Any])
+def add_override(scenario_id: int, payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """
+    e.g. post X goes vacant:   {"entity":"post","entity_id":X,"data":{"status":"VACANT_UNROSTERABLE"}}
+         night cap of 6:       {"entity":"group","entity_id":G,"data":{"rules":{...,"cap_per_month":6}}}
+    """
+    s = _get(db, scenario_id)
+    entity, op = payload.get("entity"), payload.get("op", "upsert")
+    if entity not in scenarios.ENTITIES:
+        raise HTTPException(status_code=422, detail=f"entity must be one of {list(scenarios.ENTITIES)}")
+    if op not in scenarios.OPS:
+        raise HTTPException(status_code=422, detail=f"op must be one of {list(scenarios.OPS)}")
+    data = payload.get("data")
+    data = {} if data is None else data
+    try:
+        scenarios.check_override(entity, op, payload.get("entity_id"), data)
+    except ValueError as e:  # RuleError included
+        raise HTTPException(status_code=422, detail=str(e))
+    model = {"post": models.Post, "group": models.Group, "rota_slot": models.RotaSlot}.get(entity)
+    if model is not None and payload.get("entity_id") is not None and not db.get(model, payload["entity_id"]):
+        raise HTTPException(status_code=404, detail=f"{entity} {payload['entity_id']} not found")
+    o = models.ScenarioOverride(scenario_id=s.id, entity=entity, entity_id=payload.get("entity_id"), op=op, data=data)
+    db.add(o); db.commit(); db.refresh(o)
+    return _override_to_dict(o)
+
+@router.delete("/{scenario_id}/overrides/{override_id}", response_model=Dict[str, bool])
+def delete_override(scenario_id: int, override_id: int, db: Session = Depends(get_db)):
+    o = db.get(models.ScenarioOverride, override_id)
+    if not o or o.scenario_id != scenario_id:
+        raise HTTPException(status_code=404, detail="Override not found")
+    db.delete(o); db.commit()
+    return {"ok": True}
+
+@router.post("/compare", response_model=List[Dict[str, Any]])
+def compare_scenarios(request: Request, payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """
+    {"scenario_ids": [null, 3, 4], "month": 2, "year": 2025, "post_ids": [..]?}
+    null stands for the live roster. Scenarios are solved in parallel, on at most the
+    tenant's solver_workers processes.
+    """
+    ids = payload.get("scenario_ids") or [None]
+    try:
+        month, year = int(payload["month"]), int(payload["year"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="month and year are required")
+    tenant = tenancy.current(db)
+    try:
+        with tenancy.quotas.slot(tenant, "solve"):
+            result = scenarios.compare(db, ids, month, year, post_ids=payload.get("post_ids"),
+                                       max_workers=tenant.solver_workers)
+        return respond(request, result)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Scenario {e.args[0]} not found")
+    except RuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
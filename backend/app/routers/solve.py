@@ -1,11 +1,132 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+
+from ..db import get_db
+from .. import models, tenancy
+from ..responses import respond
+from ..services import coverage, leave, preferences, scenarios
+from ..services.providers import DbActivityProvider, DbRuleProvider
+from ..solver.cache import tenant_cache
+from ..solver.engine import Solver
+from ..solver.objectives import ObjectiveSpec
+from ..solver.rules import RuleError
+
 router = APIRouter(prefix="/solve", tags=["solve"])
 
+def _cache(db: Session):
+    tenant = tenancy.current(db)
+    return tenant_cache(tenant.slug, tenant.cache_mb)
+
+def _solver(db: Session) -> Solver:
+    return Solver(acts=DbActivityProvider(db), sink=None, rules=DbRuleProvider(db), cache=_cache(db))
+
 @router.get("/preview")
-def preview_stub(post_id: int = Query(...), month: int = Query(...), year: int = Query(...)):
-    # Wire the real Solver once ActivityProvider and DB glue are in place.
-    return {
-        "ok": True,
-        "note": "Stub response. Implement Solver.preview_month(...) and wire here.",
-        "input": {"post_id": post_id, "month": month, "year": year}
-    }
+def preview(request: Request, post_id: int = Query(...), month: int = Query(..., ge=1, le=12),
+            year: int = Query(...), db: Session = Depends(get_db)):
+    if not db.get(models.Post, post_id):
+        raise HTTPException(status_code=404, detail="Post not found")
+    try:
+        with tenancy.quotas.slot(tenancy.current(db), "solve"):
+            result = _solver(db).preview_month(post_id, month, year)
+    except RuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return respond(request, {"ok": True, "input": {"post_id": post_id, "month": month, "year": year}, **result})
+
+@router.post("/month")
+def solve_month(request: Request, payload: Dict[str, Any], db: Session = Depends(get_db)):
+    """
+    {"post_id": 1, "month": 2, "year": 2025, "user_ids": [..]?,
+     "objectives": {"weights": {"fairness": 1, "weekend": 0.5}} | {"lexicographic": ["fairness", "continuity"]},
+     "pareto": [{"fairness": 1}, {"weekend": 1}, {"fairness": 1, "continuity": 1}]?,
+     "respect_coverage": true?, "scenario_id": 3?}
+
+    With respect_coverage, night calls are limited so the post-call day never drops the post's
+    site or groups below their minimum staffing (hard constraint).
+    Approved leave is always excluded (services/leave.py); the pool's preferences are loaded in
+    one query and applied (hard 'off' blocks, the rest weighted; tally per user in each solution).
+    With scenario_id, the post is solved against that what-if scenario (its overrides laid on the
+    month's live data) instead of the live rules and activities.
+    Solves count against the tenant's solver_workers quota (429 when it stays full), and a
+    Pareto run uses at most solver_workers processes.
+    """
+    try:
+        post_id, month, year = int(payload["post_id"]), int(payload["month"]), int(payload["year"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="post_id, month and year are required")
+    solver = _scenario_solver(db, payload.get("scenario_id"), post_id, month, year)
+    try:
+        spec = ObjectiveSpec.from_payload(payload.get("objectives"))
+        pareto_payload = payload.get("pareto") or []
+        if not isinstance(pareto_payload, list):
+            raise ValueError("pareto must be a list of weight objects")
+        pareto = [ObjectiveSpec(weights=w) for w in pareto_payload]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    user_ids = payload.get("user_ids")
+    if not user_ids:
+        user_ids = [u.id for u in db.query(models.User.id)
+                    .filter(models.User.role == "nchd", models.User.active.isnot(False))
+                    .order_by(models.User.id)]
+    else:
+        user_ids = _user_ids(user_ids)
+    tenant = tenancy.current(db)
+    try:
+        with tenancy.quotas.slot(tenant, "solve"):
+            postcall = _postcall_capacity(db, post_id, month, year) if payload.get("respect_coverage") else None
+            result = solver.solve_month(post_id, month, year, user_ids, objectives=spec,
+                                        pareto=pareto or None, postcall_capacity=postcall,
+                                        unavailable=leave.unavailable_days(db, month, year),
+                                        prefs=preferences.for_pool(db, user_ids, month, year),
+                                        max_workers=tenant.solver_workers)
+    except RuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return respond(request, result)
+
+def _user_ids(raw) -> List[int]:
+    """Payload user_ids as ints (numeric strings accepted); 422 for anything else."""
+    def ok(u):
+        return (isinstance(u, int) and not isinstance(u, bool)) or (isinstance(u, str) and u.strip().isdigit())
+    if not isinstance(raw, list) or not all(ok(u) for u in raw):
+        raise HTTPException(status_code=422, detail="user_ids must be a list of integer user ids")
+    return [int(u) for u in raw]
+
+def _scenario_solver(db: Session, scenario_id, post_id: int, month: int, year: int) -> Solver:
+    """The live solver, or one reading a scenario's snapshot; 404 for an unknown scenario or post."""
+    if scenario_id is None:
+        if not db.get(models.Post, post_id):
+            raise HTTPException(status_code=404, detail="Post not found")
+        return _solver(db)
+    if not isinstance(scenario_id, int) or isinstance(scenario_id, bool):
+        raise HTTPException(status_code=422, detail="scenario_id must be an integer")
+    sc = db.get(models.Scenario, scenario_id)
+    if sc is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    snap = scenarios.apply_overrides(scenarios.load_base(db, month, year), sc)
+    if post_id not in snap.posts:
+        raise HTTPException(status_code=404, detail="Post not found in scenario")
+    return Solver(acts=snap, sink=None, rules=snap, cache=_cache(db))
+
+def _postcall_capacity(db: Session, post_id: int, month: int, year: int) -> Dict[str, int]:
+    """Per day, the smallest daytime slack across the post's site and groups."""
+    post = db.get(models.Post, post_id)
+    if post is None:  # a scenario-only post has no live staffing to protect
+        return {}
+    keys = [("site", post.site)] if post.site else []
+    keys += [("group", pg.group_id) for pg in db.query(models.PostGroup).filter(models.PostGroup.post_id == post_id)]
+    cov = coverage.compute(db, month, year)
+    out: Dict[str, int] = {}
+    for key in keys:
+        for day, slack in cov.slack(key).items():
+            out[day] = min(slack, out.get(day, slack))
+    return out
+
+@router.get("/cache")
+def cache_stats(db: Session = Depends(get_db)):
+    return _cache(db).stats()
+
+@router.delete("/cache")
+def cache_clear(db: Session = Depends(get_db)):
+    _cache(db).clear()
+    return {"ok": True}
@@ -0,0 +1,55 @@
+# backend/app/routers/stream.py
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from .. import tenancy
+from ..services.changefeed import broker, Filter, DEFAULT_MAX_PENDING
+
+router = APIRouter(tags=["stream"])
+
+HEARTBEAT_SECONDS = 15.0
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    site: Optional[str] = Query(None),
+    post_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    max_pending: int = Query(DEFAULT_MAX_PENDING, ge=1, le=10_000),
+):
+    """
+    Server-Sent Events feed of RotaSlot / Post / Group changes.
+    Events are coalesced per row; a `resync` event means the client fell behind
+    and should re-fetch instead of applying deltas. An update that moves a row out of the filter
+    (e.g. a post's site changes) still arrives, with the old values under `previous`. Only the caller's tenant's changes are sent
+    (EventSource can't set headers, so pass `?tenant=`).
+    """
+    tenant = tenancy.resolve(request)
+    sub = broker.subscribe(
+        Filter(site=site, post_id=post_id, user_id=user_id, tenant=tenant.slug),
+        max_pending=max_pending,
+        loop=asyncio.get_running_loop(),
+    )
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch = await sub.wait(HEARTBEAT_SECONDS)
+                if not batch:
+                    yield ": keepalive\n\n"
+                    continue
+                for ev in batch:
+                    yield f"event: {ev['op']}\ndata: {json.dumps(ev)}\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
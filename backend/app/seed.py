@@ -1,11 +1,50 @@
 from __future__ import annotations
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Optional
+import json
+import os
 import random
 
 from . import models
 
-def seed(db: Session):
+@dataclass
+class SeedScale:
+    """
+    Volume for load tests and capacity planning (on top of the demo seed).
+    Parsed from SEED_SCALE: a JSON file path or "users=400,posts=60,sites=4,months=3".
+    """
+    users: int = 14
+    posts: int = 2
+    sites: int = 1
+    months: int = 1
+    start: date = date(2025, 1, 1)
+    rng_seed: int = 0
+
+    @classmethod
+    def parse(cls, spec: str) -> "SeedScale":
+        if os.path.isfile(spec):
+            with open(spec) as f:
+                raw = json.load(f)
+        else:
+            raw = dict(kv.split("=", 1) for kv in spec.split(",") if kv.strip())
+        known = {f.name for f in fields(cls)}
+        kw = {k.strip(): v for k, v in raw.items() if k.strip() in known}
+        if "start" in kw:
+            kw["start"] = date.fromisoformat(str(kw["start"]))
+        for k in ("users", "posts", "sites", "months", "rng_seed"):
+            if k in kw:
+                kw[k] = int(kw[k])
+        return cls(**kw)
+
+    @classmethod
+    def from_env(cls) -> Optional["SeedScale"]:
+        spec = os.environ.get("SEED_SCALE")
+        return cls.parse(spec) if spec else None
+
+def seed(db: Session, scale: Optional[SeedScale] = None):
     """
     Idempotent-ish seed:
       - ensures at least 1 admin, 1 supervisor, 14 NCHDs
@@ -13,6 +52,8 @@ def seed(db: Session):
       - creates three Groups (on-call pool, teaching block, team)
       - links posts to the on-call pool by default
       - creates a small set of demo rota slots
+      - with `scale`, tops up to scale.users NCHDs and scale.posts posts over
+        scale.sites sites, each with day + night-call slots for scale.months
     Safe to call on every startup.
     """
 
@@ -26,7 +67,7 @@ def seed(db: Session):
 
     # Ensure 14 NCHDs exist (create up to 14; keep existing if already present)
     nchd_existing = db.query(models.User).filter(models.User.role == "nchd").count()
-    for i in range(nchd_existing, 14):
+    for i in range(nchd_existing, max(14, scale.users if scale else 0)):
         db.add(models.User(name=f"NCHD {i+1}", email=f"nchd{i+1}@example.com", role="nchd"))
     db.commit()
 
@@ -123,3 +164,56 @@ def seed(db: Session):
             ))
 
         db.commit()
+
+    if scale:
+        _seed_scale(db, scale, on_call_pool, teaching_block, mon_fri_9_5)
+
+def _seed_scale(db: Session, scale: SeedScale, on_call_pool, teaching_block, core_hours: dict):
+    """Posts "Load Post N" spread over "Site K" with a month-by-month roster; bulk inserted."""
+    from .services import summaries
+
+    rng = random.Random(scale.rng_seed)
+    nchds = [u.id for u in db.query(models.User.id).filter(models.User.role == "nchd").order_by(models.User.id)]
+    teams = {}
+    for k in range(1, scale.sites + 1):
+        name = f"Team Site {k}"
+        g = db.query(models.Group).filter(models.Group.name == name).first()
+        if not g:
+            g = models.Group(name=name, kind="team", rules={"clinic_days": ["Mon", "Thu"]})
+            db.add(g)
+        teams[k] = g
+
+    posts = []
+    for i in range(1, scale.posts + 1):
+        title = f"Load Post {i}"
+        p = db.query(models.Post).filter(models.Post.title == title).first()
+        if not p:
+            k = (i - 1) % scale.sites + 1
+            p = models.Post(title=title, site=f"Site {k}", grade="Registrar", fte=1.0,
+                            status="ACTIVE_ROSTERABLE", core_hours=core_hours, eligibility={})
+            p.groups.extend([on_call_pool, teaching_block, teams[k]])
+            db.add(p)
+        posts.append(p)
+    db.commit()
+
+    first = datetime.combine(scale.start.replace(day=1), datetime.min.time())
+    y, m = divmod(first.month - 1 + scale.months, 12)
+    last = first.replace(year=first.year + y, month=m + 1)
+    rows = []
+    for p in posts:
+        if db.query(models.RotaSlot.id).filter(models.RotaSlot.post_id == p.id,
+                                               models.RotaSlot.start >= first).first():
+            continue  # already rostered by an earlier run
+        day = first
+        while day < last:
+            if day.weekday() < 5:
+                rows.append({"user_id": rng.choice(nchds), "post_id": p.id, "start": day.replace(hour=9),
+                             "end": day.replace(hour=17), "type": "base", "labels": {}})
+            rows.append({"user_id": rng.choice(nchds), "post_id": p.id, "start": day.replace(hour=17),
+                         "end": day.replace(hour=9) + timedelta(days=1), "type": "night_call", "labels": {}})
+            day += timedelta(days=1)
+    for n in range(0, len(rows), 5000):
+        db.execute(insert(models.RotaSlot), rows[n:n + 5000])
+    db.commit()
+    if rows:
+        summaries.rebuild_all(db, since=first.date())  # bulk inserts bypass the session hooks
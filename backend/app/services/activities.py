@@ -10,3 +10,18 @@ def expand_weekly(month: int, year: int, weekday: str, window: list[str], tags:
         if WEEKDAYS[d.weekday()] == weekday:
             yield DatedWindow(date=d.isoformat(), start=window[0], end=window[1], tags=tags, source=source)
         d += timedelta(days=1)
+
+def expand_pattern(month: int, year: int, pattern: dict, source: str) -> Iterable[DatedWindow]:
+    """Expand an Activity.pattern ({"kind":"weekly","weekday",..} or {"kind":"oneoff","date",..}) for a month."""
+    pattern = pattern or {}
+    window = pattern.get("window")
+    if not window or len(window) != 2:
+        return
+    tags = list(pattern.get("tags") or [])
+    kind = pattern.get("kind", "weekly")
+    if kind == "weekly" and pattern.get("weekday") in WEEKDAYS:
+        yield from expand_weekly(month, year, pattern["weekday"], window, tags, source)
+    elif kind in ("oneoff", "one_off") and pattern.get("date"):
+        d = date.fromisoformat(pattern["date"])
+        if (d.year, d.month) == (year, month):
+            yield DatedWindow(date=d.isoformat(), start=window[0], end=window[1], tags=tags, source=source)
@@ -0,0 +1,235 @@
+# backend/app/services/changefeed.py
+"""
+In-process change feed for RotaSlot / Post / Group mutations.
+
+Session hooks collect changed rows during flush and publish them to the
+broker once the transaction commits (rolled-back work is never announced).
+Each subscriber owns a bounded, coalescing buffer: repeated changes to the
+same row collapse into the latest one, and if a slow client still overflows
+its buffer the oldest events are dropped and a single "resync" event tells
+it to re-fetch the list endpoints. A row inserted and deleted again before the
+client drained is dropped altogether.
+
+An update that moves a row (a post to another site, a slot to another post or
+user) carries the old values under "previous", and subscribers filtering on
+either side receive it, so a client sees the row leave its view.
+
+This is the local stand-in for Postgres LISTEN/NOTIFY; a NOTIFY bridge only
+needs to call `broker.publish(...)` with the same event dicts.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .. import models, tenancy
+
+# entity name used on the wire -> ORM class
+TRACKED = {
+    "rota_slot": models.RotaSlot,
+    "post": models.Post,
+    "group": models.Group,
+}
+
+DEFAULT_MAX_PENDING = 256
+
+
+@dataclass
+class Filter:
+    """A field only excludes an event if the event carries that field and neither it nor its "previous"
+    value matches; tenants never mix."""
+    site: Optional[str] = None
+    post_id: Optional[int] = None
+    user_id: Optional[int] = None
+    tenant: str = tenancy.PUBLIC
+
+    def matches(self, ev: Dict[str, Any]) -> bool:
+        if ev.get("tenant", tenancy.PUBLIC) != self.tenant:
+            return False
+        for key in ("site", "post_id", "user_id"):
+            want = getattr(self, key)
+            if want is None or ev.get(key) is None:
+                continue
+            if ev[key] != want and (ev.get("previous") or {}).get(key) != want:
+                return False
+        return True
+
+
+@dataclass
+class Subscription:
+    filter: Filter
+    max_pending: int = DEFAULT_MAX_PENDING
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    _pending: "OrderedDict[tuple, Dict[str, Any]]" = field(default_factory=OrderedDict)
+    _overflowed: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _wakeup: Optional[asyncio.Event] = None
+
+    def __post_init__(self):
+        if self.loop is not None:
+            self._wakeup = asyncio.Event()
+
+    def offer(self, ev: Dict[str, Any]) -> None:
+        if not self.filter.matches(ev):
+            return
+        key = (ev["entity"], ev["id"])
+        with self._lock:
+            prev = self._pending.pop(key, None)
+            if prev is not None and prev["op"] == "insert":
+                if ev["op"] == "delete":
+                    return  # the client never saw the row
+                if ev["op"] == "update":
+                    ev = {**ev, "op": "insert"}  # client hasn't seen the insert yet
+            self._pending[key] = ev
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self._overflowed = True
+        self._notify()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._overflowed:
+                self._pending.clear()
+                self._overflowed = False
+                out = [{"entity": "*", "op": "resync", "id": None}]
+            else:
+                out = list(self._pending.values())
+                self._pending.clear()
+            if self._wakeup is not None:
+                self._wakeup.clear()
+        return out
+
+    async def wait(self, timeout: float) -> List[Dict[str, Any]]:
+        """Wait up to `timeout` seconds for events; returns [] on timeout."""
+        if not self._pending and not self._overflowed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return self.drain()
+
+    def _notify(self) -> None:
+        if self._wakeup is None or self.loop is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # loop closed; subscriber is going away
+
+
+class ChangeBroker:
+    def __init__(self):
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, flt: Filter, max_pending: int = DEFAULT_MAX_PENDING,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        sub = Subscription(filter=flt, max_pending=max_pending, loop=loop)
+        with self._lock:
+            self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            subs = list(self._subs)
+        for ev in events:
+            for sub in subs:
+                sub.offer(ev)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+
+broker = ChangeBroker()
+
+
+# --- session hooks -------------------------------------------------------------
+def _previous(obj, attr: str):
+    """The value `attr` had before this flush, or the current one if it did not change."""
+    hist = inspect(obj).attrs[attr].history
+    return hist.deleted[0] if hist.deleted else getattr(obj, attr)
+
+
+def _site_of(session: Session, post_id: Optional[int]) -> Optional[str]:
+    if post_id is None:
+        return None
+    with session.no_autoflush:
+        post = session.get(models.Post, post_id)
+    return post.site if post else None
+
+
+def _event_for(entity: str, obj, op: str, session: Session) -> Dict[str, Any]:
+    ev: Dict[str, Any] = {"entity": entity, "op": op, "id": obj.id, "tenant": tenancy.current(session).slug}
+    previous: Dict[str, Any] = {}
+    if entity == "post":
+        ev["post_id"] = obj.id
+        ev["site"] = obj.site
+        if op == "update":
+            previous["site"] = _previous(obj, "site")
+    elif entity == "rota_slot":
+        ev["post_id"] = obj.post_id
+        ev["user_id"] = obj.user_id
+        ev["start"] = obj.start.isoformat() if obj.start else None
+        ev["end"] = obj.end.isoformat() if obj.end else None
+        ev["site"] = _site_of(session, obj.post_id)
+        if op == "update":
+            previous["post_id"] = _previous(obj, "post_id")
+            previous["user_id"] = _previous(obj, "user_id")
+            previous["site"] = _site_of(session, previous["post_id"])
+    previous = {k: v for k, v in previous.items() if v != ev.get(k)}
+    if previous:
+        ev["previous"] = previous
+    return ev
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    buf = session.info.setdefault("changefeed", [])
+    for op, objs in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objs:
+            for entity, cls in TRACKED.items():
+                if isinstance(obj, cls):
+                    if op == "update" and not session.is_modified(obj):
+                        break
+                    buf.append((entity, obj, op))
+                    break
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    # ids of inserted rows are only known after the flush, so build events here
+    pending = session.info.pop("changefeed", [])
+    if pending:
+        events = session.info.setdefault("changefeed_events", [])
+        events.extend(_event_for(entity, obj, op, session) for entity, obj, op in pending)
+
+
+def _after_commit(session: Session) -> None:
+    events = session.info.pop("changefeed_events", None)
+    if events:
+        broker.publish(events)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("changefeed", None)
+    session.info.pop("changefeed_events", None)
+
+
+def install(session_factory) -> None:
+    """Attach the change-feed hooks to a sessionmaker (idempotent)."""
+    if event.contains(session_factory, "after_commit", _after_commit):
+        return
+    event.listen(session_factory, "before_flush", _before_flush)
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
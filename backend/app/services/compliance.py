@@ -0,0 +1,365 @@
+# backend/app/services/compliance.py
+"""
+Streaming EWTD / HSE-contract compliance audit over any span of rota history.
+
+Slots are read through a server-side cursor (`yield_per`) ordered by
+(user, start) and fed one at a time into `UserAudit`, which only keeps the
+open duty period, the unfinished weeks and the rolling reference window, so
+memory does not grow with the length of history. Checks:
+
+- duty over 24h, daily rest under 11h between duty periods (as engine.ewtd_check)
+- weekly rest: longest rest overlapping a Mon-Sun week under 24h (a rest
+  period counts in full for every week it touches)
+- 48h average over a rolling REFERENCE_WEEKS-week reference period
+- HSE 39h base week: more than 39h of `base` slots in a week
+- split shifts: two separate duty periods starting on the same day
+- breaks: a slot over 6h with under 30m of breaks in its labels
+
+For large runs, users are cut into fixed chunks which worker processes write
+as separate part files; `manifest.json` records finished chunks, so rerunning
+the same command resumes an interrupted report. Once every chunk is in, the
+parts are concatenated into `findings.csv` (one row per breach) and
+`weeks.csv` (one row per user-week; the table a PDF layout renders).
+
+    python -m app.services.compliance --start 2023-01-01 --end 2025-12-31 --out /var/reports/audit
+    python -m app.services.compliance ... --tenant stjames --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models, tenancy
+from .summaries import AVERAGE_WEEK_HOURS, REFERENCE_WEEKS, week_start
+
+MAX_DUTY_HOURS = 24.0
+MIN_DAILY_REST_HOURS = 11.0
+MIN_WEEKLY_REST_HOURS = 24.0
+BASE_WEEK_HOURS = 39.0
+BREAK_AFTER_HOURS = 6.0
+MIN_BREAK_MINUTES = 30.0
+
+CHUNK_USERS = 200
+YIELD_PER = 5000
+
+FINDING_COLUMNS = ["user_id", "rule", "start", "end", "value", "limit", "detail"]
+WEEK_COLUMNS = ["user_id", "week_start", "hours", "base_hours", "rolling_avg_hours", "longest_rest_hours",
+                "findings"]
+COLUMNS = {"findings": FINDING_COLUMNS, "weeks": WEEK_COLUMNS}
+
+WEEK = timedelta(days=7)
+Row = Tuple[int, datetime, datetime, Optional[str], Optional[dict]]
+
+
+def period(start: date, end: date) -> Tuple[datetime, datetime, datetime]:
+    """Whole weeks covering start..end (inclusive) and the history read before them for the average."""
+    lo = datetime.combine(week_start(start), datetime.min.time())
+    hi = datetime.combine(week_start(end), datetime.min.time()) + WEEK
+    return lo, hi, lo - REFERENCE_WEEKS * WEEK
+
+
+def break_minutes(labels: Optional[dict]) -> float:
+    """Total of "HH:MM-HH:MM" spans under labels paid_break / breaks (a string or a list)."""
+    total = 0.0
+    for key in ("paid_break", "breaks"):
+        spans = (labels or {}).get(key) or []
+        for span in [spans] if isinstance(spans, str) else spans:
+            try:
+                a, b = (int(h) * 60 + int(m) for h, m in (t.split(":") for t in str(span).split("-")))
+            except ValueError:
+                continue
+            total += (b - a) % 1440
+    return total
+
+
+def _hours(seconds: float) -> float:
+    return round(seconds / 3600.0, 2)
+
+
+class UserAudit:
+    """One user's slots in start order; call `feed` per slot, `finish` at the end, `drain` for output rows."""
+
+    def __init__(self, user_id: int, lo: datetime, hi: datetime, since: datetime):
+        self.user_id, self.lo, self.hi = user_id, lo, hi
+        self.period: Optional[List[datetime]] = None      # open duty period [start, end]
+        self.last_start: Optional[datetime] = None        # start of the previous closed period
+        self.rest_from = since                            # end of the last duty (or of what we can see)
+        self.week = datetime.combine(week_start(since), datetime.min.time())  # first unfinished week
+        self.worked: Dict[datetime, List[float]] = defaultdict(lambda: [0.0, 0.0])  # week -> [secs, base secs]
+        self.rest: Dict[datetime, float] = defaultdict(float)  # week -> longest rest (secs)
+        self.found: Counter = Counter()                   # week -> findings
+        self.window: deque = deque(maxlen=REFERENCE_WEEKS)
+        self._out: List[Tuple[str, Dict[str, Any]]] = []
+
+    # --- input --------------------------------------------------------------------
+    def feed(self, start: datetime, end: datetime, type: Optional[str] = None, labels: Optional[dict] = None) -> None:
+        length = (end - start).total_seconds()
+        if length > BREAK_AFTER_HOURS * 3600 and break_minutes(labels) < MIN_BREAK_MINUTES:
+            self._finding("break", start, end, break_minutes(labels), MIN_BREAK_MINUTES,
+                          f"{_hours(length)}h {type or 'slot'} with under {MIN_BREAK_MINUTES:g}m of breaks")
+        for w, secs in self._split(start, end):
+            self.worked[w][0] += secs
+            if type == "base":
+                self.worked[w][1] += secs
+
+        if self.period is not None and start <= self.period[1]:
+            self.period[1] = max(self.period[1], end)
+        else:
+            if self.period is not None:
+                self._close_period()
+            if self.last_start is not None:
+                gap = (start - self.rest_from).total_seconds()
+                if gap < MIN_DAILY_REST_HOURS * 3600:
+                    self._finding("daily_rest", self.rest_from, start, _hours(gap), MIN_DAILY_REST_HOURS,
+                                  f"rest before {start:%Y-%m-%d %H:%M}")
+                if self.last_start.date() == start.date():
+                    self._finding("split_shift", self.last_start, start, None, None,
+                                  f"second duty on {start:%Y-%m-%d}")
+            self._rested(self.rest_from, start)
+            self.period = [start, end]
+        self._close_weeks(self.period[0])  # the open period's findings still count in its first week
+
+    def finish(self) -> None:
+        if self.period is not None:
+            self._close_period()
+        self._rested(self.rest_from, self.hi)
+        self._close_weeks(self.hi)
+
+    def drain(self) -> List[Tuple[str, Dict[str, Any]]]:
+        out, self._out = self._out, []
+        return out
+
+    # --- internals ----------------------------------------------------------------
+    def _split(self, a: datetime, b: datetime) -> Iterator[Tuple[datetime, float]]:
+        w = datetime.combine(week_start(a), datetime.min.time())
+        while w < b:
+            secs = (min(b, w + WEEK) - max(a, w)).total_seconds()
+            if secs > 0:
+                yield w, secs
+            w += WEEK
+
+    def _rested(self, a: datetime, b: datetime) -> None:
+        secs = (b - a).total_seconds()
+        for w, _ in self._split(a, b):
+            self.rest[w] = max(self.rest[w], secs)
+
+    def _close_period(self) -> None:
+        start, end = self.period
+        length = (end - start).total_seconds()
+        if length > MAX_DUTY_HOURS * 3600:
+            self._finding("duty_length", start, end, _hours(length), MAX_DUTY_HOURS, "continuous duty")
+        self.last_start, self.rest_from, self.period = start, end, None
+
+    def _close_weeks(self, upto: datetime) -> None:
+        """Weeks ending by `upto` are final: every later slot, rest gap and duty period starts after them."""
+        while self.week + WEEK <= upto:
+            w = self.week
+            secs, base = self.worked.pop(w, (0.0, 0.0))
+            rest = self.rest.pop(w, 0.0)
+            self.window.append(secs)
+            if w >= self.lo:
+                avg = sum(self.window) / len(self.window)
+                end = w + WEEK
+                if rest < MIN_WEEKLY_REST_HOURS * 3600:
+                    self._finding("weekly_rest", w, end, _hours(rest), MIN_WEEKLY_REST_HOURS, "longest rest in week")
+                if avg > AVERAGE_WEEK_HOURS * 3600:
+                    self._finding("average_48h", w, end, _hours(avg), AVERAGE_WEEK_HOURS,
+                                  f"{len(self.window)}-week average")
+                if base > BASE_WEEK_HOURS * 3600:
+                    self._finding("base_week_39h", w, end, _hours(base), BASE_WEEK_HOURS, "base hours in week")
+                self._out.append(("weeks", {
+                    "user_id": self.user_id, "week_start": w.date().isoformat(), "hours": _hours(secs),
+                    "base_hours": _hours(base), "rolling_avg_hours": _hours(avg),
+                    "longest_rest_hours": _hours(rest), "findings": self.found.pop(w, 0),
+                }))
+            self.week = w + WEEK
+
+    def _finding(self, rule: str, start: datetime, end: datetime, value, limit, detail: str) -> None:
+        if not self.lo <= start < self.hi:
+            return  # history read only to seed the averages
+        self.found[datetime.combine(week_start(start), datetime.min.time())] += 1
+        self._out.append(("findings", {
+            "user_id": self.user_id, "rule": rule, "start": start.isoformat(), "end": end.isoformat(),
+            "value": value, "limit": limit, "detail": detail,
+        }))
+
+
+def audit_rows(rows: Iterable[Row], lo: datetime, hi: datetime, since: datetime) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """("findings" | "weeks", row) for each user in turn; `rows` sorted by (user_id, start)."""
+    for user_id, slots in groupby(rows, key=itemgetter(0)):
+        ua = UserAudit(user_id, lo, hi, since)
+        for _, start, end, type, labels in slots:
+            ua.feed(start, end, type, labels)
+            yield from ua.drain()
+        ua.finish()
+        yield from ua.drain()
+
+
+def slot_rows(db: Session, hi: datetime, since: datetime, users: Optional[Tuple[int, int]] = None) -> Iterable[Row]:
+    """Server-side cursor over the slots that matter (partition-pruned on start), in audit order."""
+    RS = models.RotaSlot
+    q = db.query(RS.user_id, RS.start, RS.end, RS.type, RS.labels) \
+        .filter(RS.user_id.isnot(None), RS.start >= since, RS.start < hi)
+    if users is not None:
+        q = q.filter(RS.user_id >= users[0], RS.user_id <= users[1])
+    return q.order_by(RS.user_id, RS.start).yield_per(YIELD_PER)
+
+
+def stream_csv(tenant: tenancy.Tenant, start: date, end: date, kind: str = "findings",
+               user_id: Optional[int] = None, flush_bytes: int = 64 * 1024) -> Iterator[str]:
+    """CSV text in ~flush_bytes pieces as the audit runs (owns its session: it outlives the request scope)."""
+    from ..db import SessionLocal
+    lo, hi, since = period(start, end)
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, COLUMNS[kind])
+    writer.writeheader()
+    with tenancy.bind(SessionLocal(), tenant) as db:
+        users = (user_id, user_id) if user_id is not None else None
+        for k, row in audit_rows(slot_rows(db, hi, since, users), lo, hi, since):
+            if k == kind:
+                writer.writerow(row)
+                if buf.tell() >= flush_bytes:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+    yield buf.getvalue()
+
+
+# --- parallel, resumable report --------------------------------------------------
+def _init_worker() -> None:
+    from ..db import engine
+    engine.dispose(close=False)  # forked: never reuse the parent's pooled connections
+
+
+def _run_chunk(job) -> Tuple[int, Dict[str, int]]:
+    from ..db import SessionLocal
+    idx, users, start, end, parts, tenant = job
+    lo, hi, since = period(start, end)
+    counts: Counter = Counter()
+    paths = {kind: os.path.join(parts, f"{kind}-{idx:05d}.csv") for kind in COLUMNS}
+    files = {kind: open(p + ".tmp", "w", newline="") for kind, p in paths.items()}
+    try:
+        writers = {kind: csv.DictWriter(f, COLUMNS[kind]) for kind, f in files.items()}
+        with tenancy.bind(SessionLocal(), tenant) as db:
+            for kind, row in audit_rows(slot_rows(db, hi, since, tuple(users)), lo, hi, since):
+                writers[kind].writerow(row)
+                counts[row["rule"] if kind == "findings" else "weeks"] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    for p in paths.values():  # a chunk is done only once both parts are in place
+        os.replace(p + ".tmp", p)
+    return idx, dict(counts)
+
+
+def _save(path: str, manifest: Dict[str, Any]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _merge(out: str, parts: str, chunks: int) -> None:
+    for kind, columns in COLUMNS.items():
+        tmp = os.path.join(out, f"{kind}.csv.tmp")
+        with open(tmp, "w", newline="") as f:
+            csv.writer(f).writerow(columns)
+            for idx in range(chunks):
+                with open(os.path.join(parts, f"{kind}-{idx:05d}.csv"), newline="") as part:
+                    shutil.copyfileobj(part, f)
+        os.replace(tmp, os.path.join(out, f"{kind}.csv"))
+
+
+def audit(out: str, start: date, end: date, tenant: tenancy.Tenant = tenancy.PUBLIC_TENANT,
+          workers: Optional[int] = None, chunk_users: int = CHUNK_USERS,
+          on_chunk: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Write findings.csv / weeks.csv under `out`. Rerunning with the same arguments skips the chunks
+    already written; a directory holding a different report is refused.
+    """
+    from ..db import SessionLocal
+    parts = os.path.join(out, "parts")
+    os.makedirs(parts, exist_ok=True)
+    path = os.path.join(out, "manifest.json")
+    params = {"start": start.isoformat(), "end": end.isoformat(), "tenant": tenant.slug}
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+        if any(manifest.get(k) != v for k, v in params.items()):
+            raise ValueError(f"{out} holds the report for {[manifest.get(k) for k in params]}; use another directory")
+    else:
+        with tenancy.bind(SessionLocal(), tenant) as db:
+            ids = [uid for (uid,) in db.query(models.User.id).order_by(models.User.id)]
+        chunks = [[ids[i], ids[min(i + chunk_users, len(ids)) - 1]] for i in range(0, len(ids), chunk_users)]
+        manifest = {**params, "chunks": chunks, "done": {}, "complete": False}
+        _save(path, manifest)
+    if manifest["complete"]:
+        return manifest
+
+    jobs = [(i, users, start, end, parts, tenant) for i, users in enumerate(manifest["chunks"])
+            if str(i) not in manifest["done"]]
+    total = len(manifest["chunks"])
+
+    def record(idx: int, counts: Dict[str, int]) -> None:
+        manifest["done"][str(idx)] = counts
+        _save(path, manifest)
+        if on_chunk:
+            on_chunk(len(manifest["done"]), total)
+
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for job in jobs:
+            record(*_run_chunk(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for fut in as_completed([pool.submit(_run_chunk, j) for j in jobs]):
+                record(*fut.result())
+
+    _merge(out, parts, total)
+    totals: Counter = Counter()
+    for counts in manifest["done"].values():
+        totals.update(counts)
+    manifest["totals"] = dict(sorted(totals.items()))
+    manifest["complete"] = True
+    _save(path, manifest)
+    shutil.rmtree(parts, ignore_errors=True)
+    return manifest
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.services.compliance")
+    ap.add_argument("--start", required=True, type=date.fromisoformat)
+    ap.add_argument("--end", required=True, type=date.fromisoformat, help="inclusive; rounded out to whole weeks")
+    ap.add_argument("--out", required=True, help="report directory (rerun with the same one to resume)")
+    ap.add_argument("--tenant", default=tenancy.PUBLIC)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--chunk-users", type=int, default=CHUNK_USERS)
+    args = ap.parse_args(argv)
+    if args.end < args.start:
+        ap.error("--end must not be before --start")
+    tenant = tenancy.registry.get(args.tenant)
+    if tenant is None:
+        ap.error(f"unknown tenant {args.tenant!r}")
+    try:
+        manifest = audit(args.out, args.start, args.end, tenant, workers=args.workers, chunk_users=args.chunk_users,
+                         on_chunk=lambda done, total: print(f"chunk {done}/{total}", flush=True))
+    except ValueError as e:
+        ap.error(str(e))
+    print(json.dumps(manifest.get("totals", {})))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,279 @@
+# backend/app/services/coverage.py
+"""
+Minimum-staffing demand curves and coverage gaps at 15-minute resolution.
+
+A month is a flat grid of 96 bins per day. Demand rows and rota slots are
+turned into +n/-n steps in difference arrays, and a prefix sum yields the
+head-count per bin, so a month costs O(rows + slots + bins) per site/group
+and not O(slots x bins). A slot's protected time (Wednesday teaching,
+Group.rules clinic days, supervision, ...) is subtracted the same way, so
+ward availability excludes people who are rostered on but pulled away.
+"""
+from __future__ import annotations
+
+import calendar
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..engine import PROTECTED_TEACHING
+from ..solver.rules import compile_rules, merge, RuleError, WEEKDAYS
+
+BIN = timedelta(minutes=15)
+BINS_PER_DAY = 96
+UNBOUNDED = 10 ** 9
+
+Key = Tuple[str, Any]  # ("site", "Newcastle") | ("group", 3)
+
+
+@dataclass
+class MonthGrid:
+    year: int
+    month: int
+
+    def __post_init__(self):
+        self.days = calendar.monthrange(self.year, self.month)[1]
+        self.start = datetime(self.year, self.month, 1)
+        self.size = self.days * BINS_PER_DAY
+
+    def index(self, t: datetime, ceil: bool = False) -> int:
+        q, r = divmod(t - self.start, BIN)
+        i = q + (1 if ceil and r else 0)
+        return max(0, min(self.size, i))
+
+    def time(self, i: int) -> datetime:
+        return self.start + i * BIN
+
+    def day_bins(self, day: int, hhmm_start: str, hhmm_end: str) -> Tuple[int, int]:
+        """Bin range for a HH:MM window on day `day` (0-based); may cross midnight."""
+        a = day * BINS_PER_DAY + _bins(hhmm_start)
+        b = day * BINS_PER_DAY + _bins(hhmm_end)
+        if b <= a:
+            b += BINS_PER_DAY
+        return a, min(b, self.size)
+
+
+def _bins(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return (int(h) * 60 + int(m)) // 15
+
+
+class Curve:
+    """Difference-array accumulator; `values()` prefix-sums it once."""
+
+    def __init__(self, size: int):
+        self.diff = [0] * (size + 1)
+
+    def add(self, a: int, b: int, n: int = 1) -> None:
+        if b > a:
+            self.diff[a] += n
+            self.diff[b] -= n
+
+    def values(self) -> List[int]:
+        return list(accumulate(self.diff[:-1]))
+
+
+# --- demand -------------------------------------------------------------------
+def demand_curves(grid: MonthGrid, rows: Iterable[dict]) -> Dict[Key, Tuple[List[int], List[int]]]:
+    """
+    rows: {"site"|"group_id", "weekday"?, "date"?, "start", "end", "min_staff", "max_staff"?}
+    Overlapping rows add up. A date-specific row replaces weekday rows for that key and day.
+    Returns key -> (min per bin, max per bin). Max is the sum over the rows covering a bin;
+    UNBOUNDED where any of them has no max, or where no row covers the bin at all.
+    """
+    rows = list(rows)
+    dated = {(_key(r), r["date"]) for r in rows if r.get("date")}
+    mins: Dict[Key, Curve] = defaultdict(lambda: Curve(grid.size))
+    maxs: Dict[Key, Curve] = defaultdict(lambda: Curve(grid.size))
+    open_: Dict[Key, Curve] = defaultdict(lambda: Curve(grid.size))
+    capped: Dict[Key, Curve] = defaultdict(lambda: Curve(grid.size))
+    for r in rows:
+        key = _key(r)
+        for day in range(grid.days):
+            d = date(grid.year, grid.month, day + 1)
+            if r.get("date"):
+                if r["date"] != d:
+                    continue
+            else:
+                if (key, d) in dated or (r.get("weekday") and r["weekday"] != WEEKDAYS[d.weekday()]):
+                    continue
+            a, b = grid.day_bins(day, r["start"], r["end"])
+            mins[key].add(a, b, int(r.get("min_staff") or 0))
+            if r.get("max_staff") is None:
+                open_[key].add(a, b, 1)
+            else:
+                maxs[key].add(a, b, int(r["max_staff"]))
+                capped[key].add(a, b, 1)
+    out = {}
+    for key in mins:
+        if key not in capped:
+            out[key] = (mins[key].values(), [UNBOUNDED] * grid.size)
+            continue
+        unbounded = open_[key].values() if key in open_ else [0] * grid.size
+        out[key] = (mins[key].values(), [m if c and not u else UNBOUNDED
+                                         for u, c, m in zip(unbounded, capped[key].values(), maxs[key].values())])
+    return out
+
+
+def _key(r: dict) -> Key:
+    return ("site", r["site"]) if r.get("site") else ("group", r["group_id"])
+
+
+# --- supply -------------------------------------------------------------------
+def protected_bins(grid: MonthGrid, windows: Sequence[Tuple[str, str, str]]) -> List[Tuple[int, int]]:
+    """(weekday, start, end) windows -> merged, sorted bin ranges for the month."""
+    spans = []
+    for day in range(grid.days):
+        wd = WEEKDAYS[date(grid.year, grid.month, day + 1).weekday()]
+        for weekday, s, e in windows:
+            if weekday == wd:
+                spans.append(grid.day_bins(day, s, e))
+    spans.sort()
+    merged: List[Tuple[int, int]] = []
+    for a, b in spans:
+        if merged and a <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+        else:
+            merged.append((a, b))
+    return merged
+
+
+def supply_curves(grid: MonthGrid, slots: Iterable[dict], post_keys: Dict[int, List[Key]],
+                  post_protected: Dict[int, List[Tuple[int, int]]]) -> Dict[Key, List[int]]:
+    """Head-count per bin for each key; each slot counts for every key its post belongs to."""
+    curves: Dict[Key, Curve] = defaultdict(lambda: Curve(grid.size))
+    for s in slots:
+        keys = post_keys.get(s["post_id"])
+        if not keys or s.get("user_id") is None:
+            continue
+        a, b = grid.index(s["start"]), grid.index(s["end"], ceil=True)
+        if b <= a:
+            continue
+        prot = post_protected.get(s["post_id"], [])
+        k = max(0, bisect_left(prot, (a, a)) - 1)
+        cuts = []
+        while k < len(prot) and prot[k][0] < b:
+            pa, pb = max(prot[k][0], a), min(prot[k][1], b)
+            if pb > pa:
+                cuts.append((pa, pb))
+            k += 1
+        for key in keys:
+            c = curves[key]
+            c.add(a, b, 1)
+            for pa, pb in cuts:
+                c.add(pa, pb, -1)
+    return {key: c.values() for key, c in curves.items()}
+
+
+# --- gaps ---------------------------------------------------------------------
+def gaps(grid: MonthGrid, demand: Dict[Key, Tuple[List[int], List[int]]],
+         supply: Dict[Key, List[int]]) -> List[Dict[str, Any]]:
+    """Every maximal run of bins where supply < min (under) or > max (over), per key."""
+    out = []
+    for key, (mins, maxs) in sorted(demand.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))):
+        have = supply.get(key) or [0] * grid.size
+        run_kind, run_start, worst = None, 0, 0
+        for i in range(grid.size + 1):
+            if i < grid.size:
+                delta = have[i] - mins[i]
+                kind = "under" if delta < 0 else ("over" if have[i] > maxs[i] else None)
+                excess = delta if kind == "under" else have[i] - maxs[i]
+            else:
+                kind = None
+            if kind != run_kind:
+                if run_kind is not None:
+                    out.append({
+                        "target": key[0], "key": key[1], "kind": run_kind,
+                        "start": grid.time(run_start).isoformat(), "end": grid.time(i).isoformat(),
+                        "worst": worst,
+                    })
+                run_kind, run_start, worst = kind, i, 0
+            if kind == "under":
+                worst = min(worst, excess)
+            elif kind == "over":
+                worst = max(worst, excess)
+    return out
+
+
+def daily_slack(grid: MonthGrid, mins: List[int], have: List[int],
+                window: Tuple[str, str] = ("09:00", "17:00")) -> Dict[str, int]:
+    """Per date: how many people can leave the daytime window without dropping below demand."""
+    out = {}
+    for day in range(grid.days):
+        a, b = grid.day_bins(day, *window)
+        deltas = [have[i] - mins[i] for i in range(a, b) if mins[i] > 0]
+        if deltas:
+            out[date(grid.year, grid.month, day + 1).isoformat()] = max(0, min(deltas))
+    return out
+
+
+# --- DB glue ------------------------------------------------------------------
+@dataclass
+class Coverage:
+    grid: MonthGrid
+    demand: Dict[Key, Tuple[List[int], List[int]]]
+    supply: Dict[Key, List[int]]
+
+    def gaps(self, site: Optional[str] = None, group_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        demand = {k: v for k, v in self.demand.items()
+                  if (site is None and group_id is None)
+                  or (site is not None and k == ("site", site))
+                  or (group_id is not None and k == ("group", group_id))}
+        return gaps(self.grid, demand, self.supply)
+
+    def slack(self, key: Key) -> Dict[str, int]:
+        if key not in self.demand:
+            return {}
+        return daily_slack(self.grid, self.demand[key][0], self.supply.get(key) or [0] * self.grid.size)
+
+
+def post_keys(db: Session) -> Dict[int, List[Key]]:
+    """Rosterable post -> the site and group keys its staff count towards."""
+    groups_by_post: Dict[int, List[int]] = defaultdict(list)
+    for pg in db.query(models.PostGroup).all():
+        groups_by_post[pg.post_id].append(pg.group_id)
+    return {
+        p.id: ([("site", p.site)] if p.site else []) + [("group", g) for g in groups_by_post.get(p.id, [])]
+        for p in db.query(models.Post.id, models.Post.site, models.Post.status)
+        if p.status == "ACTIVE_ROSTERABLE"
+    }
+
+
+def compute(db: Session, month: int, year: int) -> Coverage:
+    grid = MonthGrid(year, month)
+    lo, hi = grid.start, grid.time(grid.size)
+
+    demand_rows = [
+        {"site": d.site, "group_id": d.group_id, "weekday": d.weekday, "date": d.date,
+         "start": d.start, "end": d.end, "min_staff": d.min_staff, "max_staff": d.max_staff}
+        for d in db.query(models.StaffingDemand).all()
+    ]
+
+    rules_by_group = {}
+    for g in db.query(models.Group.id, models.Group.rules):
+        try:
+            rules_by_group[g.id] = compile_rules(g.rules or {})
+        except RuleError as e:
+            raise RuleError(f"group {g.id}: stored rules are invalid ({e})") from e
+    teaching = ("Wed", f"{PROTECTED_TEACHING[0]:%H:%M}", f"{PROTECTED_TEACHING[1]:%H:%M}")
+    keys_by_post = post_keys(db)
+    post_protected: Dict[int, List[Tuple[int, int]]] = {}
+    for pid, keys in keys_by_post.items():
+        gids = [k for kind, k in keys if kind == "group"]
+        compiled = merge(rules_by_group[g] for g in gids if g in rules_by_group)
+        windows = [teaching] + [(w.weekday, w.start, w.end) for w in compiled.protected]
+        post_protected[pid] = protected_bins(grid, windows)
+
+    slots = (
+        {"post_id": s.post_id, "user_id": s.user_id, "start": s.start, "end": s.end}
+        for s in db.query(models.RotaSlot.post_id, models.RotaSlot.user_id, models.RotaSlot.start, models.RotaSlot.end)
+        .filter(models.RotaSlot.start >= lo - models.MAX_SLOT_SPAN, models.RotaSlot.start < hi,
+                models.RotaSlot.end > lo)
+    )
+    return Coverage(grid, demand_curves(grid, demand_rows), supply_curves(grid, slots, keys_by_post, post_protected))
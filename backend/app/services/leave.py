@@ -0,0 +1,275 @@
+# backend/app/services/leave.py
+"""
+Batch evaluation of pending leave requests.
+
+All pending requests are judged together over one day-grid horizon:
+
+  - conflicts: each request's overlaps with the user's rota slots (call
+    duties flagged), approved leave and the user's other pending requests;
+  - coverage: per site/group and day, how many rostered people the whole
+    batch would remove, against the slack left by minimum-staffing demand
+    (services/coverage.py) after leave that is already approved;
+  - order: requests are admitted greedily in a proposed order while every
+    site/day they touch still has slack, so ten requests that each look
+    fine on their own cannot jointly strip a ward.
+
+Per-user leave days are difference arrays over the horizon and slots are
+indexed once, so the cost is O(requests + slots + users x days) regardless
+of how the requests overlap.
+"""
+from __future__ import annotations
+
+import calendar
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import coverage
+
+Key = coverage.Key
+DAY_WINDOW = (time(9, 0), time(17, 0))  # matches coverage.daily_slack's default window
+POLICIES = ("fifo", "max_approvals")
+
+
+def leave_dates(start: datetime, end: datetime) -> Tuple[date, date]:
+    """First and last calendar day touched by [start, end); a zero-length request counts its start day."""
+    last = (end - timedelta(microseconds=1)).date() if end > start else start.date()
+    return start.date(), last
+
+
+def _is_call(slot_type: Optional[str]) -> bool:
+    return "call" in (slot_type or "")
+
+
+def _covered_days(rows: Iterable[dict], h0: date, days: int) -> Dict[int, List[bool]]:
+    """user_id -> per-day flag, via one difference array per user."""
+    diffs: Dict[int, List[int]] = defaultdict(lambda: [0] * (days + 1))
+    for r in rows:
+        a, b = leave_dates(r["start"], r["end"])
+        i, j = max(0, (a - h0).days), min(days - 1, (b - h0).days)
+        if i <= j:
+            diffs[r["user_id"]][i] += 1
+            diffs[r["user_id"]][j + 1] -= 1
+    return {u: [n > 0 for n in accumulate(d[:-1])] for u, d in diffs.items()}
+
+
+def analyse(requests: Sequence[dict], approved: Sequence[dict], slots: Sequence[dict],
+            post_keys: Dict[int, List[Key]], slack: Dict[Key, Dict[str, int]],
+            policy: str = "fifo") -> Dict[str, Any]:
+    """
+    requests / approved: {"id", "user_id", "start", "end", "type"?, "created_at"?}
+    slots: {"id", "user_id", "post_id", "start", "end", "type"} overlapping the horizon
+    slack: key -> {"YYYY-MM-DD": people the key can lose that day}; keys/days absent are unconstrained
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy must be one of {list(POLICIES)}")
+    if not requests:
+        return {"horizon": None, "requests": [], "coverage": [], "order": []}
+
+    h0 = min(leave_dates(r["start"], r["end"])[0] for r in requests)
+    h1 = max(leave_dates(r["start"], r["end"])[1] for r in requests)
+    days = (h1 - h0).days + 1
+    iso = [(h0 + timedelta(days=d)).isoformat() for d in range(days)]
+
+    # --- one pass over slots: per-user index + who is on the ward (daytime) each day
+    by_user: Dict[int, List[tuple]] = defaultdict(list)
+    rostered: Dict[Tuple[int, int], Set[Key]] = defaultdict(set)
+    for s in slots:
+        if s["user_id"] is None:
+            continue
+        by_user[s["user_id"]].append((s["start"], s["end"], s["id"], s.get("type")))
+        keys = post_keys.get(s["post_id"])
+        if not keys:
+            continue
+        d0, d1 = max(0, (s["start"].date() - h0).days), min(days - 1, (s["end"].date() - h0).days)
+        for d in range(d0, d1 + 1):
+            day = h0 + timedelta(days=d)
+            lo, hi = datetime.combine(day, DAY_WINDOW[0]), datetime.combine(day, DAY_WINDOW[1])
+            if s["start"] < hi and s["end"] > lo:
+                rostered[(s["user_id"], d)].update(keys)
+    for xs in by_user.values():
+        xs.sort()
+    starts = {u: [x[0] for x in xs] for u, xs in by_user.items()}
+
+    # --- cumulative removals: approved leave first (lowers the baseline), then the pending batch
+    on_leave = _covered_days(approved, h0, days)
+    pending = _covered_days(requests, h0, days)
+    base: Dict[Tuple[Key, int], int] = {}
+    for key, per_day in slack.items():
+        for d, day in enumerate(iso):
+            if day in per_day:
+                base[(key, d)] = per_day[day]
+    for (u, d), keys in rostered.items():
+        if on_leave.get(u, [False] * days)[d]:
+            for key in keys:
+                if (key, d) in base:
+                    base[(key, d)] -= 1
+    pending_removed: Dict[Tuple[Key, int], int] = defaultdict(int)
+    for (u, d), keys in rostered.items():
+        if pending.get(u, [False] * days)[d] and not on_leave.get(u, [False] * days)[d]:
+            for key in keys:
+                if (key, d) in base:
+                    pending_removed[(key, d)] += 1
+
+    # --- per-request conflicts and the constrained cells it would consume
+    approved_by_user = defaultdict(list)
+    for a in approved:
+        approved_by_user[a["user_id"]].append(a)
+    pending_by_user = defaultdict(list)
+    for r in requests:
+        pending_by_user[r["user_id"]].append(r)
+
+    info = {}
+    for r in requests:
+        u = r["user_id"]
+        xs = by_user.get(u, [])
+        k = bisect_left(starts.get(u, []), r["start"] - models.MAX_SLOT_SPAN)
+        overlapping = []
+        while k < len(xs) and xs[k][0] < r["end"]:
+            if xs[k][1] > r["start"]:
+                overlapping.append(xs[k])
+            k += 1
+        a, b = leave_dates(r["start"], r["end"])
+        cells, rostered_days = [], 0
+        for d in range(max(0, (a - h0).days), min(days - 1, (b - h0).days) + 1):
+            keys = rostered.get((u, d))
+            if not keys or on_leave.get(u, [False] * days)[d]:
+                continue
+            rostered_days += 1
+            cells.extend((key, d) for key in sorted(keys, key=str) if (key, d) in base)
+        info[r["id"]] = {
+            "cells": cells,
+            "rostered_days": rostered_days,
+            "slots": [x[2] for x in overlapping if not _is_call(x[3])],
+            "calls": [x[2] for x in overlapping if _is_call(x[3])],
+            "approved_leave": [o["id"] for o in approved_by_user[u] if o["start"] < r["end"] and o["end"] > r["start"]],
+            "overlaps_pending": [o["id"] for o in pending_by_user[u]
+                                 if o["id"] != r["id"] and o["start"] < r["end"] and o["end"] > r["start"]],
+        }
+
+    # --- proposed order + greedy admission
+    def first_come(r):
+        return (r.get("created_at") or datetime.min, r["start"], r["id"])
+
+    if policy == "max_approvals":
+        contested = {c for c, n in pending_removed.items() if n > max(base[c], 0)}
+        ordered = sorted(requests, key=lambda r: (sum(c in contested for c in info[r["id"]]["cells"]), first_come(r)))
+    else:
+        ordered = sorted(requests, key=first_come)
+
+    remaining = dict(base)
+    taken: Set[Tuple[int, int]] = set()  # (user, day) already removed by an admitted request
+    out, order = [], []
+    for r in ordered:
+        i = info[r["id"]]
+        cells = [(key, d) for key, d in i["cells"] if (r["user_id"], d) not in taken]
+        blocking = [(key, d) for key, d in cells if remaining[(key, d)] < 1]
+        alone_ok = all(base[c] >= 1 for c in i["cells"])
+        if blocking:
+            decision = "needs_cover"
+        else:
+            for c in cells:
+                remaining[c] -= 1
+            taken.update((r["user_id"], d) for _, d in cells)
+            order.append(r["id"])
+            decision = "approve_after_swap" if i["calls"] else "approve"
+        out.append({
+            "id": r["id"], "user_id": r["user_id"], "type": r.get("type"),
+            "start": r["start"].isoformat(), "end": r["end"].isoformat(),
+            "decision": decision,
+            "order": len(order) if not blocking else None,
+            "jointly_blocked": bool(blocking) and alone_ok,
+            "rostered_days": i["rostered_days"],
+            "conflicts": {"slots": i["slots"], "calls": i["calls"], "approved_leave": i["approved_leave"],
+                          "overlaps_pending": i["overlaps_pending"]},
+            "blocking": [{"target": key[0], "key": key[1], "date": iso[d], "slack": remaining[(key, d)]}
+                         for key, d in blocking],
+        })
+
+    impact = [
+        {"target": key[0], "key": key[1], "date": iso[d], "slack": base[(key, d)],
+         "requested_off": n, "after_proposal": remaining[(key, d)]}
+        for (key, d), n in sorted(pending_removed.items(), key=lambda kv: (kv[0][1], kv[0][0][0], str(kv[0][0][1])))
+    ]
+    return {"horizon": [h0.isoformat(), h1.isoformat()], "policy": policy,
+            "requests": out, "coverage": impact, "order": order}
+
+
+# --- DB glue ------------------------------------------------------------------
+def _leave_row(lv: models.Leave) -> dict:
+    return {"id": lv.id, "user_id": lv.user_id, "start": lv.start, "end": lv.end, "type": lv.type,
+            "created_at": lv.created_at}
+
+
+def _months(lo: date, hi: date) -> List[Tuple[int, int]]:
+    out, y, m = [], lo.year, lo.month
+    while (y, m) <= (hi.year, hi.month):
+        out.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def evaluate(db: Session, ids: Optional[Sequence[int]] = None, start: Optional[date] = None,
+             end: Optional[date] = None, policy: str = "fifo") -> Dict[str, Any]:
+    """Analyse pending requests (all, the given ids, or those overlapping [start, end])."""
+    L = models.Leave
+    q = db.query(L).filter(L.status == "pending")
+    if ids:
+        q = q.filter(L.id.in_(list(ids)))
+    if start:
+        q = q.filter(L.end > datetime.combine(start, time.min))
+    if end:
+        q = q.filter(L.start < datetime.combine(end + timedelta(days=1), time.min))
+    requests = [_leave_row(lv) for lv in q.all()]
+    if not requests:
+        return analyse([], [], [], {}, {}, policy)
+
+    lo, hi = min(r["start"] for r in requests), max(r["end"] for r in requests)
+    users = sorted({r["user_id"] for r in requests})
+    approved = [_leave_row(lv) for lv in db.query(L).filter(L.status == "approved", L.start < hi, L.end > lo)]
+    # slots of everyone whose absence matters: requesters and people already on approved leave
+    watched = sorted(set(users) | {a["user_id"] for a in approved})
+    S = models.RotaSlot
+    slots = [
+        {"id": s.id, "user_id": s.user_id, "post_id": s.post_id, "start": s.start, "end": s.end, "type": s.type}
+        for s in db.query(S.id, S.user_id, S.post_id, S.start, S.end, S.type)
+        .filter(S.start >= lo - models.MAX_SLOT_SPAN, S.start < hi, S.end > lo, S.user_id.in_(watched))
+    ]
+
+    slack: Dict[Key, Dict[str, int]] = defaultdict(dict)
+    for year, month in _months(lo.date(), hi.date()):
+        cov = coverage.compute(db, month, year)
+        for key in cov.demand:
+            slack[key].update(cov.slack(key))
+    return analyse(requests, approved, slots, coverage.post_keys(db), slack, policy)
+
+
+def apply(db: Session, result: Dict[str, Any]) -> List[int]:
+    """Approve the requests an evaluation admitted outright (not those needing a call swap)."""
+    ids = [r["id"] for r in result["requests"] if r["decision"] == "approve"]
+    if ids:
+        db.query(models.Leave).filter(models.Leave.id.in_(ids), models.Leave.status == "pending") \
+            .update({"status": "approved"}, synchronize_session=False)
+        db.commit()
+    return ids
+
+
+def unavailable_days(db: Session, month: int, year: int) -> Set[Tuple[int, str]]:
+    """(user_id, "YYYY-MM-DD") for approved leave in the month; feeds Solver.solve_month(unavailable=...)."""
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    lo, hi = datetime.combine(first, time.min), datetime.combine(last + timedelta(days=1), time.min)
+    L = models.Leave
+    out = set()
+    for lv in db.query(L.user_id, L.start, L.end).filter(L.status == "approved", L.start < hi, L.end > lo):
+        a, b = leave_dates(lv.start, lv.end)
+        d = max(a, first)
+        while d <= min(b, last):
+            out.add((lv.user_id, d.isoformat()))
+            d += timedelta(days=1)
+    return out
@@ -0,0 +1,155 @@
+# backend/app/services/partitions.py
+"""
+Monthly range partitions for rota_slots (by start) and audits (by created_at).
+
+The tables are converted by migration 20251019_03. This module keeps them
+healthy afterwards: it creates partitions a few months ahead, so inserts
+never land in the DEFAULT partition, and it detaches partitions older than
+the retention window into the `archive` schema. Archived data stays
+queryable but is skipped by every live query and vacuum. Tenant schemas
+(app/tenancy.py) are maintained the same way, each archiving into its own
+`<schema>_archive`.
+
+Run at startup (best effort) and from cron:
+
+    python -m app.services.partitions            # create ahead + archive
+    python -m app.services.partitions --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+PARTITIONED = {"rota_slots": "start", "audits": "created_at"}
+RETENTION_MONTHS = {
+    "rota_slots": int(os.environ.get("ROTA_SLOTS_RETENTION_MONTHS", "24")),
+    "audits": int(os.environ.get("AUDITS_RETENTION_MONTHS", "84")),
+}
+MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", "3"))
+ARCHIVE_SCHEMA = "archive"
+
+_NAME = re.compile(r"^(?P<table>\w+)_(?P<y>\d{4})_(?P<m>\d{2})$")
+
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :t AND c.relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = current_schema())"), {"t": table}).scalar())
+
+
+def attached_partitions(conn: Connection, table: str) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :t AND p.relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = current_schema()) ORDER BY c.relname"), {"t": table}).scalars())
+
+
+def create_month_partition(conn: Connection, table: str, month: date) -> bool:
+    """Create `table`'s partition for `month`; rows already parked in DEFAULT are moved into it."""
+    name = partition_name(table, month)
+    if name in attached_partitions(conn, table):
+        return False
+    col = PARTITIONED[table]
+    lo, hi = month, _add_months(month, 1)
+    default = f"{table}_default"
+    stray = conn.execute(text(
+        f'SELECT count(*) FROM {default} WHERE "{col}" >= :lo AND "{col}" < :hi'), {"lo": lo, "hi": hi}).scalar()
+    if not stray:
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+        return True
+    # DEFAULT already holds rows for this range: build the partition standalone, move them, attach
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(
+        f'WITH moved AS (DELETE FROM {default} WHERE "{col}" >= :lo AND "{col}" < :hi RETURNING *) '
+        f"INSERT INTO {name} SELECT * FROM moved"), {"lo": lo, "hi": hi})
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+    return True
+
+
+def ensure_partitions(conn: Connection, table: str, months_ahead: int = MONTHS_AHEAD,
+                      today: date | None = None, dry_run: bool = False) -> List[str]:
+    this_month = (today or date.today()).replace(day=1)
+    created = []
+    for k in range(0, months_ahead + 1):
+        month = _add_months(this_month, k)
+        name = partition_name(table, month)
+        if name in attached_partitions(conn, table):
+            continue
+        if dry_run or create_month_partition(conn, table, month):
+            created.append(name)
+    return created
+
+
+def detach_old(conn: Connection, table: str, keep_months: int, today: date | None = None,
+               dry_run: bool = False, archive: str = ARCHIVE_SCHEMA) -> List[str]:
+    """Detach partitions whose month ended more than `keep_months` ago into the archive schema."""
+    cutoff = _add_months((today or date.today()).replace(day=1), -keep_months)
+    detached = []
+    for name in attached_partitions(conn, table):
+        m = _NAME.match(name)
+        if not m or m["table"] != table:
+            continue  # DEFAULT and anything hand-made
+        if date(int(m["y"]), int(m["m"]), 1) >= cutoff:
+            continue
+        if not dry_run:
+            conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive}"'))
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            conn.execute(text(f'ALTER TABLE {name} SET SCHEMA "{archive}"'))
+        detached.append(name)
+    return detached
+
+
+def maintain(engine: Engine, dry_run: bool = False, today: date | None = None) -> Dict[str, dict]:
+    """
+    Create-ahead and archive for every partitioned table, in public and each tenant schema;
+    a no-op off Postgres or before the migration. Tenant tables report as "<schema>.<table>".
+    """
+    from ..tenancy import PUBLIC, registry
+    report: Dict[str, dict] = {}
+    schemas = [PUBLIC] + ([t.schema for t in registry.all()] if engine.dialect.name == "postgresql" else [])
+    for schema in schemas:
+        with engine.begin() as conn:
+            if schema != PUBLIC:
+                conn.exec_driver_sql(f'SET LOCAL search_path TO "{schema}"')
+            archive = ARCHIVE_SCHEMA if schema == PUBLIC else f"{schema}_{ARCHIVE_SCHEMA}"
+            for table in PARTITIONED:
+                if not is_partitioned(conn, table):
+                    continue
+                report[table if schema == PUBLIC else f"{schema}.{table}"] = {
+                    "created": ensure_partitions(conn, table, today=today, dry_run=dry_run),
+                    "archived": detach_old(conn, table, RETENTION_MONTHS[table], today=today, dry_run=dry_run,
+                                           archive=archive),
+                }
+    return report
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.services.partitions")
+    ap.add_argument("--dry-run", action="store_true", help="report what would change")
+    args = ap.parse_args(argv)
+    from ..db import engine
+    for table, r in maintain(engine, dry_run=args.dry_run).items():
+        print(f"{table}: created {r['created'] or '-'}; archived {r['archived'] or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
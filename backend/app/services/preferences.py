@@ -0,0 +1,38 @@
+# backend/app/services/preferences.py
+"""
+NCHD preferences -> solver Preference records.
+
+A solve loads its whole pool's preferences for the month in one indexed
+query (user_id IN pool, date in range), so setup cost follows the number of
+rows returned and not the number of users. The days either side of the
+month are included because a timed preference can fall inside a night
+window that crosses the month boundary.
+"""
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..solver.interfaces import PREFERENCE_KINDS as KINDS, Preference
+
+
+def to_record(p) -> Preference:
+    return Preference(user_id=p.user_id, date=p.date.isoformat(), start=p.start, end=p.end,
+                      kind=p.kind, weight=float(p.weight), hard=bool(p.hard))
+
+
+def for_pool(db: Session, users: Iterable[int], month: int, year: int) -> List[Preference]:
+    users = sorted(set(users))
+    if not users:
+        return []
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    P = models.Preference
+    rows = (db.query(P.user_id, P.date, P.start, P.end, P.kind, P.weight, P.hard)
+            .filter(P.user_id.in_(users), P.date >= first - timedelta(days=1), P.date <= last + timedelta(days=1))
+            .order_by(P.user_id, P.date, P.id))
+    return [to_record(p) for p in rows]
@@ -0,0 +1,41 @@
+# backend/app/services/providers.py
+"""DB-backed implementations of the solver's provider protocols."""
+from typing import Any, Iterable, Mapping
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..solver.interfaces import DatedWindow
+from .activities import expand_pattern
+
+
+class DbRuleProvider:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def rules_for_post(self, post_id: int) -> Iterable[Mapping[str, Any]]:
+        rows = (
+            self.db.query(models.Group.rules)
+            .join(models.PostGroup, models.PostGroup.group_id == models.Group.id)
+            .filter(models.PostGroup.post_id == post_id)
+            .order_by(models.Group.id)
+            .all()
+        )
+        return [r.rules or {} for r in rows]
+
+
+class DbActivityProvider:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def windows_for_post(self, post_id: int, month: int, year: int) -> Iterable[DatedWindow]:
+        rows = (
+            self.db.query(models.Group.name, models.Activity.pattern)
+            .join(models.Activity, models.Activity.group_id == models.Group.id)
+            .join(models.PostGroup, models.PostGroup.group_id == models.Group.id)
+            .filter(models.PostGroup.post_id == post_id)
+            .order_by(models.Activity.id)
+            .all()
+        )
+        for group_name, pattern in rows:
+            yield from expand_pattern(month, year, pattern, f"activity:{group_name}")
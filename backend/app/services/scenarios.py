@@ -0,0 +1,240 @@
+# backend/app/services/scenarios.py
+"""
+What-if scenarios as copy-on-write overlays.
+
+A scenario stores only its overrides (ScenarioOverride rows). To evaluate,
+the live posts/groups/slots for the month are loaded once into a live Snapshot and
+each scenario's overrides are laid on top; untouched rows are shared between
+all snapshots, only patched rows are copied. Each snapshot's posts are then
+solved (Solver.solve_month reads the snapshot as its rule and activity
+provider) and the resulting rosters scored. Snapshots are plain data, so
+several scenarios can be solved side by side in worker processes.
+"""
+from __future__ import annotations
+
+import calendar
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import leave, preferences
+from ..engine import ewtd_check, fairness_score
+from ..solver.batch import blocked_days
+from ..solver.engine import Solver
+from ..solver.interfaces import DatedWindow, Preference
+from ..solver.rules import compile_rules, window_span
+from ..solver.snapshot import ROSTERABLE, Snapshot
+
+ENTITIES = ("post", "group", "post_group", "rota_slot")
+OPS = ("upsert", "delete")
+POST_FIELDS = ("title", "site", "grade", "fte", "status", "core_hours", "eligibility")
+GROUP_FIELDS = ("name", "kind", "rules", "activities")
+SLOT_FIELDS = ("user_id", "post_id", "start", "end", "type")
+
+
+def _month_bounds(month: int, year: int):
+    lo = datetime(year, month, 1)
+    return lo, lo + timedelta(days=calendar.monthrange(year, month)[1])
+
+
+def load_base(db: Session, month: int, year: int) -> Snapshot:
+    lo, hi = _month_bounds(month, year)
+    posts = {
+        p.id: {f: getattr(p, f) for f in POST_FIELDS}
+        for p in db.query(models.Post).all()
+    }
+    acts = defaultdict(list)
+    for group_id, pattern in db.query(models.Activity.group_id, models.Activity.pattern).order_by(models.Activity.id):
+        acts[group_id].append(pattern or {})
+    groups = {
+        g.id: {"name": g.name, "kind": g.kind, "rules": g.rules or {}, "activities": acts[g.id]}
+        for g in db.query(models.Group).all()
+    }
+    post_groups = {(pg.post_id, pg.group_id) for pg in db.query(models.PostGroup).all()}
+    slots = {
+        s.id: {"user_id": s.user_id, "post_id": s.post_id, "start": s.start, "end": s.end, "type": s.type}
+        for s in db.query(models.RotaSlot).filter(models.RotaSlot.start >= lo - models.MAX_SLOT_SPAN,
+                                                  models.RotaSlot.start < hi, models.RotaSlot.end > lo)
+    }
+    return Snapshot(None, "live", posts, groups, post_groups, slots)
+
+
+def _coerce_slot(data: dict) -> dict:
+    out = dict(data)
+    for k in ("start", "end"):
+        if isinstance(out.get(k), str):
+            out[k] = datetime.fromisoformat(out[k])
+    return out
+
+
+def check_override(entity: str, op: str, entity_id: Optional[int], data: Any) -> None:
+    """
+    Reject an override evaluate() could not apply (ValueError; RuleError for group rules).
+    New rows (no entity_id) must be complete; patches of existing rows only need valid fields.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("data must be an object")
+    if entity == "post_group":
+        if not all(isinstance(data.get(k), int) for k in ("post_id", "group_id")):
+            raise ValueError("post_group data needs integer post_id and group_id")
+        return
+    if entity_id is not None and not isinstance(entity_id, int):
+        raise ValueError("entity_id must be an integer")
+    if op == "delete":
+        if entity_id is None:
+            raise ValueError("delete needs entity_id")
+        return
+    fields, required = {
+        "post": (POST_FIELDS, ("title",)),
+        "group": (GROUP_FIELDS, ("name",)),
+        "rota_slot": (SLOT_FIELDS, ("post_id", "start", "end")),
+    }[entity]
+    unknown = set(data) - set(fields)
+    if unknown:
+        raise ValueError(f"{entity}: unknown field(s) {sorted(unknown)}; allowed: {list(fields)}")
+    missing = [k for k in required if data.get(k) is None] if entity_id is None else []
+    if missing:
+        raise ValueError(f"new {entity} needs {missing}")
+    if entity == "post" and "fte" in data and not isinstance(data["fte"], (int, float)):
+        raise ValueError("fte must be a number")
+    if entity == "group":
+        if "rules" in data:
+            compile_rules(data["rules"])
+        if "activities" in data and not (isinstance(data["activities"], list)
+                                         and all(isinstance(a, dict) for a in data["activities"])):
+            raise ValueError("activities must be a list of pattern objects")
+    if entity == "rota_slot":
+        for k in ("user_id", "post_id"):
+            if k in data and data[k] is not None and not isinstance(data[k], int):
+                raise ValueError(f"{k} must be an integer")
+        if "post_id" in data and data["post_id"] is None:
+            raise ValueError("post_id must not be null")
+        try:
+            bounds = _coerce_slot({k: data[k] for k in ("start", "end") if k in data})
+        except (TypeError, ValueError):
+            raise ValueError("start and end must be ISO datetimes")
+        if any(not isinstance(v, datetime) for v in bounds.values()):
+            raise ValueError("start and end must be ISO datetimes")
+        if len(bounds) == 2 and bounds["end"] <= bounds["start"]:
+            raise ValueError("end must be after start")
+
+
+def apply_overrides(base: Snapshot, scenario: models.Scenario) -> Snapshot:
+    """Overlay a scenario on the base; only overridden rows are copied."""
+    tables = {"post": dict(base.posts), "group": dict(base.groups), "rota_slot": dict(base.slots)}
+    post_groups = set(base.post_groups)
+    for o in scenario.overrides:
+        data = o.data or {}
+        if o.entity == "post_group":
+            pair = (data.get("post_id"), data.get("group_id"))
+            (post_groups.discard if o.op == "delete" else post_groups.add)(pair)
+            continue
+        table = tables[o.entity]
+        key = o.entity_id if o.entity_id is not None else -o.id  # scenario-only rows get negative ids
+        if o.op == "delete":
+            table.pop(key, None)
+            continue
+        if o.entity == "rota_slot":
+            data = _coerce_slot(data)
+            if key not in table and not all(k in data for k in ("post_id", "start", "end")):
+                continue  # patch of a slot outside this month's load
+        if o.entity == "group":
+            data = {"activities": [], "rules": {}, **data} if key not in table else data
+        table[key] = {**table.get(key, {}), **data}
+    return Snapshot(scenario.id, scenario.name, tables["post"], tables["group"], post_groups, tables["rota_slot"])
+
+
+def evaluate(snap: Snapshot, month: int, year: int, users: Sequence[int],
+             post_ids: Optional[Sequence[int]] = None, unavailable: Iterable[Tuple[int, str]] = (),
+             prefs: Sequence[Preference] = (), iterations: int = 2000) -> Dict[str, Any]:
+    """
+    Solve every rosterable post in the snapshot with Solver.solve_month and score the rosters.
+
+    Posts are solved one after another from one pool of `users`; anyone given a call is
+    unavailable to later posts on the days it touches (as in solver/batch.py). Night calls
+    come from the solve; the snapshot's other slots (core duties) count towards hours and
+    EWTD as they are. The call windows of vacant posts are counted as uncovered.
+    """
+    lo, hi = _month_bounds(month, year)
+    wanted = sorted(snap.posts if post_ids is None else set(snap.posts).intersection(post_ids))
+    targets = [pid for pid in wanted if snap.posts[pid].get("status", ROSTERABLE) == ROSTERABLE]
+    vacant = [pid for pid in wanted if pid not in targets]
+
+    solver = Solver(acts=snap, sink=None, rules=snap)
+    taken = set(unavailable)
+    per_user: Dict[int, list] = defaultdict(list)
+    rule_violations = covered = windows = 0
+    for pid in targets:
+        res = solver.solve_month(pid, month, year, users, unavailable=taken, prefs=prefs, iterations=iterations)
+        sol = res["solutions"][0]
+        rule_violations += len(sol["violations"])
+        windows += len(res["windows"])
+        for w, u in zip(res["windows"], sol["assignment"]):
+            if u is None:
+                continue
+            covered += 1
+            start, end = window_span(DatedWindow(w["date"], w["start"], w["end"], w["tags"], w["source"]))
+            per_user[u].append((start, end, "night_call" if "night" in w["tags"] else ",".join(w["tags"])))
+            taken.update((u, d) for d in blocked_days(w))
+    for pid in vacant:  # nobody to hold them
+        windows += len(solver.preview_month(pid, month, year)["proposed_night"])
+
+    # core duties on rosterable posts (night calls above replace the snapshot's)
+    for s in snap.slots.values():
+        if s.get("post_id") in targets and s.get("user_id") is not None and s.get("type") != "night_call":
+            per_user[s["user_id"]].append((s["start"], s["end"], s.get("type") or ""))
+
+    hours = [(uid, sum(max(0.0, (min(e, hi) - max(st, lo)).total_seconds()) for st, e, _ in recs) / 3600.0)
+             for uid, recs in per_user.items()]
+    breaches = sum(len(ewtd_check(recs)["reasons"]) for recs in per_user.values())
+
+    return {
+        "scenario_id": snap.scenario_id,
+        "name": snap.name,
+        "posts_rostered": len(targets),
+        "posts_vacant": len(vacant),
+        "fairness": round(fairness_score(hours), 3),
+        "ewtd_breaches": breaches,
+        "rule_violations": rule_violations,
+        "night_coverage": round(covered / windows, 4) if windows else 0.0,
+    }
+
+
+def _evaluate_args(args):
+    return evaluate(*args)
+
+
+def compare(db: Session, scenario_ids: Sequence[Optional[int]], month: int, year: int,
+            post_ids: Optional[Sequence[int]] = None, max_workers: Optional[int] = None,
+            iterations: int = 2000) -> List[Dict[str, Any]]:
+    """
+    Evaluate several scenarios (None = live) against one shared base load, in parallel on at
+    most `max_workers` processes. Every scenario solves for the active NCHDs, around approved
+    leave and their preferences.
+    """
+    base = load_base(db, month, year)
+    snaps = []
+    for sid in scenario_ids:
+        if sid is None:
+            snaps.append(base)
+            continue
+        sc = db.get(models.Scenario, sid)
+        if sc is None:
+            raise KeyError(sid)
+        snaps.append(apply_overrides(base, sc))
+
+    users = [u.id for u in db.query(models.User.id)
+             .filter(models.User.role == "nchd", models.User.active.isnot(False)).order_by(models.User.id)]
+    off = leave.unavailable_days(db, month, year)
+    prefs = preferences.for_pool(db, users, month, year)
+    jobs = [(s, month, year, users, post_ids, off, prefs, iterations) for s in snaps]
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [_evaluate_args(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_evaluate_args, jobs))
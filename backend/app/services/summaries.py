@@ -0,0 +1,248 @@
+# backend/app/services/summaries.py
+"""
+Incrementally maintained roster summaries for supervisor dashboards.
+
+Slot inserts/updates/deletes mark the affected (user, week) and (user, month)
+buckets dirty; before the transaction commits only those buckets are
+recomputed from `rota_slots` (one indexed user/time range read per user), so
+reports are plain reads of `summary_weekly` / `summary_monthly_calls`. A week's
+48h check is the rolling average over the REFERENCE_WEEKS weeks ending with
+it, so a change also marks the weeks whose window it falls in.
+"""
+from __future__ import annotations
+
+import os
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..engine import duty_periods
+
+WeekKey = Tuple[int, date]
+MonthKey = Tuple[int, date]
+
+# rest checks look at the duty just before a week, so pull a little history in
+REST_LOOKBACK = timedelta(days=2)
+
+MAX_DUTY = timedelta(hours=24)
+MIN_DAILY_REST = timedelta(hours=11)
+AVERAGE_WEEK_HOURS = 48.0
+REFERENCE_WEEKS = int(os.environ.get("COMPLIANCE_REFERENCE_WEEKS", "17"))
+WEEK = timedelta(days=7)
+
+
+def week_start(d) -> date:
+    d = d.date() if isinstance(d, datetime) else d
+    return d - timedelta(days=d.weekday())
+
+
+def month_start(d) -> date:
+    d = d.date() if isinstance(d, datetime) else d
+    return d.replace(day=1)
+
+
+def _weeks_touched(start: datetime, end: datetime) -> Iterable[date]:
+    w = week_start(start)
+    last = week_start(end)
+    # a change can create/remove a rest breach at the start of the following week, and it is
+    # part of the rolling average of the REFERENCE_WEEKS - 1 weeks after it
+    last += (REFERENCE_WEEKS - 1) * WEEK
+    while w <= last:
+        yield w
+        w += WEEK
+
+
+def _hours_in(start: datetime, end: datetime, lo: datetime, hi: datetime) -> float:
+    s, e = max(start, lo), min(end, hi)
+    return max((e - s).total_seconds(), 0.0) / 3600.0
+
+
+def _midnight(d: date) -> datetime:
+    return datetime.combine(d, datetime.min.time())
+
+
+def _by_week(start: datetime, end: datetime) -> Iterable[Tuple[date, float]]:
+    """(week, hours of start..end inside it) for every week the span touches."""
+    w = week_start(start)
+    while _midnight(w) < end:
+        yield w, _hours_in(start, end, _midnight(w), _midnight(w + WEEK))
+        w += WEEK
+
+
+# --- recompute ---------------------------------------------------------------
+def refresh_weeks(db: Session, user_id: int, weeks: Iterable[date]) -> None:
+    weeks = sorted(set(weeks))
+    if not weeks:
+        return
+    lo = _midnight(weeks[0] - (REFERENCE_WEEKS - 1) * WEEK)  # start of the first week's averaging window
+    hi = _midnight(weeks[-1] + WEEK)
+    rows = (
+        db.query(models.RotaSlot.start, models.RotaSlot.end, models.RotaSlot.type)
+        .filter(models.RotaSlot.user_id == user_id,
+                models.RotaSlot.start >= lo - REST_LOOKBACK - models.MAX_SLOT_SPAN,  # partition pruning
+                models.RotaSlot.start < hi + timedelta(days=1),
+                models.RotaSlot.end > lo - REST_LOOKBACK)
+        .all()
+    )
+    slots: Counter = Counter()
+    for r in rows:
+        slots.update(w for w, h in _by_week(r.start, r.end) if h > 0)
+    # hours of merged duty, so a call overlapping a base slot is not counted twice
+    periods = duty_periods([(r.start, r.end, r.type) for r in rows])
+    hours: Dict[date, float] = defaultdict(float)
+    # breaches are attributed to the week in which the offending duty period starts
+    breaches: Counter = Counter()
+    prev_end = None
+    for start, end in periods:
+        for w, h in _by_week(start, end):
+            hours[w] += h
+        if end - start > MAX_DUTY:
+            breaches[week_start(start)] += 1
+        if prev_end is not None and start - prev_end < MIN_DAILY_REST:
+            breaches[week_start(start)] += 1
+        prev_end = end
+
+    existing = {
+        r.week_start: r for r in db.query(models.WeeklySummary)
+        .filter(models.WeeklySummary.user_id == user_id,
+                models.WeeklySummary.week_start >= weeks[0], models.WeeklySummary.week_start <= weeks[-1])
+    }
+    for wk in weeks:
+        row = existing.get(wk)
+        if not slots[wk]:
+            if row is not None:
+                db.delete(row)
+            continue
+        window = sum(hours[wk - k * WEEK] for k in range(REFERENCE_WEEKS))
+        if row is None:
+            row = models.WeeklySummary(user_id=user_id, week_start=wk)
+            db.add(row)
+        row.hours = round(hours[wk], 2)
+        row.slots = slots[wk]
+        row.ewtd_breaches = breaches[wk] + (1 if window / REFERENCE_WEEKS > AVERAGE_WEEK_HOURS else 0)
+
+
+def refresh_week(db: Session, user_id: int, wk: date) -> None:
+    refresh_weeks(db, user_id, [wk])
+
+
+def refresh_month(db: Session, user_id: int, mon: date) -> None:
+    lo = datetime.combine(mon, datetime.min.time())
+    nxt = (mon + timedelta(days=32)).replace(day=1)
+    hi = datetime.combine(nxt, datetime.min.time())
+    counts: Counter = Counter()
+    for t, n in (db.query(models.RotaSlot.type, func.count())
+                 .filter(models.RotaSlot.user_id == user_id,
+                         models.RotaSlot.start >= lo, models.RotaSlot.start < hi)
+                 .group_by(models.RotaSlot.type)):
+        counts[t or ""] += n  # stored under "" (the key is part of the primary key)
+    existing = {
+        r.type: r for r in db.query(models.MonthlyCallSummary)
+        .filter(models.MonthlyCallSummary.user_id == user_id, models.MonthlyCallSummary.month == mon)
+    }
+    for t, row in existing.items():
+        if t not in counts:
+            db.delete(row)
+    for t, n in counts.items():
+        row = existing.get(t)
+        if row is None:
+            db.add(models.MonthlyCallSummary(user_id=user_id, month=mon, type=t, count=n))
+        else:
+            row.count = n
+
+
+def refresh(db: Session, weeks: Set[WeekKey], months: Set[MonthKey]) -> None:
+    by_user = defaultdict(list)
+    for user_id, wk in weeks:
+        by_user[user_id].append(wk)
+    with db.no_autoflush:
+        for user_id in sorted(by_user):
+            refresh_weeks(db, user_id, by_user[user_id])
+        for user_id, mon in sorted(months):
+            refresh_month(db, user_id, mon)
+
+
+def rebuild_all(db: Session, since: Optional[date] = None) -> dict:
+    """
+    Full backfill (initial deploy, or after bulk SQL edits bypassing the ORM). With `since`, summary rows
+    from the week / month containing it onwards are dropped and rebuilt, so buckets whose slots are gone
+    disappear too.
+    """
+    q = db.query(models.RotaSlot.user_id, models.RotaSlot.start, models.RotaSlot.end) \
+        .filter(models.RotaSlot.user_id.isnot(None))
+    if since is not None:
+        first_week, first_month = week_start(since), month_start(since)
+        lo = datetime.combine(min(first_week, first_month), datetime.min.time())
+        q = q.filter(models.RotaSlot.start >= lo - models.MAX_SLOT_SPAN, models.RotaSlot.end >= lo)
+    weeks: Set[WeekKey] = set()
+    months: Set[MonthKey] = set()
+    for user_id, start, end in q.yield_per(5000):
+        weeks.update((user_id, w) for w in _weeks_touched(start, end))
+        months.add((user_id, month_start(start)))
+    if since is None:
+        db.query(models.WeeklySummary).delete()
+        db.query(models.MonthlyCallSummary).delete()
+    else:
+        db.query(models.WeeklySummary).filter(models.WeeklySummary.week_start >= first_week).delete()
+        db.query(models.MonthlyCallSummary).filter(models.MonthlyCallSummary.month >= first_month).delete()
+    refresh(db, weeks, months)
+    db.commit()
+    return {"weeks": len(weeks), "months": len(months)}
+
+
+# --- session hooks -------------------------------------------------------------
+def _mark(session: Session, user_id, start, end) -> None:
+    if user_id is None or start is None or end is None:
+        return
+    dirty = session.info.setdefault("summary_dirty", (set(), set()))
+    dirty[0].update((user_id, w) for w in _weeks_touched(start, end))
+    dirty[1].add((user_id, month_start(start)))
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    moved = []
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, models.RotaSlot):
+            continue
+        _mark(session, obj.user_id, obj.start, obj.end)
+        if obj in session.dirty and obj.id is not None:
+            moved.append(obj.id)
+    if moved:
+        # also refresh the buckets rows are moving out of; the DB still holds the
+        # pre-flush values (attribute history is empty for expired attributes)
+        with session.no_autoflush:
+            old = session.execute(
+                select(models.RotaSlot.user_id, models.RotaSlot.start, models.RotaSlot.end)
+                .where(models.RotaSlot.id.in_(moved))
+            ).all()
+        for user_id, start, end in old:
+            _mark(session, user_id, start, end)
+
+
+def _before_commit(session: Session) -> None:
+    dirty = session.info.pop("summary_dirty", None)
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+        more = session.info.pop("summary_dirty", None)
+        if more:
+            dirty = (dirty[0] | more[0], dirty[1] | more[1]) if dirty else more
+    if dirty:
+        refresh(session, *dirty)
+        session.flush()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("summary_dirty", None)
+
+
+def install(session_factory) -> None:
+    """Attach summary maintenance hooks to a sessionmaker (idempotent)."""
+    if event.contains(session_factory, "before_commit", _before_commit):
+        return
+    event.listen(session_factory, "before_flush", _before_flush)
+    event.listen(session_factory, "before_commit", _before_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
@@ -1,10 +1,274 @@
-from typing import Iterable
-from .interfaces import DatedWindow
+from __future__ import annotations
+
+import os
+import random
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Iterable, Mapping, Sequence
+
+from .interfaces import DatedWindow, Preference
+from .objectives import ObjectiveSpec, non_dominated
+from .rules import window_span
+
+HARD_WEIGHT = 1000.0  # a hard 'on' request outweighs any realistic sum of soft ones
+CONTINUITY_TAGS = frozenset({"night", "day", "team"})
+
+def as_preferences(prefs) -> list[Preference]:
+    """Preference records as-is; a legacy {(user, date): weight} map means whole days, positive = wants on."""
+    if isinstance(prefs, Mapping):
+        return [Preference(u, d, kind="on" if w > 0 else "off", weight=abs(w)) for (u, d), w in prefs.items()]
+    return list(prefs or ())
 
 def candidates_day_call(baseline: Iterable[DatedWindow]) -> list[DatedWindow]:
     # TODO: generate from call policy and availability
     return []
 
-def candidates_night_call(baseline: Iterable[DatedWindow]) -> list[DatedWindow]:
-    # TODO: generate from call policy and availability
-    return []
+def candidates_night_call(baseline: Iterable[DatedWindow], month: int | None = None, year: int | None = None,
+                          hours: Sequence[Sequence[str]] = ()) -> list[DatedWindow]:
+    """One window per day of the month for each call-hours window (e.g. Group.rules "hours")."""
+    # TODO: thin out by availability once leave/rest feed into the baseline
+    if not (month and year and hours):
+        return []
+    out = []
+    d = date(year, month, 1)
+    while d.month == month:
+        for start, end in hours:
+            out.append(DatedWindow(date=d.isoformat(), start=start, end=end, tags=["night"], source="candidate:night_call"))
+        d += timedelta(days=1)
+    return out
+
+
+# --- allocation ---------------------------------------------------------------
+class AllocationModel:
+    """
+    Everything about a solve that does not depend on the objective weights:
+    window spans/hours, rest conflicts, caps and preferences. Built once and
+    shared by every weighting (and every worker process) in a Pareto run.
+    """
+
+    def __init__(self, windows: Sequence[DatedWindow], users: Sequence[int],
+                 caps: Mapping[str, int] | None = None, min_rest_hours: float = 11.0,
+                 prefs: Sequence[Preference] | Mapping[tuple[int, str], float] | None = None,
+                 unavailable: Iterable[tuple[int, str]] = (),
+                 postcall_capacity: Mapping[str, int] | None = None,
+                 rest_blocked: Iterable[DatedWindow] = ()):
+        self.windows = sorted(windows, key=lambda w: (w.date, w.start))
+        self.users = list(users)
+        self.caps = dict(caps or {})
+        self.unavailable = set(unavailable)
+        self.postcall_capacity = dict(postcall_capacity or {})
+
+        spans = [window_span(w) for w in self.windows]
+        self.dates = [w.date for w in self.windows]
+        self.hours = [(e - s).total_seconds() / 3600.0 for s, e in spans]
+        self.months = [w.date[:7] for w in self.windows]
+        self._index_preferences(prefs, spans)
+        # nights whose post-call rest overlaps a forbidden-tag activity (engine._preview): nobody may hold them
+        blocked = {(w.date, w.start, w.end) for w in rest_blocked}
+        self.rest_blocked = [(w.date, w.start, w.end) in blocked for w in self.windows]
+        self.capped_tags = [[t for t in w.tags if t in self.caps] for w in self.windows]
+        # a night call takes its holder off the ward on the day it ends (post-call)
+        self.postcall = [e.date().isoformat() if "night" in w.tags and e.date().isoformat() in self.postcall_capacity
+                         else None for w, (_, e) in zip(self.windows, spans)]
+
+        wd = [date.fromisoformat(d).weekday() for d in self.dates]
+        self.weekend_idx = [i for i, w in enumerate(self.windows)
+                            if wd[i] >= 5 or (wd[i] == 4 and "night" in w.tags)]
+
+        # windows one user cannot both hold: overlapping or closer than min rest (sweep on sorted starts)
+        rest = timedelta(hours=min_rest_hours)
+        starts = [s for s, _ in spans]
+        order = sorted(range(len(spans)), key=lambda i: starts[i])
+        sorted_starts = [starts[i] for i in order]
+        self.conflicts: list[list[int]] = [[] for _ in spans]
+        for i, (s, e) in enumerate(spans):
+            hi = bisect_left(sorted_starts, e + rest)
+            for k in range(bisect_left(sorted_starts, s), hi):
+                j = order[k]
+                if j != i:
+                    self.conflicts[i].append(j)
+                    self.conflicts[j].append(i)
+
+        # continuity: consecutive-day windows of one kind (a post's nights, a team's days) that one
+        # NCHD could hold in a row, i.e. not already ruled out by rest
+        runs: dict[tuple, list[int]] = defaultdict(list)
+        for i, w in enumerate(self.windows):
+            if CONTINUITY_TAGS.intersection(w.tags):
+                runs[(w.start, w.end, tuple(sorted(w.tags)))].append(i)
+        self.continuity_pairs = [
+            (i, j) for idx in runs.values() for i, j in zip(idx, idx[1:])
+            if date.fromisoformat(self.dates[j]) - date.fromisoformat(self.dates[i]) == timedelta(days=1)
+            and j not in self.conflicts[i]
+        ]
+
+    def _index_preferences(self, prefs, spans) -> None:
+        """
+        Match each preference to the windows it concerns, once, so objectives and tallies only
+        walk those (a pool's worth of preferences costs O(prefs) here, not O(prefs x windows)).
+        A dated preference covers windows dated that day; a timed one covers windows it overlaps.
+        """
+        by_date: dict[str, list[int]] = defaultdict(list)
+        for i, w in enumerate(self.windows):
+            by_date[w.date].append(i)
+        pool = set(self.users)
+        self.prefs: list[Preference] = []
+        self.pref_terms: list[tuple[int, bool, float, tuple[int, ...]]] = []  # (user, wants_on, weight, windows)
+        self.blocked: set[tuple[int, int]] = set()                           # (window, user) hard 'off'
+        for p in as_preferences(prefs):
+            if p.user_id not in pool:
+                continue
+            if p.start is None:
+                wins = tuple(by_date.get(p.date, ()))
+            else:
+                s, e = window_span(DatedWindow(p.date, p.start, p.end or p.start, [], "preference"))
+                if e <= s:
+                    e = s + timedelta(days=1)
+                prev = (date.fromisoformat(p.date) - timedelta(days=1)).isoformat()
+                wins = tuple(i for i in by_date.get(prev, []) + by_date.get(p.date, [])
+                             if spans[i][0] < e and spans[i][1] > s)
+            if not wins:
+                continue  # nothing in this solve can honour or break it
+            self.prefs.append(p)
+            if p.hard and p.kind == "off":
+                self.blocked.update((i, p.user_id) for i in wins)
+                continue
+            self.pref_terms.append((p.user_id, p.kind == "on", HARD_WEIGHT if p.hard else p.weight, wins))
+
+    def preference_tally(self, a: Sequence[int | None]) -> list[dict]:
+        """Per user: preferences this solve could affect, how many were honoured, weight missed."""
+        rows: dict[int, dict] = {}
+        for p in self.prefs:
+            r = rows.setdefault(p.user_id, {"user_id": p.user_id, "total": 0, "honoured": 0, "missed_weight": 0.0})
+            r["total"] += 1
+            if p.hard and p.kind == "off":
+                r["honoured"] += 1  # enforced by feasible()
+        for u, on, w, wins in self.pref_terms:
+            if any(a[i] == u for i in wins) == on:
+                rows[u]["honoured"] += 1
+            else:
+                rows[u]["missed_weight"] += w
+        return [rows[u] for u in sorted(rows)]
+
+    def feasible(self, a: Sequence[int | None], i: int, u: int, counts: Mapping[tuple, int]) -> bool:
+        if self.rest_blocked[i] or (u, self.dates[i]) in self.unavailable or (i, u) in self.blocked:
+            return False
+        if any(a[j] == u for j in self.conflicts[i]):
+            return False
+        for t in self.capped_tags[i]:
+            if counts.get((u, t, self.months[i]), 0) >= self.caps[t]:
+                return False
+        pc = self.postcall[i]
+        if pc is not None and counts.get(("postcall", pc), 0) >= self.postcall_capacity[pc]:
+            return False
+        return True
+
+    def _bump(self, counts: dict, i: int, u: int | None, delta: int) -> None:
+        if u is None:
+            return
+        for t in self.capped_tags[i]:
+            counts[(u, t, self.months[i])] += delta
+        if self.postcall[i] is not None:
+            counts[("postcall", self.postcall[i])] += delta
+
+
+def solve(model: AllocationModel, spec: ObjectiveSpec, seed: int = 0, iterations: int = 2000) -> dict:
+    """Greedy construction followed by reassign/swap local search under `spec`."""
+    rng = random.Random(seed)
+    n = len(model.windows)
+    a: list[int | None] = [None] * n
+    counts: dict = defaultdict(int)
+    users = list(model.users)
+
+    def score():
+        return spec.score(spec.values(model, a))
+
+    for i in range(n):
+        best, best_score = None, None
+        rng.shuffle(users)  # break ties differently per seed
+        for u in users:
+            if not model.feasible(a, i, u, counts):
+                continue
+            a[i] = u
+            sc = score()
+            if best_score is None or sc < best_score:
+                best, best_score = u, sc
+        a[i] = best
+        model._bump(counts, i, best, +1)
+
+    current = score()
+    for _ in range(iterations if n and users else 0):
+        i = rng.randrange(n)
+        old = a[i]
+        if rng.random() < 0.5:
+            u = rng.choice(users)
+            if u == old:
+                continue
+            model._bump(counts, i, old, -1)
+            a[i] = None
+            if model.feasible(a, i, u, counts):
+                a[i] = u
+                model._bump(counts, i, u, +1)
+                sc = score()
+                if sc < current:
+                    current = sc
+                    continue
+                model._bump(counts, i, u, -1)
+            a[i] = old
+            model._bump(counts, i, old, +1)
+        else:
+            j = rng.randrange(n)
+            if a[j] == old:
+                continue
+            other = a[j]
+            for k, v in ((i, old), (j, other)):
+                model._bump(counts, k, v, -1)
+            a[i], a[j] = None, None
+            ok = ((other is None or model.feasible(a, i, other, counts))
+                  and (old is None or model.feasible(a, j, old, counts)))
+            a[i], a[j] = other, old
+            if ok:
+                sc = score()
+                if sc < current:
+                    current = sc
+                    model._bump(counts, i, other, +1)
+                    model._bump(counts, j, old, +1)
+                    continue
+            a[i], a[j] = old, other
+            for k, v in ((i, old), (j, other)):
+                model._bump(counts, k, v, +1)
+
+    values = spec.values(model, a)
+    return {
+        "weights": dict(spec.weights),
+        "order": list(spec.order),
+        "assignment": a,
+        "objectives": {k: round(v, 4) for k, v in values.items()},
+        "preferences": model.preference_tally(a),
+    }
+
+
+_WORKER_MODEL: AllocationModel | None = None
+
+def _init_worker(model: AllocationModel) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = model
+
+def _solve_in_worker(args) -> dict:
+    spec, seed, iterations = args
+    return solve(_WORKER_MODEL, spec, seed=seed, iterations=iterations)
+
+def pareto_front(model: AllocationModel, specs: Sequence[ObjectiveSpec], seed: int = 0,
+                 iterations: int = 2000, max_workers: int | None = None) -> list[dict]:
+    """Solve each weighting in parallel over one shared model; keep the non-dominated rosters."""
+    jobs = [(spec, seed + k, iterations) for k, spec in enumerate(specs)]
+    max_workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if max_workers <= 1:
+        results = [solve(model, s, seed=sd, iterations=it) for s, sd, it in jobs]
+    else:
+        # the model is pickled once per worker via the initializer, not once per job
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(model,)) as pool:
+            results = list(pool.map(_solve_in_worker, jobs))
+    keys = sorted({k for s in specs for k in s.names} | {"uncovered"})
+    return non_dominated(results, keys)
@@ -0,0 +1,295 @@
+"""
+Offline batch solving from a scenario file (no database).
+
+Scenario file (JSON):
+
+    {
+      "users":  [{"id": 1, "name": "NCHD 1", "role": "nchd"}, ...]   or a count, e.g. 14
+      "groups": [{"id": 1, "name": "Pool", "kind": "on_call_pool",
+                  "rules": {...}, "activities": [{"kind": "weekly", ...}, ...]}, ...],
+      "posts":  [{"id": 1, "title": "Gen Adult 1", "site": "...", "status": "ACTIVE_ROSTERABLE",
+                  "group_ids": [1]}, ...],
+      "leave":  [{"user_id": 3, "start": "2025-02-10", "end": "2025-02-14"}, ...],
+      "preferences": [{"user_id": 3, "date": "2025-02-14", "kind": "off", "weight": 2, "hard": false}, ...],
+      "pools":  {"1": [1, 2, 3]},            optional post_id -> user ids (default: every NCHD)
+      "months": ["2025-01", "2025-02"],
+      "objectives": {"weights": {"fairness": 1}}   optional, same shape as POST /solve/month
+    }
+
+Posts whose pools share anyone are solved one after another within a month,
+each seeing the earlier posts' assignments as unavailability, so nobody holds
+calls in two posts that touch the same calendar day (no double-booked nights,
+no call straight into or out of another post's night).
+Each such chain per month is one job; jobs run in a process pool that
+receives the scenario snapshot once per worker.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..engine import ewtd_check
+from .engine import Solver
+from .interfaces import PREFERENCE_KINDS, DatedWindow, Preference
+from .objectives import ObjectiveSpec
+from .rules import window_span
+from .snapshot import ROSTERABLE, Snapshot
+
+ROSTER_COLUMNS = ["post_id", "post_title", "site", "month", "date", "start", "end", "tags", "user_id"]
+COMPLIANCE_COLUMNS = ["user_id", "month", "slots", "hours", "night_calls", "weekend_calls",
+                      "ewtd_ok", "ewtd_reasons", "rule_violations"]
+
+
+# --- loading ------------------------------------------------------------------
+def load_scenario(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        sc = json.load(f)
+    users = sc.get("users", [])
+    if isinstance(users, int):  # seed.json style volume
+        users = [{"id": i, "name": f"NCHD {i}", "role": "nchd"} for i in range(1, users + 1)]
+    sc["users"] = users
+    sc.setdefault("groups", [])
+    sc.setdefault("posts", [])
+    sc.setdefault("leave", [])
+    sc.setdefault("preferences", [])
+    sc.setdefault("months", [])
+    return sc
+
+
+def snapshot_from(sc: Dict[str, Any]) -> Snapshot:
+    groups = {
+        int(g["id"]): {"name": g.get("name", f"Group {g['id']}"), "kind": g.get("kind", "generic"),
+                       "rules": g.get("rules") or {}, "activities": list(g.get("activities") or [])}
+        for g in sc["groups"]
+    }
+    posts = {
+        int(p["id"]): {"title": p.get("title", f"Post {p['id']}"), "site": p.get("site"),
+                       "grade": p.get("grade"), "fte": p.get("fte", 1.0),
+                       "status": p.get("status", ROSTERABLE), "core_hours": p.get("core_hours") or {},
+                       "eligibility": p.get("eligibility") or {}}
+        for p in sc["posts"]
+    }
+    post_groups = {(int(p["id"]), int(g)) for p in sc["posts"] for g in p.get("group_ids", [])}
+    return Snapshot(None, sc.get("name", "batch"), posts, groups, post_groups, slots={})
+
+
+def leave_days(leave: Iterable[Dict[str, Any]]) -> set:
+    """Expand inclusive leave date ranges to (user_id, "YYYY-MM-DD") pairs."""
+    out = set()
+    for lv in leave:
+        d = date.fromisoformat(str(lv["start"])[:10])
+        end = date.fromisoformat(str(lv.get("end") or lv["start"])[:10])
+        while d <= end:
+            out.add((int(lv["user_id"]), d.isoformat()))
+            d += timedelta(days=1)
+    return out
+
+
+def preference_records(prefs: Iterable[Dict[str, Any]]) -> List[Preference]:
+    """Scenario preferences -> records, checked like POST /preferences (ValueError names the bad entry)."""
+    out = []
+    for i, p in enumerate(prefs):
+        if not isinstance(p, dict):
+            raise ValueError(f"preferences[{i}]: expected an object")
+        user_id, day = p.get("user_id"), p.get("date")
+        if isinstance(user_id, bool) or not (isinstance(user_id, int)
+                                             or (isinstance(user_id, str) and user_id.strip().isdigit())):
+            raise ValueError(f"preferences[{i}]: user_id must be an integer")
+        try:
+            day = date.fromisoformat(str(day)[:10]).isoformat()
+        except ValueError:
+            raise ValueError(f"preferences[{i}]: date must be YYYY-MM-DD")
+        for k in ("start", "end"):
+            if p.get(k) is not None and not (isinstance(p[k], str) and re.fullmatch(r"\d{2}:\d{2}", p[k])):
+                raise ValueError(f"preferences[{i}]: {k} must be HH:MM")
+        kind, hard, weight = p.get("kind") or "off", p.get("hard", False), p.get("weight", 1.0)
+        if kind not in PREFERENCE_KINDS:
+            raise ValueError(f"preferences[{i}]: kind must be one of {list(PREFERENCE_KINDS)}")
+        if not isinstance(hard, bool):
+            raise ValueError(f"preferences[{i}]: hard must be true or false")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+            raise ValueError(f"preferences[{i}]: weight must be a number")
+        if weight < 0:
+            raise ValueError(f"preferences[{i}]: weight must be >= 0 (kind says on/off)")
+        out.append(Preference(user_id=int(user_id), date=day, start=p.get("start"),
+                              end=p.get("end"), kind=kind, weight=float(weight), hard=hard))
+    return out
+
+
+def parse_months(months: Sequence[str]) -> List[Tuple[int, int]]:
+    out = []
+    for m in months:
+        if ".." in m:
+            lo, hi = m.split("..")
+            y, mo = map(int, lo.split("-"))
+            hy, hm = map(int, hi.split("-"))
+            while (y, mo) <= (hy, hm):
+                out.append((y, mo))
+                y, mo = (y + 1, 1) if mo == 12 else (y, mo + 1)
+        else:
+            y, mo = map(int, m.split("-"))
+            out.append((y, mo))
+    return sorted(set(out))
+
+
+# --- workers ------------------------------------------------------------------
+_SNAP: Optional[Snapshot] = None
+
+def _init_worker(snap: Snapshot) -> None:
+    global _SNAP
+    _SNAP = snap
+
+def blocked_days(w: Dict[str, Any]) -> List[str]:
+    """Start dates another post's call can't have: any call (at most overnight) starting then would touch `w`."""
+    start, end = window_span(DatedWindow(w["date"], w["start"], w["end"], [], "roster"))
+    d, out = start.date() - timedelta(days=1), []
+    while d <= end.date():
+        out.append(d.isoformat())
+        d += timedelta(days=1)
+    return out
+
+
+def _run_job(job) -> List[Dict[str, Any]]:
+    """Solve one chain of posts for a month in order; later posts can't use anyone already on those days."""
+    year, month, chain, spec, unavailable, prefs, iterations = job
+    solver = Solver(acts=_SNAP, sink=None, rules=_SNAP)
+    taken = set(unavailable)
+    out = []
+    for post_id, users in chain:
+        res = solver.solve_month(post_id, month, year, users, objectives=spec,
+                                 unavailable=taken, prefs=prefs, iterations=iterations)
+        sol = res["solutions"][0]
+        post = _SNAP.posts[post_id]
+        rows = []
+        for w, u in zip(res["windows"], sol["assignment"]):
+            rows.append({
+                "post_id": post_id, "post_title": post["title"], "site": post.get("site"),
+                "month": f"{year:04d}-{month:02d}", "date": w["date"], "start": w["start"], "end": w["end"],
+                "tags": ",".join(w["tags"]), "user_id": u,
+            })
+            if u is not None:
+                taken.update((u, d) for d in blocked_days(w))
+        out.append({"post_id": post_id, "month": f"{year:04d}-{month:02d}", "rows": rows,
+                    "objectives": sol["objectives"], "violations": sol["violations"]})
+    return out
+
+
+def chains(pools: Dict[int, List[int]]) -> List[List[int]]:
+    """Group post ids whose pools overlap (transitively); each group must be solved in sequence."""
+    parent = {p: p for p in pools}
+
+    def find(p):
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    owner: Dict[int, int] = {}
+    for post_id in sorted(pools):
+        for u in pools[post_id]:
+            if u in owner:
+                parent[find(post_id)] = find(owner[u])
+            else:
+                owner[u] = post_id
+    groups = defaultdict(list)
+    for post_id in sorted(pools):
+        groups[find(post_id)].append(post_id)
+    return sorted(groups.values())
+
+
+# --- driver -------------------------------------------------------------------
+def run(sc: Dict[str, Any], months: Optional[Sequence[str]] = None, workers: Optional[int] = None,
+        iterations: int = 2000) -> Dict[str, Any]:
+    snap = snapshot_from(sc)
+    spec = ObjectiveSpec.from_payload(sc.get("objectives"))
+    off = leave_days(sc["leave"])
+    nchds = sorted(int(u["id"]) for u in sc["users"] if u.get("role", "nchd") == "nchd" and u.get("active", True))
+    pools = {int(k): [int(u) for u in v] for k, v in (sc.get("pools") or {}).items()}
+    prefs = preference_records(sc["preferences"])
+
+    post_pools = {post_id: pools.get(post_id, nchds)
+                  for post_id, p in sorted(snap.posts.items()) if p["status"] == ROSTERABLE}
+    groups = chains(post_pools)
+
+    jobs = []
+    for year, month in parse_months(months or sc["months"]):
+        prefix = f"{year:04d}-{month:02d}"
+        month_off = {x for x in off if x[1].startswith(prefix)}
+        lo = (date(year, month, 1) - timedelta(days=1)).isoformat()
+        hi = (date(year, month, 28) + timedelta(days=4)).replace(day=1).isoformat()
+        month_prefs = [p for p in prefs if lo <= p.date <= hi]
+        for chain in groups:
+            jobs.append((year, month, [(post_id, post_pools[post_id]) for post_id in chain],
+                         spec, month_off, month_prefs, iterations))
+
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        _init_worker(snap)
+        done = [_run_job(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snap,)) as pool:
+            done = list(pool.map(_run_job, jobs))
+    results = [res for chain in done for res in chain]
+
+    roster = [r for res in results for r in res["rows"]]
+    return {"roster": roster, "compliance": compliance(roster, results), "jobs": len(jobs)}
+
+
+def compliance(roster: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per user and month: hours, call counts and EWTD check over everything they were rostered on."""
+    by_user = defaultdict(list)
+    for r in roster:
+        if r["user_id"] is not None:
+            by_user[(r["user_id"], r["month"])].append(r)
+    violations = defaultdict(list)
+    for res in results:
+        for v in res["violations"]:
+            if v.startswith("user "):
+                uid = int(v.split(":", 1)[0][5:])
+                violations[(uid, res["month"])].append(f"post {res['post_id']}: {v.split(': ', 1)[1]}")
+
+    out = []
+    for (uid, month), rows in sorted(by_user.items()):
+        recs = []
+        weekend = 0
+        for r in rows:
+            start, end = window_span(DatedWindow(r["date"], r["start"], r["end"], [], "roster"))
+            recs.append((start, end, r["tags"]))
+            if start.weekday() >= 5 or (start.weekday() == 4 and "night" in r["tags"]):
+                weekend += 1
+        check = ewtd_check(recs)
+        out.append({
+            "user_id": uid, "month": month, "slots": len(rows),
+            "hours": round(sum((e - s).total_seconds() for s, e, _ in recs) / 3600.0, 2),
+            "night_calls": sum(1 for r in rows if "night" in r["tags"].split(",")),
+            "weekend_calls": weekend,
+            "ewtd_ok": check["ok"], "ewtd_reasons": "; ".join(check["reasons"]),
+            "rule_violations": "; ".join(violations.get((uid, month), [])),
+        })
+    return out
+
+
+# --- output -------------------------------------------------------------------
+def write_table(rows: List[Dict[str, Any]], columns: List[str], path_base: str, fmt: str) -> str:
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow); use --format csv instead.")
+        table = pa.table({c: [r.get(c) for r in rows] for c in columns})
+        path = path_base + ".parquet"
+        pq.write_table(table, path)
+        return path
+    path = path_base + ".csv"
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+    return path
@@ -0,0 +1,174 @@
+"""
+Content-addressed cache for solver results.
+
+Keys are a SHA-256 of the canonical JSON of everything a solve reads (post,
+month, expanded activity windows, group rules, solver version, ...), so any
+input change simply produces a different key and only that entry goes cold;
+nothing has to be invalidated explicitly. Entries live in an in-memory LRU
+bounded by count and bytes, optionally backed by one file per key on disk so
+a restart keeps the warm set.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def solve_key(inputs: Any) -> str:
+    text = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024,
+                 path: Optional[str] = None, max_disk_entries: int = 5000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = self.misses = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    # --- public -----------------------------------------------------------------
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            blob = self._mem.get(key)
+            if blob is not None:
+                self._mem.move_to_end(key)
+        if blob is None and self.path:
+            blob = self._read_disk(key)
+            if blob is not None:
+                with self._lock:
+                    self._remember(key, blob)
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if blob is None else json.loads(blob)
+
+    def put(self, key: str, value: dict) -> dict:
+        """Store `value`; returns it as a later `get` would (JSON round-trip), so hits and misses look alike."""
+        blob = json.dumps(value, separators=(",", ":"), default=str).encode()
+        with self._lock:
+            self._remember(key, blob)
+            self._puts += 1
+            prune = self.path and self._puts % 100 == 0
+        if self.path:
+            self._write_disk(key, blob)
+            if prune:
+                self._prune_disk()
+        return json.loads(blob)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+        if self.path:
+            for name in os.listdir(self.path):
+                if name.endswith(".json"):
+                    os.unlink(os.path.join(self.path, name))
+
+    def stats(self) -> dict:
+        return {"entries": len(self._mem), "bytes": self._bytes, "hits": self.hits, "misses": self.misses,
+                "path": self.path}
+
+    # --- internals ----------------------------------------------------------------
+    def _remember(self, key: str, blob: bytes) -> None:
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        if len(blob) > self.max_bytes:
+            return
+        self._mem[key] = blob
+        self._bytes += len(blob)
+        while len(self._mem) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._mem.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._file(key), "rb") as f:
+                blob = f.read()
+            os.utime(self._file(key))  # mtime doubles as last-used for pruning
+            return blob
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, blob: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, self._file(key))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def _prune_disk(self) -> None:
+        try:
+            entries = [e for e in os.scandir(self.path) if e.name.endswith(".json")]
+        except OSError:
+            return
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[: len(entries) - self.max_disk_entries]:
+            try:
+                os.unlink(e.path)
+            except OSError:
+                pass
+
+
+_default: Optional[ResultCache] = None
+
+def default_cache() -> ResultCache:
+    """Process-wide cache configured from SOLVE_CACHE_DIR / SOLVE_CACHE_MAX_ENTRIES / SOLVE_CACHE_MAX_MB."""
+    global _default
+    if _default is None:
+        _default = ResultCache(
+            max_entries=int(os.environ.get("SOLVE_CACHE_MAX_ENTRIES", "512")),
+            max_bytes=int(os.environ.get("SOLVE_CACHE_MAX_MB", "64")) * 1024 * 1024,
+            path=os.environ.get("SOLVE_CACHE_DIR") or None,
+        )
+    return _default
+
+
+_tenants: Dict[str, Tuple[Optional[int], ResultCache]] = {}  # slug -> (max_mb it was built for, cache)
+_tenants_lock = threading.Lock()
+
+def tenant_cache(slug: str, max_mb: Optional[int] = None) -> ResultCache:
+    """
+    Per-tenant cache bounded by the tenant's `max_mb` (None = SOLVE_CACHE_MAX_MB), so one
+    tenant's churn never evicts another's warm set. Public without a limit of its own is
+    `default_cache()`; other tenants persist under SOLVE_CACHE_DIR/<slug>. A changed limit
+    rebuilds the in-memory LRU (persisted entries stay on disk).
+    """
+    if slug == "public" and max_mb is None:
+        return default_cache()
+    with _tenants_lock:
+        built = _tenants.get(slug)
+        if built is None or built[0] != max_mb:
+            root = os.environ.get("SOLVE_CACHE_DIR")
+            cache = ResultCache(
+                max_entries=int(os.environ.get("SOLVE_CACHE_MAX_ENTRIES", "512")),
+                max_bytes=(max_mb or int(os.environ.get("SOLVE_CACHE_MAX_MB", "64"))) * 1024 * 1024,
+                path=(root if slug == "public" else os.path.join(root, slug)) if root else None,
+            )
+            built = _tenants[slug] = (max_mb, cache)
+        return built[1]
@@ -1,11 +1,40 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable
 from .interfaces import DatedWindow
+from .rules import window_span
 
 def overlaps(a: DatedWindow, b: DatedWindow) -> bool:
-    return (a.date == b.date) and not (a.end <= b.start or b.end <= a.start)
-
-def forbid_rest_on_tag(rest_windows: list[DatedWindow], activities: list[DatedWindow], forbidden: set[str]) -> bool:
-    for r in rest_windows:
-        for act in activities:
-            if forbidden.intersection(act.tags) and overlaps(r, act):
-                return True
-    return False
+    """Whether two windows share any time (spans, so windows crossing midnight compare correctly)."""
+    sa, ea = window_span(a)
+    sb, eb = window_span(b)
+    return sa < eb and sb < ea
+
+def index_by_date(windows: Iterable[DatedWindow], tags: set[str] | frozenset | None = None) -> dict[str, list[DatedWindow]]:
+    """Bucket windows by date, optionally keeping only those carrying one of `tags`."""
+    idx: dict[str, list[DatedWindow]] = defaultdict(list)
+    for w in windows:
+        if tags is None or tags.intersection(w.tags):
+            idx[w.date].append(w)
+    return idx
+
+def postcall_rest(w: DatedWindow, hours: float) -> DatedWindow | None:
+    """The rest owed after a night window: `hours` from its end (capped at a day). None for other windows."""
+    if "night" not in w.tags or hours <= 0:
+        return None
+    _, end = window_span(w)
+    until = end + min(timedelta(hours=hours), timedelta(hours=23, minutes=59))  # a window spans under a day
+    return DatedWindow(date=end.date().isoformat(), start=f"{end:%H:%M}", end=f"{until:%H:%M}",
+                       tags=["rest"], source="postcall")
+
+def rest_clashes(rest: DatedWindow, activities: dict[str, list[DatedWindow]], forbidden: set[str] | frozenset) -> list[DatedWindow]:
+    """Activities (indexed with index_by_date) carrying a `forbidden` tag that overlap `rest`."""
+    day = date.fromisoformat(rest.date)
+    near = [(day + timedelta(days=k)).isoformat() for k in (-1, 0, 1)]  # activities may cross midnight, so may rest
+    return [act for d in near for act in activities.get(d, ())
+            if forbidden.intersection(act.tags) and overlaps(rest, act)]
+
+def forbid_rest_on_tag(rest_windows: list[DatedWindow], activities: list[DatedWindow] | dict[str, list[DatedWindow]], forbidden: set[str]) -> bool:
+    # `activities` may be pre-indexed with index_by_date(acts, forbidden) when checked repeatedly
+    by_date = activities if isinstance(activities, dict) else index_by_date(activities, forbidden)
+    return any(rest_clashes(r, by_date, forbidden) for r in rest_windows)
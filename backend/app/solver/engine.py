@@ -1,27 +1,145 @@
-from .interfaces import DatedWindow, ActivityProvider, AssignmentSink
+from dataclasses import astuple
+
+from .interfaces import DatedWindow, ActivityProvider, AssignmentSink, RuleProvider, Preference
 from .calendar import merge_baseline
-from .allocations import candidates_day_call, candidates_night_call
-from .constraints import forbid_rest_on_tag
+from .allocations import (candidates_day_call, candidates_night_call, AllocationModel, solve, pareto_front,
+                          as_preferences)
+from .objectives import ObjectiveSpec
+from .constraints import index_by_date, postcall_rest, rest_clashes
+from .rules import compile_rules, merge, CompiledRules, RuleError
+from .cache import ResultCache, solve_key
+
+# Bump whenever solver logic changes in a way that alters results: it is part of every cache key.
+SOLVER_VERSION = "2025.10.3"
 
 class Solver:
-    def __init__(self, acts: ActivityProvider, sink: AssignmentSink):
+    def __init__(self, acts: ActivityProvider, sink: AssignmentSink, rules: RuleProvider | None = None,
+                 cache: ResultCache | None = None):
         self.acts = acts
         self.sink = sink
+        self.rules = rules
+        self.cache = cache
 
-    def preview_month(self, post_id: int, month: int, year: int) -> dict:
+    def compiled_rules(self, post_id: int) -> CompiledRules:
+        """
+        Strictest combination of the post's group rules (each compiled once, cached by hash).
+        Stored rules that no longer validate raise RuleError naming the post.
+        """
+        docs = self.rules.rules_for_post(post_id) if self.rules else []
+        try:
+            return merge(compile_rules(d) for d in docs)
+        except RuleError as e:
+            raise RuleError(f"post {post_id}: stored group rules are invalid ({e})") from e
+
+    def _month_inputs(self, post_id: int, month: int, year: int):
+        """Gather a month's solve inputs and their content key (normalised, order-independent)."""
+        rules = self.compiled_rules(post_id)
         acts = list(self.acts.windows_for_post(post_id, month, year))
+        acts += rules.protected_windows(month, year)
+        # Post.eligibility and the post's existing slots are not solver inputs (nothing is pinned),
+        # so they stay out of the key until the solve reads them
+        key = solve_key({
+            "v": SOLVER_VERSION,
+            "post_id": post_id, "month": month, "year": year,
+            "rules": rules.hash,
+            "windows": sorted([w.date, w.start, w.end, sorted(w.tags), w.source] for w in acts),
+        })
+        return rules, acts, key
+
+    def _cached(self, key: str, compute) -> dict:
+        if self.cache is None:
+            return compute()
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+        return self.cache.put(key, compute())
+
+    def preview_month(self, post_id: int, month: int, year: int) -> dict:
+        rules, acts, key = self._month_inputs(post_id, month, year)
+        return self._cached(key, lambda: self._preview(rules, acts, month, year))
+
+    def _preview(self, rules: CompiledRules, acts: list[DatedWindow], month: int, year: int) -> dict:
         baseline = merge_baseline(core=[], acts=acts)
 
         day = candidates_day_call(baseline)
-        night = candidates_night_call(baseline)
+        night = candidates_night_call(baseline, month, year, rules.call_hours)
 
-        rest_windows: list[DatedWindow] = []
-        forbidden = {"clinic","opd"}
-        if forbid_rest_on_tag(rest_windows, acts, forbidden):
-            night = []
+        # a night whose post-call rest runs over a forbidden-tag activity cannot be held by this post
+        forbidden = rules.forbidden_tags
+        activities = index_by_date(acts, forbidden)
+        rest_blocked = [w for w in night
+                        if (rest := postcall_rest(w, rules.rest_hours)) and rest_clashes(rest, activities, forbidden)]
 
         return {
             "baseline": [w.__dict__ for w in baseline],
             "proposed_day": [w.__dict__ for w in day],
             "proposed_night": [w.__dict__ for w in night],
+            "rest_blocked": [w.__dict__ for w in rest_blocked],
+            "rules_hash": rules.hash,
         }
+
+    def solve_month(self, post_id: int, month: int, year: int, users: list[int],
+                    objectives: ObjectiveSpec | None = None, pareto: list[ObjectiveSpec] | None = None,
+                    prefs: list[Preference] | dict | None = None, iterations: int = 2000, seed: int = 0,
+                    unavailable: set | None = None, postcall_capacity: dict | None = None,
+                    max_workers: int | None = None) -> dict:
+        """
+        Assign `users` to the month's call windows; `unavailable` holds (user_id, "YYYY-MM-DD") pairs
+        (leave, hard days off). `prefs` are Preference records (or the legacy {(user, date): weight});
+        when there are any, a weighted objective gains "preferences" at weight 1 unless already set.
+        `postcall_capacity` maps "YYYY-MM-DD" to how many people the ward can lose that day
+        (services/coverage.py); night calls ending that day are capped at it. With `pareto`, every
+        weighting is solved in parallel (on at most `max_workers` processes, e.g. the tenant's
+        solver_workers) over one shared AllocationModel and only non-dominated rosters are returned.
+        """
+        users = sorted(set(users))  # order would otherwise leak into tie-breaking and the key
+        pool = set(users)
+        prefs = [p for p in as_preferences(prefs) if p.user_id in pool]
+        objectives = objectives or ObjectiveSpec()
+        if prefs and not objectives.order and "preferences" not in objectives.weights:
+            objectives = ObjectiveSpec(weights={**objectives.weights, "preferences": 1.0})
+        rules, acts, month_key = self._month_inputs(post_id, month, year)
+        key = solve_key({
+            "month": month_key,
+            "users": users,
+            "objectives": _spec_key(objectives or ObjectiveSpec()),
+            "pareto": [_spec_key(p) for p in pareto or []],
+            "prefs": sorted((list(astuple(p)) for p in prefs), key=str),
+            "unavailable": sorted([u, d] for u, d in (unavailable or ()) if d[:7] == f"{year:04d}-{month:02d}"),
+            "postcall": sorted((postcall_capacity or {}).items()),
+            "iterations": iterations, "seed": seed,
+        })
+        return self._cached(key, lambda: self._solve(post_id, rules, acts, month, year, users,
+                                                     objectives, pareto, prefs, iterations, seed, unavailable,
+                                                     postcall_capacity, max_workers))
+
+    def _solve(self, post_id, rules, acts, month, year, users, objectives, pareto, prefs, iterations, seed,
+               unavailable=None, postcall_capacity=None, max_workers=None) -> dict:
+        preview = self._preview(rules, acts, month, year)
+        windows = [DatedWindow(**w) for w in preview["proposed_day"] + preview["proposed_night"]]
+        model = AllocationModel(
+            windows, users,
+            caps={c.kind: rules.cap_for(c.kind) for c in rules.caps},
+            min_rest_hours=rules.rest_hours,
+            prefs=prefs,
+            unavailable=unavailable or (),
+            postcall_capacity=postcall_capacity,
+            rest_blocked=[DatedWindow(**w) for w in preview["rest_blocked"]],
+        )
+        if pareto:
+            solutions = pareto_front(model, pareto, seed=seed, iterations=iterations, max_workers=max_workers)
+        else:
+            solutions = [solve(model, objectives or ObjectiveSpec(), seed=seed, iterations=iterations)]
+        for sol in solutions:
+            pairs = [(w, u) for w, u in zip(model.windows, sol["assignment"]) if u is not None]
+            sol["violations"] = rules.check([w for w, _ in pairs], [u for _, u in pairs], acts)
+        return {
+            "post_id": post_id,
+            "rules_hash": rules.hash,
+            "windows": [w.__dict__ for w in model.windows],
+            "solutions": solutions,
+        }
+
+
+def _spec_key(spec: ObjectiveSpec) -> list:
+    return [sorted(spec.weights.items()), list(spec.order)]
@@ -1,4 +1,4 @@
-from typing import Protocol, Iterable
+from typing import Protocol, Iterable, Any, Mapping
 from dataclasses import dataclass
 
 @dataclass
@@ -9,9 +9,24 @@ class DatedWindow:
     tags: list[str]
     source: str  # 'core' | 'activity:GroupName' | 'assignment'
 
+PREFERENCE_KINDS = ("off", "on")
+
+@dataclass(frozen=True)
+class Preference:
+    user_id: int
+    date: str                  # "YYYY-MM-DD"
+    start: str | None = None   # "HH:MM"; None = every window dated that day
+    end: str | None = None     # may cross midnight
+    kind: str = "off"          # 'off' | 'on'
+    weight: float = 1.0
+    hard: bool = False         # hard 'off' blocks the windows; hard 'on' is weighted HARD_WEIGHT
+
 class ActivityProvider(Protocol):
     def windows_for_post(self, post_id: int, month: int, year: int) -> Iterable[DatedWindow]: ...
 
 class AssignmentSink(Protocol):
     def preview(self, allocations: list[DatedWindow]) -> dict: ...
     def persist(self, allocations: list[DatedWindow]) -> dict: ...
+
+class RuleProvider(Protocol):
+    def rules_for_post(self, post_id: int) -> Iterable[Mapping[str, Any]]: ...
@@ -0,0 +1,122 @@
+"""
+Roster objectives (all minimised) and how to combine them.
+
+Each objective takes the allocation model and a per-window assignment vector
+(user id or None) and returns a float. An ObjectiveSpec turns the objective
+values into a comparable score, either a weighted sum or a lexicographic tuple.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Sequence, TYPE_CHECKING
+
+from ..engine import fairness_score
+
+if TYPE_CHECKING:
+    from .allocations import AllocationModel
+
+Assignment = Sequence[int | None]
+
+
+def fairness(m: "AllocationModel", a: Assignment) -> float:
+    """Stddev of on-call hours across the whole pool (idle users count as 0h)."""
+    hours = dict.fromkeys(m.users, 0.0)
+    for i, u in enumerate(a):
+        if u is not None:
+            hours[u] += m.hours[i]
+    return fairness_score(list(hours.items()))
+
+def continuity(m: "AllocationModel", a: Assignment) -> float:
+    """Handovers between consecutive-day night/team windows one NCHD could have kept."""
+    return float(sum(1 for i, j in m.continuity_pairs if a[i] is not None and a[j] is not None and a[i] != a[j]))
+
+def preferences(m: "AllocationModel", a: Assignment) -> float:
+    """Weight of soft preferences not honoured ('off': not given any of its windows; 'on': given one)."""
+    missed = 0.0
+    for u, on, w, wins in m.pref_terms:
+        if any(a[i] == u for i in wins) != on:
+            missed += w
+    return missed
+
+def weekend(m: "AllocationModel", a: Assignment) -> float:
+    """Sum of squared weekend calls per user, i.e. weekend burden kept low and spread."""
+    counts: dict[int, int] = defaultdict(int)
+    for i in m.weekend_idx:
+        if a[i] is not None:
+            counts[a[i]] += 1
+    return float(sum(c * c for c in counts.values()))
+
+def uncovered(m: "AllocationModel", a: Assignment) -> float:
+    return float(sum(1 for u in a if u is None))
+
+
+OBJECTIVES: dict[str, Callable[["AllocationModel", Assignment], float]] = {
+    "fairness": fairness,
+    "continuity": continuity,
+    "preferences": preferences,
+    "weekend": weekend,
+}
+
+DEFAULT_WEIGHTS = {"fairness": 1.0}
+
+
+@dataclass(frozen=True)
+class ObjectiveSpec:
+    """Weighted sum by default; if `order` is given, compare lexicographically in that order."""
+    weights: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    order: tuple[str, ...] = ()
+
+    def __post_init__(self):
+        if not isinstance(self.weights, Mapping) or not all(
+                isinstance(w, (int, float)) and not isinstance(w, bool) for w in self.weights.values()):
+            raise ValueError("weights must be an object of objective name -> number")
+        if not all(isinstance(k, str) for k in self.order):
+            raise ValueError("lexicographic must be a list of objective names")
+        unknown = (set(self.weights) | set(self.order)) - set(OBJECTIVES)
+        if unknown:
+            raise ValueError(f"unknown objective(s) {sorted(unknown)}; known: {sorted(OBJECTIVES)}")
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return self.order or tuple(k for k, w in self.weights.items() if w)
+
+    def values(self, m: "AllocationModel", a: Assignment) -> dict[str, float]:
+        out = {name: fn(m, a) for name, fn in OBJECTIVES.items()}
+        out["uncovered"] = uncovered(m, a)
+        return out
+
+    def score(self, values: Mapping[str, float]) -> tuple:
+        # coverage always dominates: an unfilled slot is never traded for fairness
+        head = values.get("uncovered", 0.0)
+        if self.order:
+            return (head,) + tuple(values[k] for k in self.order)
+        return (head, sum(w * values[k] for k, w in self.weights.items()))
+
+    @classmethod
+    def from_payload(cls, payload: Mapping | None) -> "ObjectiveSpec":
+        payload = payload or {}
+        if not isinstance(payload, Mapping):
+            raise ValueError("objectives must be an object")
+        if "lexicographic" in payload:
+            if not isinstance(payload["lexicographic"], list):
+                raise ValueError("lexicographic must be a list of objective names")
+            return cls(weights={}, order=tuple(payload["lexicographic"]))
+        return cls(weights=dict(payload.get("weights") or DEFAULT_WEIGHTS))
+
+
+def dominates(a: Mapping[str, float], b: Mapping[str, float], keys: Sequence[str]) -> bool:
+    return all(a[k] <= b[k] for k in keys) and any(a[k] < b[k] for k in keys)
+
+def non_dominated(results: Sequence[dict], keys: Sequence[str]) -> list[dict]:
+    """Filter solve results (each with an "objectives" dict) down to the Pareto set, one per objective vector."""
+    front = []
+    seen = set()
+    for r in results:
+        sig = tuple(r["objectives"][k] for k in keys)
+        if sig in seen:
+            continue
+        if not any(dominates(o["objectives"], r["objectives"], keys) for o in results if o is not r):
+            front.append(r)
+            seen.add(sig)
+    return front
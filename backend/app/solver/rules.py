@@ -0,0 +1,273 @@
+"""
+Group.rules language: validated once, compiled into constraint objects.
+
+Accepted keys (all optional):
+
+    shift            "night" | "day" | ...       kind the cap applies to
+    cap_per_month    int >= 0                    max assignments of `shift` per month
+    hours            [["HH:MM","HH:MM"], ...]    call windows (may cross midnight)
+    min_rest_hours   number >= 0
+    forbid_rest_on_tags  ["clinic", ...]         no post-call rest over these activity tags
+    weekday + time   "Wed", ["14:00","16:00"]    protected teaching window
+    clinic_days      ["Mon", ...]                whole-day "clinic" protection
+    supervision      {"weekday": .., "time": [..]}
+    protected        [{"weekday": .., "time": [..], "tags": [..]}, ...]
+
+Compiled results are immutable and cached by a hash of the canonical JSON,
+so each distinct rules document is parsed once per process.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+from .interfaces import DatedWindow
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+DEFAULT_FORBIDDEN_TAGS = frozenset({"clinic", "opd"})  # PostCall.forbid_rest_on_activity_tags default
+
+_HHMM = re.compile(r"^([01]\d|2[0-3]):[0-5]\d$|^24:00$")
+
+KNOWN_KEYS = {
+    "shift", "cap_per_month", "hours", "min_rest_hours", "forbid_rest_on_tags",
+    "weekday", "time", "clinic_days", "supervision", "protected",
+}
+
+
+class RuleError(ValueError):
+    """Raised when a rules document does not validate; message names the offending key."""
+
+
+# --- constraint objects ---------------------------------------------------------
+@dataclass(frozen=True)
+class NumericCap:
+    kind: str        # matched against window tags, e.g. "night"
+    limit: int
+    per: str = "month"
+
+@dataclass(frozen=True)
+class ForbidTagAdjacency:
+    tags: frozenset
+
+@dataclass(frozen=True)
+class MinRest:
+    hours: float
+
+@dataclass(frozen=True)
+class ProtectedWindow:
+    weekday: str
+    start: str
+    end: str
+    tags: tuple
+
+@dataclass(frozen=True)
+class CompiledRules:
+    caps: tuple = ()                    # NumericCap
+    forbid: ForbidTagAdjacency | None = None
+    min_rest: MinRest | None = None
+    protected: tuple = ()               # ProtectedWindow
+    call_hours: tuple = ()              # (start, end)
+    hash: str = ""
+    sources: tuple = field(default=(), compare=False)
+
+    @property
+    def forbidden_tags(self) -> frozenset:
+        return self.forbid.tags if self.forbid else DEFAULT_FORBIDDEN_TAGS
+
+    @property
+    def rest_hours(self) -> float:
+        """Post-call rest owed after a night call (the min-rest rule, else the 11h default)."""
+        return self.min_rest.hours if self.min_rest else 11.0
+
+    def cap_for(self, kind: str) -> int | None:
+        limits = [c.limit for c in self.caps if c.kind == kind]
+        return min(limits) if limits else None
+
+    def protected_windows(self, month: int, year: int) -> list[DatedWindow]:
+        from ..services.activities import expand_weekly
+        out: list[DatedWindow] = []
+        for p in self.protected:
+            out.extend(expand_weekly(month, year, p.weekday, [p.start, p.end], list(p.tags), "rule"))
+        return out
+
+    def check(self, assignments: Iterable[DatedWindow], assignees: Iterable | None = None,
+              activities: Iterable[DatedWindow] = ()) -> list[str]:
+        """
+        Batch-evaluate caps, min-rest and post-call rest for proposed windows.
+        `assignees` runs parallel to `assignments` (user per window); without it
+        all windows are treated as one person's. `activities` are the post's
+        (protected windows included): a night whose post-call rest overlaps one
+        tagged with a forbidden tag is a violation.
+        """
+        from .constraints import index_by_date, postcall_rest, rest_clashes
+        assignments = list(assignments)
+        owners = list(assignees) if assignees is not None else [None] * len(assignments)
+        counts: dict[tuple, int] = {}
+        by_owner: dict = {}
+        for w, who in zip(assignments, owners):
+            by_owner.setdefault(who, []).append(w)
+            month = w.date[:7]
+            for t in w.tags:
+                counts[(who, t, month)] = counts.get((who, t, month), 0) + 1
+        out = []
+        for cap in self.caps:
+            for (who, tag, month), n in sorted(counts.items(), key=lambda kv: (str(kv[0][0]), kv[0][1:])):
+                if tag == cap.kind and n > cap.limit:
+                    prefix = f"user {who}: " if who is not None else ""
+                    out.append(f"{prefix}{cap.kind} cap {cap.limit}/{cap.per} exceeded in {month}: {n}")
+        if self.min_rest:
+            for who, ws in by_owner.items():
+                prefix = f"user {who}: " if who is not None else ""
+                spans = sorted(window_span(w) for w in ws)
+                for (_, prev_end), (start, _) in zip(spans, spans[1:]):
+                    rest = (start - prev_end).total_seconds() / 3600.0
+                    if rest < self.min_rest.hours:
+                        out.append(f"{prefix}rest below {self.min_rest.hours:g}h before {start:%Y-%m-%d %H:%M}: {rest:.1f}h")
+        forbidden = self.forbidden_tags
+        by_date = index_by_date(activities, forbidden)
+        if by_date:
+            for w, who in zip(assignments, owners):
+                rest = postcall_rest(w, self.rest_hours)
+                for act in rest_clashes(rest, by_date, forbidden) if rest else ():
+                    prefix = f"user {who}: " if who is not None else ""
+                    tags = ",".join(sorted(forbidden.intersection(act.tags)))
+                    out.append(f"{prefix}post-call rest after {w.date} overlaps {tags} on {act.date} {act.start}-{act.end}")
+        return out
+
+
+def window_span(w: DatedWindow) -> tuple[datetime, datetime]:
+    day = datetime.fromisoformat(w.date)
+    start = day + _offset(w.start)
+    end = day + _offset(w.end)
+    if end <= start:  # crosses midnight
+        end += timedelta(days=1)
+    return start, end
+
+def _offset(hhmm: str) -> timedelta:
+    h, m = hhmm.split(":")
+    return timedelta(hours=int(h), minutes=int(m))
+
+
+def merge(compiled: Iterable[CompiledRules]) -> CompiledRules:
+    """Combine the rules of every group a post belongs to (strictest wins)."""
+    compiled = [c for c in compiled if c is not None]
+    if not compiled:
+        return CompiledRules(hash=_hash("[]"))
+    if len(compiled) == 1:
+        return compiled[0]
+    caps: dict[tuple[str, str], int] = {}
+    for c in compiled:
+        for cap in c.caps:
+            key = (cap.kind, cap.per)
+            caps[key] = min(caps.get(key, cap.limit), cap.limit)
+    forbid = [c.forbid.tags for c in compiled if c.forbid]
+    rests = [c.min_rest.hours for c in compiled if c.min_rest]
+    return CompiledRules(
+        caps=tuple(NumericCap(k, v, per) for (k, per), v in sorted(caps.items())),
+        forbid=ForbidTagAdjacency(frozenset().union(*forbid)) if forbid else None,
+        min_rest=MinRest(max(rests)) if rests else None,
+        protected=tuple(p for c in compiled for p in c.protected),
+        call_hours=tuple(h for c in compiled for h in c.call_hours),
+        hash=_hash(json.dumps(sorted(c.hash for c in compiled))),
+        sources=tuple(c.hash for c in compiled),
+    )
+
+
+# --- compiler -------------------------------------------------------------------
+def canonical(rules: Mapping[str, Any] | None) -> str:
+    return json.dumps(rules or {}, sort_keys=True, separators=(",", ":"))
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+def rules_hash(rules: Mapping[str, Any] | None) -> str:
+    return _hash(canonical(rules))
+
+def compile_rules(rules: Mapping[str, Any] | None) -> CompiledRules:
+    """Validate and compile a Group.rules document (cached by content)."""
+    if rules is not None and not isinstance(rules, Mapping):
+        raise RuleError("rules: expected an object")
+    return _compile(canonical(rules))
+
+@lru_cache(maxsize=1024)
+def _compile(text: str) -> CompiledRules:
+    rules = json.loads(text)
+    unknown = set(rules) - KNOWN_KEYS
+    if unknown:
+        raise RuleError(f"rules: unknown key(s) {sorted(unknown)}; allowed: {sorted(KNOWN_KEYS)}")
+
+    caps = []
+    if "cap_per_month" in rules:
+        limit = rules["cap_per_month"]
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+            raise RuleError("cap_per_month: expected a non-negative integer")
+        kind = rules.get("shift", "night")
+        if not isinstance(kind, str) or not kind:
+            raise RuleError("shift: expected a non-empty string")
+        caps.append(NumericCap(kind, limit))
+
+    min_rest = None
+    if "min_rest_hours" in rules:
+        v = rules["min_rest_hours"]
+        if not isinstance(v, (int, float)) or isinstance(v, bool) or v < 0:
+            raise RuleError("min_rest_hours: expected a non-negative number")
+        min_rest = MinRest(float(v))
+
+    forbid = None
+    if "forbid_rest_on_tags" in rules:
+        tags = rules["forbid_rest_on_tags"]
+        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+            raise RuleError("forbid_rest_on_tags: expected a list of strings")
+        forbid = ForbidTagAdjacency(frozenset(tags))
+
+    protected = []
+    if "weekday" in rules or "time" in rules:
+        protected.append(_protected("weekday/time", rules.get("weekday"), rules.get("time"), ["teaching"]))
+    for day in _list(rules, "clinic_days"):
+        protected.append(_protected("clinic_days", day, ["00:00", "24:00"], ["clinic"]))
+    if "supervision" in rules:
+        sup = rules["supervision"]
+        if not isinstance(sup, dict):
+            raise RuleError("supervision: expected an object with weekday and time")
+        protected.append(_protected("supervision", sup.get("weekday"), sup.get("time"), ["supervision"]))
+    for i, p in enumerate(_list(rules, "protected")):
+        if not isinstance(p, dict):
+            raise RuleError(f"protected[{i}]: expected an object")
+        protected.append(_protected(f"protected[{i}]", p.get("weekday"), p.get("time"), p.get("tags") or ["protected"]))
+
+    call_hours = tuple(tuple(_window("hours", w)) for w in _list(rules, "hours"))
+
+    return CompiledRules(
+        caps=tuple(caps),
+        forbid=forbid,
+        min_rest=min_rest,
+        protected=tuple(protected),
+        call_hours=call_hours,
+        hash=_hash(text),
+    )
+
+def _list(rules: dict, key: str) -> list:
+    v = rules.get(key, [])
+    if not isinstance(v, list):
+        raise RuleError(f"{key}: expected a list")
+    return v
+
+def _window(where: str, w) -> list[str]:
+    if not (isinstance(w, list) and len(w) == 2 and all(isinstance(t, str) and _HHMM.match(t) for t in w)):
+        raise RuleError(f"{where}: expected [\"HH:MM\",\"HH:MM\"], got {w!r}")
+    return w
+
+def _protected(where: str, weekday, window, tags) -> ProtectedWindow:
+    if weekday not in WEEKDAYS:
+        raise RuleError(f"{where}: weekday must be one of {list(WEEKDAYS)}, got {weekday!r}")
+    start, end = _window(where, window)
+    if end <= start:
+        raise RuleError(f"{where}: protected window must end after it starts")
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        raise RuleError(f"{where}: tags must be a list of strings")
+    return ProtectedWindow(weekday, start, end, tuple(tags))
@@ -0,0 +1,48 @@
+# backend/app/solver/snapshot.py
+"""
+In-memory posts/groups/slots that the solver reads through its provider
+interfaces. Built from the database (services/scenarios.py, with scenario
+overrides laid on top) or from a scenario file (solver/batch.py); plain data,
+so it pickles into worker processes.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .interfaces import DatedWindow
+
+ROSTERABLE = "ACTIVE_ROSTERABLE"
+
+
+@dataclass
+class Snapshot:
+    scenario_id: Optional[int]          # None = live data
+    name: str
+    posts: Dict[int, dict]
+    groups: Dict[int, dict]             # {"name","kind","rules","activities":[pattern,...]}
+    post_groups: set
+    slots: Dict[int, dict]              # {"user_id","post_id","start","end","type"}
+    _groups_by_post: Dict[int, List[int]] = field(default=None, repr=False)
+
+    def group_ids(self, post_id: int) -> List[int]:
+        if self._groups_by_post is None:
+            idx = defaultdict(list)
+            for p, g in sorted(self.post_groups):
+                if g in self.groups:
+                    idx[p].append(g)
+            self._groups_by_post = idx
+        return self._groups_by_post.get(post_id, [])
+
+    # RuleProvider
+    def rules_for_post(self, post_id: int):
+        return [self.groups[g]["rules"] or {} for g in self.group_ids(post_id)]
+
+    # ActivityProvider
+    def windows_for_post(self, post_id: int, month: int, year: int) -> Iterable[DatedWindow]:
+        from ..services.activities import expand_pattern  # lazy: services import solver, not the reverse
+        for g in self.group_ids(post_id):
+            grp = self.groups[g]
+            for pattern in grp["activities"]:
+                yield from expand_pattern(month, year, pattern, f"activity:{grp['name']}")
@@ -0,0 +1,298 @@
+# backend/app/tenancy.py
+"""
+Schema-per-tenant isolation.
+
+Each hospital group (tenant) owns a Postgres schema `tenant_<slug>` holding
+the full table set; the `tenants` registry and single-tenant data stay in
+`public`. A request names its tenant with the `X-Tenant` header (or
+`?tenant=` where headers can't be set, e.g. EventSource) and `get_db` tags
+its session. Every transaction that session opens starts with
+`SET LOCAL search_path` to the tenant schema alone, so ORM queries and raw
+SQL stay inside it and a missing table errors instead of falling through to
+`public`. Connections go back to the shared pool clean.
+
+Solver caches and the change feed are keyed by tenant, and each tenant has
+its own bounded slots for solves and bulk imports: a burst beyond its quota
+gets 429 after a short wait instead of queueing in front of everyone else.
+
+Provision a tenant. A new schema is built from the models, with rota_slots/audits
+partitioned as in public, and then stamped at the head migration; later deploys
+upgrade it like public:
+
+    python -m app.tenancy create stjames --name "St James's" --solver-workers 4
+    python -m app.tenancy list
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+PUBLIC = "public"
+HEADER = "x-tenant"
+DEFAULT_TENANT = os.environ.get("DEFAULT_TENANT", PUBLIC)
+SOLVER_WORKERS = int(os.environ.get("TENANT_SOLVER_WORKERS", "2"))
+IMPORT_WORKERS = int(os.environ.get("TENANT_IMPORT_WORKERS", "2"))
+QUOTA_WAIT_SECONDS = float(os.environ.get("TENANT_QUOTA_WAIT_SECONDS", "5"))
+REGISTRY_TTL_SECONDS = float(os.environ.get("TENANT_REGISTRY_TTL_SECONDS", "60"))
+
+_SLUG = re.compile(r"^[a-z][a-z0-9_]{0,39}$")
+
+
+def schema_for(slug: str) -> str:
+    return PUBLIC if slug == PUBLIC else f"tenant_{slug}"
+
+
+@dataclass(frozen=True)
+class Tenant:
+    slug: str
+    schema: str
+    solver_workers: int = SOLVER_WORKERS
+    import_workers: int = IMPORT_WORKERS
+    cache_mb: Optional[int] = None   # None = SOLVE_CACHE_MAX_MB
+
+    def limit(self, kind: str) -> int:
+        return max(1, self.solver_workers if kind == "solve" else self.import_workers)
+
+
+PUBLIC_TENANT = Tenant(PUBLIC, PUBLIC)
+
+
+# --- registry -------------------------------------------------------------------
+def _load_from_db() -> List[Tenant]:
+    from sqlalchemy import inspect
+    from . import models
+    from .db import SessionLocal, engine
+    if not inspect(engine).has_table(models.Tenant.__tablename__):
+        return []
+    with SessionLocal() as db:  # untagged session: reads public.tenants
+        return [Tenant(t.slug, t.schema, t.solver_workers, t.import_workers, t.cache_mb)
+                for t in db.query(models.Tenant).filter(models.Tenant.active.isnot(False))]
+
+
+class Registry:
+    """Active tenants by slug, reloaded at most every `ttl` seconds (new tenants show up within that)."""
+
+    def __init__(self, loader: Callable[[], List[Tenant]] = _load_from_db, ttl: float = REGISTRY_TTL_SECONDS):
+        self.loader = loader
+        self.ttl = ttl
+        self._by_slug: Dict[str, Tenant] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self, slug: str) -> Optional[Tenant]:
+        if slug == PUBLIC:
+            return PUBLIC_TENANT
+        with self._lock:
+            return self._fresh().get(slug)
+
+    def all(self) -> List[Tenant]:
+        with self._lock:
+            return list(self._fresh().values())
+
+    def _fresh(self) -> Dict[str, Tenant]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            self._by_slug = {t.slug: t for t in self.loader()}
+            self._loaded_at = time.monotonic()
+        return self._by_slug
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+
+registry = Registry()
+
+
+def resolve(request: Request, reg: Optional[Registry] = None) -> Tenant:
+    slug = request.headers.get(HEADER) or request.query_params.get("tenant") or DEFAULT_TENANT
+    if not _SLUG.match(slug):
+        raise HTTPException(status_code=422, detail="tenant must be a lowercase slug")
+    tenant = (reg or registry).get(slug)
+    if tenant is None:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant {slug!r}")
+    return tenant
+
+
+# --- session routing ------------------------------------------------------------
+def bind(db: Session, tenant: Tenant) -> Session:
+    db.info["tenant"] = tenant
+    return db
+
+
+def current(db: Session) -> Tenant:
+    return db.info.get("tenant") or PUBLIC_TENANT
+
+
+def _after_begin(session: Session, transaction, connection) -> None:
+    tenant = session.info.get("tenant")
+    if tenant is None or tenant.schema == PUBLIC:
+        return
+    if connection.dialect.name != "postgresql":
+        raise RuntimeError(f"tenant {tenant.slug!r} needs Postgres schemas; refusing to read the shared tables")
+    # LOCAL: reverts at commit/rollback, so pooled connections never carry a tenant's path
+    connection.exec_driver_sql(f'SET LOCAL search_path TO "{tenant.schema}"')
+
+
+def install(session_factory) -> None:
+    """Route every transaction of a tenant-tagged session to its schema (idempotent)."""
+    if not event.contains(session_factory, "after_begin", _after_begin):
+        event.listen(session_factory, "after_begin", _after_begin)
+
+
+# --- quotas ---------------------------------------------------------------------
+class Quotas:
+    """Per-tenant concurrency slots by kind ("solve", "import")."""
+
+    def __init__(self, wait: float = QUOTA_WAIT_SECONDS):
+        self.wait = wait
+        self._sems: Dict[Tuple[str, str], Tuple[int, threading.BoundedSemaphore]] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, tenant: Tenant, kind: str) -> threading.BoundedSemaphore:
+        limit = tenant.limit(kind)
+        with self._lock:
+            held = self._sems.get((tenant.slug, kind))
+            if held is None or held[0] != limit:  # quota changed in the registry: holders release the old one
+                held = (limit, threading.BoundedSemaphore(limit))
+                self._sems[(tenant.slug, kind)] = held
+            return held[1]
+
+    def acquire(self, tenant: Tenant, kind: str) -> Callable[[], None]:
+        """Take a slot now (429 as for `slot`); the returned release may be called more than once."""
+        sem = self._semaphore(tenant, kind)
+        if not sem.acquire(timeout=self.wait):
+            raise HTTPException(status_code=429, headers={"Retry-After": str(max(1, round(self.wait)))},
+                                detail=f"tenant {tenant.slug!r} already has {tenant.limit(kind)} {kind} job(s) running")
+        held = [True]
+        lock = threading.Lock()
+
+        def release() -> None:
+            with lock:
+                if held[0]:
+                    held[0] = False
+                    sem.release()
+        return release
+
+    @contextmanager
+    def slot(self, tenant: Tenant, kind: str) -> Iterator[None]:
+        release = self.acquire(tenant, kind)
+        try:
+            yield
+        finally:
+            release()
+
+
+quotas = Quotas()
+
+
+# --- provisioning ---------------------------------------------------------------
+def tenant_metadata():
+    """
+    The tenant table set: every model except the public `tenants` registry (the partitioned
+    tables carry their composite keys and PARTITION BY from the models).
+    """
+    from sqlalchemy import MetaData
+    from . import models
+    meta = MetaData()
+    for table in models.Base.metadata.sorted_tables:
+        if table.name != models.Tenant.__tablename__:
+            table.to_metadata(meta)
+    return meta
+
+
+def alembic_config(slug: str):
+    from alembic.config import Config
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cfg = Config()
+    cfg.set_main_option("script_location", os.path.join(here, "migrations"))
+    cfg.cmd_opts = argparse.Namespace(x=[f"tenant={slug}"])
+    return cfg
+
+
+def _provision(schema: str) -> None:
+    from .db import engine
+    from .services import partitions
+    with engine.begin() as conn:  # one transaction: a failed provision leaves nothing behind
+        conn.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        conn.exec_driver_sql(f'SET LOCAL search_path TO "{schema}"')
+        tenant_metadata().create_all(conn)
+        for table in partitions.PARTITIONED:
+            conn.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+            partitions.ensure_partitions(conn, table)
+
+
+def migrate(slug: str) -> None:
+    """
+    Bring the tenant's schema to the latest migration. A new schema is created from the models
+    (which cover every table the chain creates; tests/test_tenancy.py checks the sets match) and
+    stamped at head; one that already has a version table is upgraded.
+    """
+    from alembic import command
+    from sqlalchemy import inspect
+    from .db import engine
+    schema = schema_for(slug)
+    if inspect(engine).has_table("alembic_version", schema=schema):
+        command.upgrade(alembic_config(slug), "head")
+    else:
+        _provision(schema)
+        command.stamp(alembic_config(slug), "head")
+
+
+def create(slug: str, name: str, solver_workers: int = SOLVER_WORKERS, import_workers: int = IMPORT_WORKERS,
+           cache_mb: Optional[int] = None) -> Tenant:
+    from . import models
+    from .db import SessionLocal, engine
+    if not _SLUG.match(slug) or slug == PUBLIC:
+        raise ValueError("slug must be a lowercase identifier other than 'public'")
+    if engine.dialect.name != "postgresql":
+        raise ValueError("tenants need a Postgres DATABASE_URL")
+    migrate(slug)  # schema first, so the registry never points at an empty one
+    with SessionLocal() as db:
+        row = db.query(models.Tenant).filter(models.Tenant.slug == slug).one_or_none()
+        if row is None:
+            row = models.Tenant(slug=slug, schema=schema_for(slug))
+            db.add(row)
+        row.name, row.solver_workers, row.import_workers, row.cache_mb = name, solver_workers, import_workers, cache_mb
+        row.active = True
+        db.commit()
+    registry.invalidate()
+    return Tenant(slug, schema_for(slug), solver_workers, import_workers, cache_mb)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.tenancy")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("create", help="create or update a tenant and migrate its schema")
+    c.add_argument("slug")
+    c.add_argument("--name", required=True)
+    c.add_argument("--solver-workers", type=int, default=SOLVER_WORKERS)
+    c.add_argument("--import-workers", type=int, default=IMPORT_WORKERS)
+    c.add_argument("--cache-mb", type=int, default=None)
+    sub.add_parser("migrate", help="upgrade every tenant schema to head")
+    sub.add_parser("list")
+    args = ap.parse_args(argv)
+    if args.cmd == "create":
+        t = create(args.slug, args.name, args.solver_workers, args.import_workers, args.cache_mb)
+        print(f"{t.slug}: schema {t.schema}, solve x{t.solver_workers}, import x{t.import_workers}")
+    elif args.cmd == "migrate":
+        for t in registry.all():
+            migrate(t.slug)
+            print(f"{t.slug}: migrated")
+    else:
+        for t in registry.all():
+            print(f"{t.slug}\t{t.schema}\tsolve x{t.solver_workers}\timport x{t.import_workers}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
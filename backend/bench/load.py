@@ -0,0 +1,337 @@
+# backend/bench/load.py
+"""
+HTTP load test: boot the API against a disposable database, seed it at a
+given scale and step up concurrency over a realistic dashboard mix.
+
+    cd backend && python -m bench.load                       # auto: local Postgres if initdb is on PATH, else SQLite
+    python -m bench.load --db sqlite --scale users=400,posts=60,sites=4,months=3 \\
+        --levels 1,4,16,64 --duration 20 --workers 2 --json /tmp/load.json
+    python -m bench.load --database-url postgresql+psycopg://...   # an existing, disposable DB
+
+A throwaway Postgres cluster is created with initdb/pg_ctl (PG_BIN or PATH)
+in a temp dir and removed afterwards. The schema comes from the models
+(create_all), not the Alembic chain, so rota_slots is not partitioned there.
+
+Per concurrency level the report gives p50/p95/p99 latency per operation,
+throughput, errors, and connection-pool saturation sampled from /health/pool.
+With --workers > 1 each uvicorn worker has its own pool and the sample
+reflects whichever worker answered.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, weight); see Driver.request for what each does
+MIX = [
+    ("list_posts", 25),
+    ("rota_range", 30),
+    ("weekly_hours", 10),
+    ("preview", 20),
+    ("group_edit", 10),
+    ("list_groups", 5),
+]
+
+
+# --- database -----------------------------------------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pg_bin(name: str) -> Optional[str]:
+    base = os.environ.get("PG_BIN")
+    return os.path.join(base, name) if base else shutil.which(name)
+
+
+@contextmanager
+def disposable_database(kind: str) -> Iterator[str]:
+    if kind == "auto":
+        kind = "postgres" if _pg_bin("initdb") else "sqlite"
+    tmp = tempfile.mkdtemp(prefix="nchd-load-")
+    try:
+        if kind == "sqlite":
+            yield f"sqlite:///{os.path.join(tmp, 'load.db')}"
+            return
+        if not _pg_bin("initdb"):
+            raise SystemExit("initdb not found; set PG_BIN, use --db sqlite or pass --database-url")
+        data, port = os.path.join(tmp, "pg"), _free_port()
+        subprocess.run([_pg_bin("initdb"), "-D", data, "-U", "roster", "--auth=trust", "-E", "UTF8"],
+                       check=True, stdout=subprocess.DEVNULL)
+        subprocess.run([_pg_bin("pg_ctl"), "-D", data, "-l", os.path.join(tmp, "pg.log"), "-w",
+                        "-o", f"-p {port} -k {tmp} -c listen_addresses=127.0.0.1 -c max_connections=300",
+                        "start"], check=True, stdout=subprocess.DEVNULL)
+        try:
+            subprocess.run([_pg_bin("createdb"), "-h", "127.0.0.1", "-p", str(port), "-U", "roster", "rosterdb"],
+                           check=True)
+            yield f"postgresql+psycopg://roster@127.0.0.1:{port}/rosterdb"
+        finally:
+            subprocess.run([_pg_bin("pg_ctl"), "-D", data, "-m", "fast", "stop"], stdout=subprocess.DEVNULL)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def create_schema(url: str) -> None:
+    """Run in a child process so app.db binds to `url`, not to this process's DATABASE_URL."""
+    code = "from app import models; from app.db import engine; models.Base.metadata.create_all(engine)"
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env={**os.environ, "DATABASE_URL": url}, check=True)
+
+
+# --- server -------------------------------------------------------------------
+@contextmanager
+def server(url: str, scale: str, workers: int, pool_size: int, max_overflow: int) -> Iterator[Tuple[str, int]]:
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": url, "SEED_SCALE": scale,
+           "DB_POOL_SIZE": str(pool_size), "DB_MAX_OVERFLOW": str(max_overflow)}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND, env=env)
+    try:
+        deadline = time.time() + 600  # startup seeds at scale
+        while True:
+            if proc.poll() is not None:
+                raise SystemExit(f"server exited with {proc.returncode}")
+            try:
+                status, _ = _get(("127.0.0.1", port), "/health")
+                if status == 200:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise SystemExit("server did not become healthy")
+            time.sleep(0.5)
+        yield ("127.0.0.1", port)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _get(addr, path):
+    conn = http.client.HTTPConnection(*addr, timeout=60)
+    try:
+        conn.request("GET", path)
+        r = conn.getresponse()
+        return r.status, r.read()
+    finally:
+        conn.close()
+
+
+# --- load ---------------------------------------------------------------------
+class Driver:
+    """One keep-alive connection per thread, replaying the weighted MIX."""
+
+    def __init__(self, addr, fixtures: dict, seed: int):
+        self.addr = addr
+        self.fx = fixtures
+        self.rng = random.Random(seed)
+        self.conn = http.client.HTTPConnection(*addr, timeout=60)
+        names, weights = zip(*MIX)
+        self.names, self.cum = names, [sum(weights[:i + 1]) for i in range(len(weights))]
+
+    def pick(self) -> str:
+        x = self.rng.uniform(0, self.cum[-1])
+        return next(n for n, c in zip(self.names, self.cum) if x <= c)
+
+    def request(self, op: str) -> Tuple[str, str, Optional[bytes]]:
+        fx, rng = self.fx, self.rng
+        if op == "list_posts":
+            return "GET", "/posts", None
+        if op == "list_groups":
+            return "GET", "/groups", None
+        if op == "rota_range":
+            d = fx["start"] + timedelta(days=rng.randrange(fx["days"]))
+            scope = rng.choice([f"&post_id={rng.choice(fx['posts'])}", f"&site={fx['site']}", ""])
+            return "GET", f"/rota?start={d}&end={d + timedelta(days=6)}{scope}", None
+        if op == "weekly_hours":
+            return "GET", f"/reports/weekly-hours?start={fx['start']}&end={fx['start'] + timedelta(days=27)}", None
+        if op == "preview":
+            m = fx["start"] + timedelta(days=rng.randrange(fx["days"]))
+            return "GET", f"/solve/preview?post_id={rng.choice(fx['posts'])}&month={m.month}&year={m.year}", None
+        if op == "group_edit":
+            g = rng.choice(fx["groups"])
+            body = {"rules": {**g["rules"], "cap_per_month": rng.randint(5, 8)}} if g["kind"] == "on_call_pool" \
+                else {"name": g["name"]}
+            return "PUT", f"/groups/{g['id']}", json.dumps(body).encode()
+        raise ValueError(op)
+
+    def call(self, op: str) -> Tuple[float, bool]:
+        method, path, body = self.request(op)
+        headers = {"Accept-Encoding": "gzip"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        t = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            r = self.conn.getresponse()
+            r.read()
+            ok = r.status < 400
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(*self.addr, timeout=60)
+            ok = False
+        return time.perf_counter() - t, ok
+
+
+def fixtures(addr, scale_start: date, months: int) -> dict:
+    _, body = _get(addr, "/posts")
+    posts = [p for p in json.loads(body) if p["status"] == "ACTIVE_ROSTERABLE"]
+    _, body = _get(addr, "/groups")
+    groups = json.loads(body)
+    sites = sorted({p["site"] for p in posts if p["site"]})
+    return {"posts": [p["id"] for p in posts], "groups": groups, "site": sites[0] if sites else "Newcastle",
+            "start": scale_start, "days": max(1, 28 * months)}
+
+
+def percentile(sorted_ms: List[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = max(0, min(len(sorted_ms) - 1, int(round(q / 100.0 * len(sorted_ms) + 0.5)) - 1))
+    return sorted_ms[k]
+
+
+def run_level(addr, fx: dict, concurrency: int, duration: float, warmup: float) -> dict:
+    lat: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    stop = threading.Event()
+    measuring = threading.Event()
+    pool_samples: List[dict] = []
+
+    def worker(i):
+        d = Driver(addr, fx, seed=concurrency * 1000 + i)
+        while not stop.is_set():
+            op = d.pick()
+            dt, ok = d.call(op)
+            if measuring.is_set():
+                with lock:
+                    lat[op].append(dt * 1000)
+                    if not ok:
+                        errors[op] += 1
+
+    def sampler():
+        while not stop.is_set():
+            if measuring.is_set():
+                try:
+                    status, body = _get(addr, "/health/pool")
+                    if status == 200:
+                        pool_samples.append(json.loads(body))
+                except OSError:
+                    pass
+            time.sleep(0.25)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    threads.append(threading.Thread(target=sampler, daemon=True))
+    for t in threads:
+        t.start()
+    time.sleep(warmup)
+    measuring.set()
+    t0 = time.perf_counter()
+    time.sleep(duration)
+    measuring.clear()
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in threads:
+        t.join(timeout=70)
+
+    ops = {}
+    for op, xs in sorted(lat.items()):
+        xs.sort()
+        ops[op] = {"count": len(xs), "errors": errors.get(op, 0), "p50_ms": round(percentile(xs, 50), 2),
+                   "p95_ms": round(percentile(xs, 95), 2), "p99_ms": round(percentile(xs, 99), 2)}
+    every = sorted(x for xs in lat.values() for x in xs)
+    sat = [s.get("saturation", 0.0) for s in pool_samples]
+    return {
+        "concurrency": concurrency,
+        "requests": len(every),
+        "throughput_rps": round(len(every) / elapsed, 1),
+        "errors": sum(errors.values()),
+        "p50_ms": round(percentile(every, 50), 2),
+        "p95_ms": round(percentile(every, 95), 2),
+        "p99_ms": round(percentile(every, 99), 2),
+        "pool_saturation_max": max(sat) if sat else None,
+        "pool_saturation_mean": round(sum(sat) / len(sat), 3) if sat else None,
+        "pool_checked_out_max": max((s.get("checked_out", 0) for s in pool_samples), default=None),
+        "ops": ops,
+    }
+
+
+def print_report(meta: dict, levels: List[dict]) -> None:
+    print(f"db={meta['db']} scale={meta['scale']} workers={meta['workers']} "
+          f"pool={meta['pool_size']}+{meta['max_overflow']} duration={meta['duration']}s")
+    print(f"{'conc':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7} {'pool max':>9} {'pool avg':>9}")
+    for r in levels:
+        print(f"{r['concurrency']:>5} {r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+              f"{r['errors']:>7} {str(r['pool_saturation_max']):>9} {str(r['pool_saturation_mean']):>9}")
+    last = levels[-1]
+    print(f"\nper operation at concurrency {last['concurrency']}:")
+    for op, o in last["ops"].items():
+        print(f"  {op:14} n={o['count']:<6} p50={o['p50_ms']:<8} p95={o['p95_ms']:<8} p99={o['p99_ms']:<8} "
+              f"errors={o['errors']}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.load")
+    ap.add_argument("--db", choices=["auto", "postgres", "sqlite"], default="auto")
+    ap.add_argument("--database-url", help="use this (disposable!) database instead of creating one")
+    ap.add_argument("--scale", default="users=200,posts=30,sites=3,months=2",
+                    help='SEED_SCALE: "k=v,..." or a JSON file (see app.seed.SeedScale)')
+    ap.add_argument("--levels", default="1,2,4,8,16,32", help="concurrency steps")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds measured per level")
+    ap.add_argument("--warmup", type=float, default=2.0)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    ap.add_argument("--pool-size", type=int, default=5)
+    ap.add_argument("--max-overflow", type=int, default=10)
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, BACKEND)
+    from app.seed import SeedScale
+    scale = SeedScale.parse(args.scale)
+    levels = [int(x) for x in args.levels.split(",")]
+
+    @contextmanager
+    def database():
+        if args.database_url:
+            yield args.database_url
+        else:
+            with disposable_database(args.db) as url:
+                yield url
+
+    with database() as url:
+        create_schema(url)
+        with server(url, args.scale, args.workers, args.pool_size, args.max_overflow) as addr:
+            fx = fixtures(addr, scale.start, scale.months)
+            results = [run_level(addr, fx, c, args.duration, args.warmup) for c in levels]
+
+    meta = {"db": url.split(":", 1)[0], "scale": args.scale, "workers": args.workers,
+            "pool_size": args.pool_size, "max_overflow": args.max_overflow, "duration": args.duration}
+    print_report(meta, results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta, "levels": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+# backend/bench/serialization.py
+"""
+Serialisation cost of large solver payloads: FastAPI's default path vs app.responses.
+
+    cd backend && python -m bench.serialization [--posts 20] [--repeat 5]
+
+The payload mimics POST /scenarios/compare over a month: per post, the
+baseline plus proposed windows and a solved assignment.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from app import responses
+from app.solver.allocations import candidates_night_call
+from app.solver.interfaces import DatedWindow
+
+
+def payload(posts: int) -> list:
+    out = []
+    for p in range(1, posts + 1):
+        nights = candidates_night_call([], 2, 2025, [["17:00", "09:00"], ["09:00", "17:00"]])
+        baseline = [DatedWindow(w.date, "09:00", "17:00", ["core", "ward"], f"core:{p}") for w in nights]
+        out.append({
+            "post_id": p, "rules_hash": "0" * 64,
+            "baseline": [w.__dict__ for w in baseline * 4],
+            "windows": [w.__dict__ for w in nights],
+            "solutions": [{"assignment": [i % 9 + 1 for i in range(len(nights))],
+                           "objectives": {"fairness": 0.25, "uncovered": 0}, "violations": []}],
+        })
+    return out
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000, body
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.serialization")
+    ap.add_argument("--posts", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+    content = payload(args.posts)
+    windows = sum(len(p["baseline"]) + len(p["windows"]) for p in content)
+
+    cases = [("fastapi default (jsonable_encoder + json)", lambda: JSONResponse(jsonable_encoder(content)).body),
+             ("responses.dumps" + (" (orjson)" if responses.orjson else " (stdlib)"), lambda: responses.dumps(content))]
+    if responses.msgpack is not None:
+        cases.append(("responses.packb (msgpack)", lambda: responses.packb(content)))
+
+    print(f"{args.posts} posts, {windows} windows")
+    print(f"{'encoder':45} {'ms':>8} {'bytes':>10} {'gzip':>10}" + (f" {'br':>10}" if responses.brotli else ""))
+    for name, fn in cases:
+        ms, body = timed(fn, args.repeat)
+        row = f"{name:45} {ms:8.1f} {len(body):10d} {len(gzip.compress(body, 6)):10d}"
+        if responses.brotli:
+            row += f" {len(responses.brotli.compress(body, quality=4)):10d}"
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
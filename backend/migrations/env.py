@@ -10,7 +10,11 @@ import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/../app")
 
 config = context.config
-fileConfig(config.config_file_name)
+if config.config_file_name:  # app.tenancy drives migrations without an ini file
+    fileConfig(config.config_file_name)
+
+# `alembic -x tenant=<slug> upgrade head` replays the chain into schema tenant_<slug>
+TENANT = context.get_x_argument(as_dictionary=True).get("tenant")
 
 from app.db import Base  # noqa: E402
 from app import models  # noqa: F401,E402
@@ -30,7 +34,14 @@ def run_migrations_online():
         poolclass=pool.NullPool,
     )
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=Base.metadata)
+        if TENANT:
+            schema = f"tenant_{TENANT}"
+            connection.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            connection.exec_driver_sql(f'SET search_path TO "{schema}"')
+            connection.commit()  # session-level path for the whole run; NullPool drops the connection after
+            context.configure(connection=connection, target_metadata=Base.metadata, version_table_schema=schema)
+        else:
+            context.configure(connection=connection, target_metadata=Base.metadata)
         with context.begin_transaction():
             context.run_migrations()
 
@@ -1,7 +1,7 @@
 """admin entities: teams, contracts, team_members
 
 Revision ID: 20240929_01
-Revises: <put_previous_revision_id_here>
+Revises: 0002_post_builder
 Create Date: 2025-09-29
 
 """
@@ -10,7 +10,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = '20240929_01'
-down_revision = '<PUT_PREVIOUS_REVISION_ID>'
+down_revision = '0002_post_builder'
 branch_labels = None
 depends_on = None
 
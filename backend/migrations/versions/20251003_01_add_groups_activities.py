@@ -1,7 +1,7 @@
 """add groups and activities tables
 
 Revision ID: 20251003_01
-Revises: 
+Revises: 20240929_01
 Create Date: 2025-10-03 08:10:00
 
 """
@@ -10,7 +10,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = "20251003_01"
-down_revision = None
+down_revision = "20240929_01"
 branch_labels = None
 depends_on = None
 
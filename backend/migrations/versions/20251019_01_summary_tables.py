@@ -0,0 +1,44 @@
+"""roster summary tables for supervisor reports
+
+Revision ID: 20251019_01
+Revises: 20251003_01
+Create Date: 2025-10-19 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251019_01"
+down_revision = "20251003_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_rota_slots_user_start", "rota_slots", ["user_id", "start"])
+    op.create_table(
+        "summary_weekly",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("week_start", sa.Date(), primary_key=True),
+        sa.Column("hours", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("slots", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ewtd_breaches", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_summary_weekly_week", "summary_weekly", ["week_start"])
+    op.create_table(
+        "summary_monthly_calls",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("type", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_summary_monthly_calls_month", "summary_monthly_calls", ["month"])
+
+
+def downgrade():
+    op.drop_index("ix_summary_monthly_calls_month", table_name="summary_monthly_calls")
+    op.drop_table("summary_monthly_calls")
+    op.drop_index("ix_summary_weekly_week", table_name="summary_weekly")
+    op.drop_table("summary_weekly")
+    op.drop_index("ix_rota_slots_user_start", table_name="rota_slots")
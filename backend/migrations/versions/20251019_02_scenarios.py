@@ -0,0 +1,41 @@
+"""what-if scenarios with copy-on-write overrides
+
+Revision ID: 20251019_02
+Revises: 20251019_01
+Create Date: 2025-10-19 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251019_02"
+down_revision = "20251019_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scenarios",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "scenario_overrides",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("scenario_id", sa.Integer(), sa.ForeignKey("scenarios.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=True),
+        sa.Column("op", sa.String(), nullable=False, server_default="upsert"),
+        sa.Column("data", sa.JSON(), nullable=False, server_default=sa.text("'{}'::json")),
+    )
+    op.create_index("ix_scenario_overrides_scenario_id", "scenario_overrides", ["scenario_id"])
+
+
+def downgrade():
+    op.drop_index("ix_scenario_overrides_scenario_id", table_name="scenario_overrides")
+    op.drop_table("scenario_overrides")
+    op.drop_table("scenarios")
@@ -0,0 +1,105 @@
+"""range-partition rota_slots (start) and audits (created_at) by month
+
+Revision ID: 20251019_03
+Revises: 20251019_02
+Create Date: 2025-10-19 14:00:00
+
+Postgres requires the partition key in every unique constraint, so the
+primary keys become (id, start) / (id, created_at) and alerts.slot_id loses
+its FK to rota_slots. Partitions are created for every month that already
+has data plus a few months ahead; app/services/partitions.py keeps creating
+and archiving them afterwards.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251019_03"
+down_revision = "20251019_02"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+TABLES = {
+    # table: (partition column, column DDL, indexes, copy-from-legacy select list)
+    "rota_slots": ("start", """
+        id integer NOT NULL DEFAULT nextval('rota_slots_id_seq'),
+        user_id integer REFERENCES users(id),
+        post_id integer REFERENCES posts(id),
+        start timestamp NOT NULL,
+        "end" timestamp NOT NULL,
+        type varchar(32) NOT NULL,
+        labels json,
+        PRIMARY KEY (id, start)
+    """, ["CREATE INDEX ix_rota_slots_user_start ON rota_slots (user_id, start)",
+          "CREATE INDEX ix_rota_slots_post_start ON rota_slots (post_id, start)"],
+     'id, user_id, post_id, start, "end", type, labels'),
+    "audits": ("created_at", """
+        id integer NOT NULL DEFAULT nextval('audits_id_seq'),
+        actor_id integer REFERENCES users(id),
+        action varchar(64) NOT NULL,
+        before json,
+        after json,
+        reason varchar(255),
+        created_at timestamp NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, created_at)
+    """, ["CREATE INDEX ix_audits_actor_created ON audits (actor_id, created_at)"],
+     "id, actor_id, action, before, after, reason, COALESCE(created_at, now())"),
+}
+
+
+def _add_months(d, n):
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def upgrade():
+    conn = op.get_bind()
+    op.execute("ALTER TABLE alerts DROP CONSTRAINT IF EXISTS alerts_slot_id_fkey")
+    op.execute("DROP INDEX IF EXISTS ix_rota_slots_user_start")
+
+    for table, (col, ddl, indexes, select) in TABLES.items():
+        legacy = f"{table}_legacy"
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+        op.execute(f'CREATE TABLE {table} ({ddl}) PARTITION BY RANGE ("{col}")')
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        lo, hi = conn.execute(sa.text(f'SELECT min("{col}"), max("{col}") FROM {legacy}')).one()
+        this_month = date.today().replace(day=1)
+        month = (lo.date().replace(day=1) if lo else this_month)
+        last = max(_add_months(this_month, MONTHS_AHEAD), hi.date().replace(day=1) if hi else this_month)
+        while month <= last:
+            nxt = _add_months(month, 1)
+            op.execute(f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                       f"FOR VALUES FROM ('{month}') TO ('{nxt}')")
+            month = nxt
+
+        for ddl_index in indexes:
+            op.execute(ddl_index)
+        op.execute(f"INSERT INTO {table} SELECT {select} FROM {legacy}")
+        op.execute(f"DROP TABLE {legacy}")
+
+
+def downgrade():
+    for table, (col, ddl, indexes, _) in TABLES.items():
+        partitioned = f"{table}_partitioned"
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+        plain = ddl.replace(f"PRIMARY KEY (id, {col})", "PRIMARY KEY (id)")
+        op.execute(f"CREATE TABLE {table} ({plain})")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"DROP TABLE {partitioned} CASCADE")
+        for ddl_index in indexes:
+            if "ix_rota_slots_post_start" in ddl_index:
+                continue
+            op.execute(ddl_index)
+    op.execute("ALTER TABLE alerts ADD CONSTRAINT alerts_slot_id_fkey "
+               "FOREIGN KEY (slot_id) REFERENCES rota_slots(id)")
@@ -0,0 +1,39 @@
+"""minimum-staffing demand curves
+
+Revision ID: 20251019_04
+Revises: 20251019_03
+Create Date: 2025-10-19 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251019_04"
+down_revision = "20251019_03"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "staffing_demand",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("site", sa.String(), nullable=True),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("weekday", sa.String(3), nullable=True),
+        sa.Column("date", sa.Date(), nullable=True),
+        sa.Column("start", sa.String(5), nullable=False),
+        sa.Column("end", sa.String(5), nullable=False),
+        sa.Column("min_staff", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("max_staff", sa.Integer(), nullable=True),
+        sa.CheckConstraint("site IS NOT NULL OR group_id IS NOT NULL", name="ck_staffing_demand_target"),
+    )
+    op.create_index("ix_staffing_demand_site", "staffing_demand", ["site"])
+    op.create_index("ix_staffing_demand_group_id", "staffing_demand", ["group_id"])
+
+
+def downgrade():
+    op.drop_index("ix_staffing_demand_group_id", table_name="staffing_demand")
+    op.drop_index("ix_staffing_demand_site", table_name="staffing_demand")
+    op.drop_table("staffing_demand")
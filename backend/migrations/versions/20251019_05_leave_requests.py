@@ -0,0 +1,29 @@
+"""leave requests: created_at and lookup indexes
+
+Revision ID: 20251019_05
+Revises: 20251019_04
+Create Date: 2025-10-19 17:00:00
+
+The leave table dates from 0001_init; batch evaluation needs a first-come
+timestamp and fast (user, start) / (status, start) lookups.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251019_05"
+down_revision = "20251019_04"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("leave", sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True))
+    op.create_index("ix_leave_user_start", "leave", ["user_id", "start"])
+    op.create_index("ix_leave_status_start", "leave", ["status", "start"])
+
+
+def downgrade():
+    op.drop_index("ix_leave_status_start", table_name="leave")
+    op.drop_index("ix_leave_user_start", table_name="leave")
+    op.drop_column("leave", "created_at")
@@ -0,0 +1,39 @@
+"""per-NCHD preferences (nights on/off, timed windows; hard or weighted)
+
+Revision ID: 20251019_06
+Revises: 20251019_05
+Create Date: 2025-10-19 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251019_06"
+down_revision = "20251019_05"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "preferences",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("start", sa.String(5), nullable=True),
+        sa.Column("end", sa.String(5), nullable=True),
+        sa.Column("kind", sa.String(8), nullable=False, server_default="off"),
+        sa.Column("weight", sa.Float(), nullable=False, server_default="1"),
+        sa.Column("hard", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("note", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.CheckConstraint("kind IN ('off', 'on')", name="ck_preferences_kind"),
+        sa.CheckConstraint("weight >= 0", name="ck_preferences_weight"),
+    )
+    op.create_index("ix_preferences_user_date", "preferences", ["user_id", "date"])
+
+
+def downgrade():
+    op.drop_index("ix_preferences_user_date", table_name="preferences")
+    op.drop_table("preferences")
@@ -0,0 +1,45 @@
+"""tenant registry for schema-per-tenant hosting
+
+Revision ID: 20251019_07
+Revises: 20251019_06
+Create Date: 2025-10-19 19:00:00
+
+The registry lives in public only; when the chain is replayed into a tenant
+schema (`alembic -x tenant=<slug> upgrade head`) this revision is a no-op.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251019_07"
+down_revision = "20251019_06"
+branch_labels = None
+depends_on = None
+
+
+def _tenant_schema() -> bool:
+    return bool(context.get_x_argument(as_dictionary=True).get("tenant"))
+
+
+def upgrade():
+    if _tenant_schema():
+        return
+    op.create_table(
+        "tenants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("slug", sa.String(40), nullable=False, unique=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("schema", sa.String(63), nullable=False, unique=True),
+        sa.Column("solver_workers", sa.Integer(), nullable=False, server_default="2"),
+        sa.Column("import_workers", sa.Integer(), nullable=False, server_default="2"),
+        sa.Column("cache_mb", sa.Integer(), nullable=True),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.CheckConstraint("solver_workers >= 1 AND import_workers >= 1", name="ck_tenants_workers"),
+    )
+
+
+def downgrade():
+    if _tenant_schema():
+        return
+    op.drop_table("tenants")
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db as _db  # noqa: F401  registers the SQLite JSONB shim
+from app import models
+
+# Tests marked `postgres` need a scratch server: TEST_POSTGRES_URL=postgresql+psycopg://...
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs TEST_POSTGRES_URL (skipped otherwise)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if POSTGRES_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_POSTGRES_URL not set")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """A fresh SQLite database with the full schema; hooks are installed by the tests that need them."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    models.Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
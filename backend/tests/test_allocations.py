@@ -0,0 +1,66 @@
+import pytest
+
+from app.solver.allocations import AllocationModel, candidates_night_call, pareto_front, solve
+from app.solver.interfaces import Preference
+from app.solver.objectives import ObjectiveSpec
+
+
+def _model(users, **kw):
+    nights = candidates_night_call([], 2, 2025, [["17:00", "09:00"]])
+    return AllocationModel(nights, users, **kw)
+
+
+def test_solve_respects_caps_and_rest():
+    m = _model([1, 2, 3, 4], caps={"night": 7})
+    sol = solve(m, ObjectiveSpec(), iterations=200)
+    a = sol["assignment"]
+    assert sol["objectives"]["uncovered"] == 0
+    assert all(a.count(u) == 7 for u in (1, 2, 3, 4))
+    assert all(x != y for x, y in zip(a, a[1:]))  # 17:00-09:00 nights back to back leave < 11h rest
+
+
+def test_pareto_front_is_non_dominated():
+    m = _model(list(range(1, 8)))
+    specs = [ObjectiveSpec(weights={"fairness": 1}), ObjectiveSpec(weights={"weekend": 1})]
+    front = pareto_front(m, specs, iterations=200, max_workers=1)
+    keys = ("fairness", "weekend")
+    for r in front:
+        for o in front:
+            assert not (all(o["objectives"][k] <= r["objectives"][k] for k in keys)
+                        and any(o["objectives"][k] < r["objectives"][k] for k in keys))
+
+
+def test_preferences_hard_soft_and_tally():
+    prefs = [Preference(1, "2025-02-03", kind="off", hard=True),
+             Preference(2, "2025-02-10", kind="on", weight=5),
+             Preference(3, "2025-02-14", start="20:00", end="23:00", kind="off", weight=5),
+             Preference(9, "2025-02-01", kind="on")]  # not in the pool
+    m = _model([1, 2, 3, 4], prefs=prefs)
+    sol = solve(m, ObjectiveSpec(weights={"fairness": 1, "preferences": 10}), iterations=300)
+    a = sol["assignment"]
+    assert a[2] != 1 and a[9] == 2 and a[13] != 3
+    assert sol["objectives"]["preferences"] == 0
+    assert sol["preferences"] == [
+        {"user_id": u, "total": 1, "honoured": 1, "missed_weight": 0.0} for u in (1, 2, 3)
+    ]
+
+
+def test_objective_spec_rejects_malformed_payloads():
+    for bad in ({"nonsense": 1}, [1, 2], {"fairness": "high"}):
+        with pytest.raises(ValueError):
+            ObjectiveSpec(weights=bad)
+    for bad in (["fairness"], {"lexicographic": "fairness"}, {"lexicographic": [1]}):
+        with pytest.raises(ValueError):
+            ObjectiveSpec.from_payload(bad)
+
+
+def test_continuity_keeps_runs_one_person_could_hold():
+    nights = candidates_night_call([], 2, 2025, [["20:00", "08:00"]])  # 12h between nights: one person may chain them
+    m = AllocationModel(nights, [1, 2, 3, 4], caps={"night": 7})
+    assert len(m.continuity_pairs) == 27
+    kept = solve(m, ObjectiveSpec(weights={"continuity": 1}), iterations=300)
+    spread = solve(m, ObjectiveSpec(weights={"fairness": 1}), iterations=300)
+    assert kept["objectives"]["uncovered"] == 0
+    assert kept["objectives"]["continuity"] == 3  # a week each, one handover per week
+    assert kept["objectives"]["continuity"] < spread["objectives"]["continuity"]
+    assert _model([1, 2, 3]).continuity_pairs == []  # 17:00-09:00 nights can't be held back to back
@@ -0,0 +1,57 @@
+import json
+from collections import defaultdict
+from datetime import date
+
+import pytest
+
+from app.solver.__main__ import main
+from app.solver.batch import chains, preference_records, run
+
+
+def _scenario(users, pools=None):
+    rules = {"hours": [["20:00", "08:00"]], "cap_per_month": 7}
+    return {
+        "users": users,
+        "groups": [{"id": 1, "name": "Nights", "rules": rules}],
+        "posts": [{"id": 1, "title": "SHO A", "group_ids": [1]}, {"id": 2, "title": "SHO B", "group_ids": [1]},
+                  {"id": 3, "title": "Reg", "group_ids": [1]}],
+        "leave": [], "preferences": [], "pools": pools or {}, "months": ["2025-02"],
+    }
+
+
+def test_chains_group_posts_with_shared_nchds():
+    assert chains({1: [1, 2], 2: [3], 3: [2, 4], 4: [4, 5]}) == [[1, 3, 4], [2]]
+
+
+def test_shared_pool_is_not_double_booked():
+    users = [{"id": i, "role": "nchd"} for i in range(1, 15)]
+    result = run(_scenario(users), workers=1, iterations=200)
+    nights = defaultdict(list)
+    for r in result["roster"]:
+        if r["user_id"] is not None:
+            nights[r["user_id"]].append((date.fromisoformat(r["date"]), r["post_id"]))
+    assert nights
+    for taken in nights.values():
+        taken.sort()
+        for (d1, p1), (d2, p2) in zip(taken, taken[1:]):
+            # calls in different posts never touch the same day
+            assert p1 == p2 or (d2 - d1).days >= 2
+    assert result["jobs"] == 1
+
+
+def test_malformed_preferences_name_the_entry(tmp_path, capsys):
+    ok = {"user_id": "3", "date": "2025-02-14", "weight": 2}
+    assert preference_records([ok])[0].user_id == 3
+    for bad, why in (({"date": "2025-02-14"}, "user_id"), ({"user_id": 3}, "date"),
+                     ({"user_id": 3, "date": "14/02/2025"}, "date"), ("off", "object"),
+                     ({"user_id": 3, "date": "2025-02-14", "weight": "high"}, "weight"),
+                     ({"user_id": 3, "date": "2025-02-14", "start": "8am"}, "start")):
+        with pytest.raises(ValueError, match=rf"preferences\[1\]: .*{why}"):
+            preference_records([ok, bad])
+
+    path = tmp_path / "scenario.json"
+    path.write_text(json.dumps({**_scenario(2), "preferences": [ok, {"date": "2025-02-14"}]}))
+    with pytest.raises(SystemExit) as e:
+        main([str(path), "--out", str(tmp_path / "out"), "--workers", "1", "--iterations", "10"])
+    assert e.value.code == 2
+    assert "preferences[1]: user_id must be an integer" in capsys.readouterr().err
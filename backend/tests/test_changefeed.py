@@ -0,0 +1,62 @@
+from app.services.changefeed import ChangeBroker, Filter
+
+
+def _ev(entity, id, op="update", **kw):
+    return {"entity": entity, "op": op, "id": id, **kw}
+
+
+def test_filter_by_site_and_passthrough():
+    b = ChangeBroker()
+    sub = b.subscribe(Filter(site="Newcastle"))
+    b.publish([
+        _ev("post", 1, site="Newcastle"),
+        _ev("post", 2, site="Galway"),
+        _ev("group", 3),  # carries no site -> delivered
+    ])
+    assert [(e["entity"], e["id"]) for e in sub.drain()] == [("post", 1), ("group", 3)]
+
+
+def test_coalesces_repeated_changes_to_same_row():
+    b = ChangeBroker()
+    sub = b.subscribe(Filter())
+    b.publish([_ev("rota_slot", 7, op="insert", user_id=1), _ev("rota_slot", 7, user_id=2)])
+    out = sub.drain()
+    assert len(out) == 1
+    assert out[0]["op"] == "insert" and out[0]["user_id"] == 2
+
+
+def test_overflow_turns_into_resync():
+    b = ChangeBroker()
+    sub = b.subscribe(Filter(), max_pending=3)
+    b.publish([_ev("rota_slot", i) for i in range(10)])
+    assert sub.drain() == [{"entity": "*", "op": "resync", "id": None}]
+    assert sub.drain() == []
+
+
+def test_insert_then_delete_is_dropped():
+    b = ChangeBroker()
+    sub = b.subscribe(Filter())
+    b.publish([_ev("rota_slot", 7, op="insert"), _ev("rota_slot", 7, op="delete"), _ev("rota_slot", 8, op="delete")])
+    assert [(e["id"], e["op"]) for e in sub.drain()] == [(8, "delete")]
+
+
+def test_post_moving_site_reaches_old_and_new_site(session_factory, monkeypatch):
+    from app import models
+    from app.services import changefeed
+
+    b = ChangeBroker()
+    monkeypatch.setattr(changefeed, "broker", b)
+    changefeed.install(session_factory)
+    old, new, other = (b.subscribe(Filter(site=s)) for s in ("Newcastle", "Galway", "Sligo"))
+    with session_factory() as db:
+        post = models.Post(title="SHO", site="Newcastle")
+        db.add(post)
+        db.commit()
+        old.drain()
+        post_id = post.id
+        post.site = "Galway"
+        db.commit()
+    ev = {"entity": "post", "op": "update", "id": post_id, "tenant": "public", "post_id": post_id,
+          "site": "Galway", "previous": {"site": "Newcastle"}}
+    assert old.drain() == [ev] and new.drain() == [ev]
+    assert other.drain() == []
@@ -0,0 +1,73 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from app.services.compliance import REFERENCE_WEEKS, audit_rows, break_minutes, period
+from app.services.summaries import week_start
+
+
+def _run(slots, start, end):
+    lo, hi, since = period(start, end)
+    rows = sorted(((1, s, e, t, lb) for s, e, t, lb in slots), key=lambda r: r[1])
+    out = list(audit_rows(rows, lo, hi, since))
+    return [r for k, r in out if k == "findings"], [r for k, r in out if k == "weeks"]
+
+
+def test_breaks_split_shifts_and_rest():
+    d = datetime(2025, 3, 3)  # Monday
+    slots = [
+        (d.replace(hour=8), d.replace(hour=12), "base", {}),
+        (d.replace(hour=14), d.replace(hour=22), "base", {"paid_break": "18:00-18:30"}),  # split, short rest after
+        (d + timedelta(days=1, hours=6), d + timedelta(days=1, hours=15), "base", {}),    # 9h, no break
+    ]
+    findings, weeks = _run(slots, d.date(), d.date())
+    assert sorted(f["rule"] for f in findings) == ["break", "daily_rest", "daily_rest", "split_shift"]
+    assert [(f["start"], f["value"]) for f in findings if f["rule"] == "daily_rest"] == [
+        ("2025-03-03T12:00:00", 2.0), ("2025-03-03T22:00:00", 8.0)]
+    assert weeks == [{"user_id": 1, "week_start": "2025-03-03", "hours": 21.0, "base_hours": 21.0,
+                      "rolling_avg_hours": round(21.0 / 17, 2),
+                      "longest_rest_hours": 17 * 168 + 8.0,  # nothing in the 17 weeks read before Monday 08:00
+                      "findings": 4}]
+    assert break_minutes({"breaks": ["23:50-00:10", "13:00-13:15"]}) == 35
+
+
+def test_weekly_series_average_and_history_only_seeds_the_window():
+    first = datetime(2025, 1, 6)
+    slots = []
+    for wk in range(20):  # 20 weeks of 7 x 9h days: over the 48h average and no weekly rest
+        for day in range(7):
+            s = first + timedelta(weeks=wk, days=day, hours=8)
+            slots.append((s, s + timedelta(hours=9), "night_call", {"breaks": ["12:00-12:30"]}))
+    report_start = (first + timedelta(weeks=18)).date()
+    findings, weeks = _run(slots, report_start, report_start + timedelta(days=13))
+    assert [w["week_start"] for w in weeks] == [report_start.isoformat(), (report_start + timedelta(days=7)).isoformat()]
+    assert weeks[0]["hours"] == 63.0 and weeks[0]["rolling_avg_hours"] == 63.0
+    assert {f["rule"] for f in findings} == {"average_48h", "weekly_rest"}
+    assert all(week_start(datetime.fromisoformat(f["start"])) >= report_start for f in findings)
+
+
+def test_duty_spanning_weeks_counts_in_its_first_week():
+    sun = datetime(2025, 2, 2, 20)  # Sunday 20:00 -> Tuesday 08:00 in three back-to-back slots
+    slots = [(sun, sun + timedelta(hours=12), "night_call", {"breaks": "00:00-00:30"}),
+             (sun + timedelta(hours=12), sun + timedelta(hours=24), "day", {"breaks": "12:00-12:30"}),
+             (sun + timedelta(hours=24), sun + timedelta(hours=36), "night_call", {"breaks": "00:00-00:30"})]
+    findings, weeks = _run(slots, sun.date(), sun.date() + timedelta(days=7))
+    assert [(f["rule"], f["start"]) for f in findings if f["rule"] == "duty_length"] == [
+        ("duty_length", "2025-02-02T20:00:00")]
+    by_week = {w["week_start"]: w["findings"] for w in weeks}
+    counted = Counter(week_start(datetime.fromisoformat(f["start"])).isoformat() for f in findings)
+    assert by_week == {wk: counted.get(wk, 0) for wk in by_week}
+    assert by_week["2025-01-27"] == 1  # the 36h duty that started on Sunday
+
+
+def test_weekly_rest_counts_whole_rest_periods():
+    mon = datetime(2025, 3, 3)
+    slots = []  # 4h every morning from the start of the history read, except Sun 9th / Mon 10th
+    for day in range(-REFERENCE_WEEKS * 7, 14):
+        s = mon + timedelta(days=day, hours=8)
+        if day != 7:
+            slots.append((s, s + timedelta(hours=4), "base", {}))
+    slots.append((mon + timedelta(days=7, hours=18), mon + timedelta(days=7, hours=22), "base", {}))
+    findings, weeks = _run(slots, mon.date(), mon.date() + timedelta(days=7))
+    # Sun 12:00 -> Mon 18:00 is one 30h rest: it satisfies both weeks instead of counting 12h + 18h
+    assert weeks[0]["longest_rest_hours"] == 30.0 and weeks[1]["longest_rest_hours"] >= 30.0
+    assert not [f for f in findings if f["rule"] == "weekly_rest"]
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from app.services.coverage import MonthGrid, demand_curves, gaps, protected_bins, supply_curves
+from app.solver.allocations import AllocationModel, candidates_night_call, solve
+from app.solver.objectives import ObjectiveSpec
+
+
+def test_gaps_subtract_protected_time():
+    grid = MonthGrid(2025, 1)  # 1 Jan 2025 is a Wednesday
+    demand = demand_curves(grid, [
+        {"site": "A", "weekday": "Wed", "start": "09:00", "end": "17:00", "min_staff": 1, "max_staff": 1},
+    ])
+    slots = [
+        {"post_id": 1, "user_id": 7, "start": datetime(2025, 1, d, 9), "end": datetime(2025, 1, d, 17)}
+        for d in (1, 8, 15, 22, 29)
+    ] + [{"post_id": 2, "user_id": 8, "start": datetime(2025, 1, 8, 9), "end": datetime(2025, 1, 8, 12)}]
+    teaching = protected_bins(grid, [("Wed", "14:00", "16:30")])
+    supply = supply_curves(grid, slots, {1: [("site", "A")], 2: [("site", "A")]}, {1: teaching, 2: teaching})
+
+    out = gaps(grid, demand, supply)
+    under = [g for g in out if g["kind"] == "under"]
+    over = [g for g in out if g["kind"] == "over"]
+    assert len(under) == 5
+    assert under[0]["start"] == "2025-01-01T14:00:00" and under[0]["end"] == "2025-01-01T16:30:00"
+    assert over == [{"target": "site", "key": "A", "kind": "over", "start": "2025-01-08T09:00:00",
+                     "end": "2025-01-08T12:00:00", "worst": 1}]
+
+
+def test_gaps_ignore_staffing_outside_every_demand_window():
+    grid = MonthGrid(2025, 1)
+    demand = demand_curves(grid, [
+        {"site": "A", "weekday": "Wed", "start": "09:00", "end": "17:00", "min_staff": 1, "max_staff": 1},
+    ])
+    slots = [  # Wednesday 09-17 as demanded, plus a Thursday and a Wednesday night nobody asked a max for
+        {"post_id": 1, "user_id": 7, "start": datetime(2025, 1, 1, 9), "end": datetime(2025, 1, 1, 17)},
+        {"post_id": 1, "user_id": 8, "start": datetime(2025, 1, 2, 9), "end": datetime(2025, 1, 2, 17)},
+        {"post_id": 1, "user_id": 9, "start": datetime(2025, 1, 1, 17), "end": datetime(2025, 1, 2, 9)},
+    ]
+    supply = supply_curves(grid, slots, {1: [("site", "A")]}, {})
+
+    assert not [g for g in gaps(grid, demand, supply) if g["kind"] == "over"]
+
+
+def test_postcall_capacity_is_hard():
+    nights = candidates_night_call([], 2, 2025, [["17:00", "09:00"]])
+    m = AllocationModel(nights, [1, 2, 3, 4], postcall_capacity={"2025-02-05": 0, "2025-02-06": 1})
+    a = solve(m, ObjectiveSpec(), iterations=200)["assignment"]
+    assert a[3] is None  # the 4th-5th night would leave the ward short on the 5th
+    assert a[4] is not None
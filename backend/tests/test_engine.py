@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from app.engine import ewtd_check
+
+
+def test_back_to_back_duties_merge_into_one_period():
+    recs = [
+        (datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 17), "base"),
+        (datetime(2025, 1, 6, 17), datetime(2025, 1, 7, 9), "night_call"),
+    ]
+    assert ewtd_check(recs)["ok"] is True
+    recs.append((datetime(2025, 1, 7, 9), datetime(2025, 1, 7, 10), "base"))
+    assert ewtd_check(recs)["reasons"] == ["Duty exceeds 24h: 25.0h"]
+
+
+def test_short_rest_between_duties_is_flagged():
+    recs = [
+        (datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 17), "base"),
+        (datetime(2025, 1, 7, 2), datetime(2025, 1, 7, 9), "night_call"),
+    ]
+    result = ewtd_check(recs)
+    assert result["ok"] is False
+    assert result["reasons"][0].startswith("Rest below 11h")
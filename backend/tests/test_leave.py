@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app.services.leave import analyse
+
+SITE = ("site", "A")
+
+
+def _slot(i, user, day, start=9, end=17, type="base"):
+    return {"id": i, "user_id": user, "post_id": 1, "start": datetime(2025, 7, day, start),
+            "end": datetime(2025, 7, day, end) if end > start else datetime(2025, 7, day + 1, end), "type": type}
+
+
+def _leave(i, user, first, last, created=None):
+    return {"id": i, "user_id": user, "start": datetime(2025, 7, first), "end": datetime(2025, 7, last + 1),
+            "type": "annual", "created_at": created}
+
+
+def test_batch_is_judged_jointly():
+    slots = [_slot(10 * u + d, u, d) for u in (1, 2, 3, 4) for d in (7, 8, 9)]
+    slots.append(_slot(99, 3, 8, 17, 9, type="night_call"))
+    slack = {SITE: {f"2025-07-0{d}": 1 for d in (7, 8, 9)}}
+    requests = [_leave(1, 1, 7, 8, datetime(2025, 5, 1)), _leave(2, 2, 8, 9, datetime(2025, 5, 2)),
+                _leave(3, 3, 9, 9, datetime(2025, 5, 3))]
+
+    res = analyse(requests, [], slots, {1: [SITE]}, slack)
+    by_id = {r["id"]: r for r in res["requests"]}
+    assert by_id[1]["decision"] == "approve" and by_id[1]["order"] == 1
+    assert by_id[2]["decision"] == "needs_cover" and by_id[2]["jointly_blocked"]
+    assert by_id[2]["blocking"] == [{"target": "site", "key": "A", "date": "2025-07-08", "slack": 0}]
+    assert by_id[3]["decision"] == "approve_after_swap" and by_id[3]["conflicts"]["calls"] == [99]
+    assert res["order"] == [1, 3]
+
+    # approved leave already uses the 9th's slack, so request 3 no longer fits
+    res = analyse(requests, [_leave(50, 4, 9, 9)], slots, {1: [SITE]}, slack)
+    assert {r["id"]: r["decision"] for r in res["requests"]}[3] == "needs_cover"
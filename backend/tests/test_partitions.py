@@ -0,0 +1,88 @@
+import os
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app import models
+from app.services import partitions
+
+SCHEMA = "partitions_test"
+
+
+def test_models_declare_partitioning_and_composite_keys(db):
+    for model, col in ((models.RotaSlot, "start"), (models.Audit, "created_at")):
+        ddl = str(CreateTable(model.__table__).compile(dialect=postgresql.dialect()))
+        assert f"PRIMARY KEY (id, {col})" in ddl and f'PARTITION BY RANGE ("{col}")' in ddl
+        assert partitions.PARTITIONED[model.__tablename__] == col
+    # SQLite keeps a plain rowid key: ids autoincrement and the ORM still looks rows up by id
+    slot = models.RotaSlot(start=datetime(2025, 2, 3, 20), end=datetime(2025, 2, 4, 8))
+    db.add_all([slot, models.Audit(action="test")])
+    db.commit()
+    assert db.get(models.RotaSlot, slot.id) is slot and db.query(models.Audit.id).scalar() == 1
+
+
+@pytest.fixture
+def pg():
+    """A connection inside a scratch schema holding partitioned rota_slots/audits (DEFAULT partition only)."""
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    tables = [models.User.__table__, models.Post.__table__, models.RotaSlot.__table__, models.Audit.__table__]
+    with engine.connect() as conn:
+        for schema in (SCHEMA, f"{SCHEMA}_archive"):
+            conn.exec_driver_sql(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+        conn.exec_driver_sql(f'CREATE SCHEMA "{SCHEMA}"')
+        conn.exec_driver_sql(f'SET search_path TO "{SCHEMA}"')
+        models.Base.metadata.create_all(conn, tables=tables)
+        for table in partitions.PARTITIONED:
+            conn.exec_driver_sql(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            for schema in (SCHEMA, f"{SCHEMA}_archive"):
+                conn.exec_driver_sql(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+            conn.commit()
+    engine.dispose()
+
+
+@pytest.mark.postgres
+def test_ensure_partitions_creates_this_month_and_ahead(pg):
+    assert partitions.is_partitioned(pg, "rota_slots")
+    today = date(2025, 11, 15)
+    assert partitions.ensure_partitions(pg, "rota_slots", months_ahead=2, today=today, dry_run=True) == [
+        "rota_slots_2025_11", "rota_slots_2025_12", "rota_slots_2026_01"]
+    assert partitions.attached_partitions(pg, "rota_slots") == ["rota_slots_default"]
+    created = partitions.ensure_partitions(pg, "rota_slots", months_ahead=2, today=today)
+    assert created == ["rota_slots_2025_11", "rota_slots_2025_12", "rota_slots_2026_01"]
+    assert partitions.ensure_partitions(pg, "rota_slots", months_ahead=2, today=today) == []
+
+
+@pytest.mark.postgres
+def test_create_month_partition_moves_rows_out_of_default(pg):
+    pg.execute(models.RotaSlot.__table__.insert(), [
+        {"start": datetime(2025, 3, 3, 20), "end": datetime(2025, 3, 4, 8), "type": "night_call"},
+        {"start": datetime(2025, 4, 1, 20), "end": datetime(2025, 4, 2, 8), "type": "night_call"},
+    ])
+    assert partitions.create_month_partition(pg, "rota_slots", date(2025, 3, 1)) is True
+    assert partitions.create_month_partition(pg, "rota_slots", date(2025, 3, 1)) is False
+    assert pg.execute(text("SELECT count(*) FROM rota_slots_2025_03")).scalar() == 1
+    assert pg.execute(text("SELECT count(*) FROM rota_slots_default")).scalar() == 1  # April stays put
+    assert pg.execute(text("SELECT count(*) FROM rota_slots")).scalar() == 2
+
+
+@pytest.mark.postgres
+def test_detach_old_archives_past_retention(pg):
+    for month in (date(2023, 1, 1), date(2024, 12, 1), date(2025, 1, 1)):
+        partitions.create_month_partition(pg, "audits", month)
+    pg.execute(models.Audit.__table__.insert(), [{"action": "old", "created_at": datetime(2023, 1, 5)}])
+    archive = f"{SCHEMA}_archive"
+    today = date(2025, 1, 20)
+    assert partitions.detach_old(pg, "audits", 12, today=today, dry_run=True, archive=archive) == ["audits_2023_01"]
+    assert "audits_2023_01" in partitions.attached_partitions(pg, "audits")
+    assert partitions.detach_old(pg, "audits", 12, today=today, archive=archive) == ["audits_2023_01"]
+    assert partitions.attached_partitions(pg, "audits") == ["audits_2024_12", "audits_2025_01", "audits_default"]
+    assert pg.execute(text("SELECT count(*) FROM audits")).scalar() == 0
+    assert pg.execute(text(f'SELECT action FROM "{archive}".audits_2023_01')).scalar() == "old"
@@ -0,0 +1,56 @@
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.routers.preferences import add_preferences, delete_preference, list_preferences
+from app.solver.batch import preference_records
+
+
+def _user(db):
+    u = models.User(name="NCHD 1")
+    db.add(u)
+    db.commit()
+    return u
+
+
+def test_add_single_and_bulk(db):
+    u = _user(db)
+    one = add_preferences({"user_id": u.id, "date": "2025-02-14", "kind": "off", "hard": True}, db=db)
+    assert one["id"] and one["hard"] is True and one["date"] == "2025-02-14"
+
+    bulk = add_preferences({"items": [
+        {"user_id": u.id, "date": "2025-02-15", "kind": "on", "start": "17:00", "end": "09:00", "weight": 2},
+        {"user_id": u.id, "date": "2025-02-16"},
+    ]}, db=db)
+    assert bulk == {"ok": True, "created": 2}
+    rows = list_preferences(user_id=u.id, start=None, end=None, db=db)
+    assert [(r["date"], r["kind"], r["hard"]) for r in rows] == [
+        ("2025-02-14", "off", True), ("2025-02-15", "on", False), ("2025-02-16", "off", False)]
+
+
+def test_add_rejects_unknown_user_and_non_bool_hard(db):
+    u = _user(db)
+    with pytest.raises(HTTPException) as e:
+        add_preferences({"user_id": u.id + 1, "date": "2025-02-14"}, db=db)
+    assert e.value.status_code == 404
+    for bad in ({"hard": "false"}, {"hard": 1}, {"kind": "maybe"}):
+        with pytest.raises(HTTPException) as e:
+            add_preferences({"user_id": u.id, "date": "2025-02-14", **bad}, db=db)
+        assert e.value.status_code == 422
+    assert list_preferences(user_id=None, start=None, end=None, db=db) == []
+
+
+def test_delete(db):
+    u = _user(db)
+    p = add_preferences({"user_id": u.id, "date": "2025-02-14"}, db=db)
+    assert delete_preference(p["id"], db=db) == {"ok": True}
+    with pytest.raises(HTTPException) as e:
+        delete_preference(p["id"], db=db)
+    assert e.value.status_code == 404
+
+
+def test_scenario_preferences_are_checked():
+    assert preference_records([{"user_id": 3, "date": "2025-02-14", "hard": True}])[0].kind == "off"
+    for bad in ({"kind": "maybe"}, {"hard": "false"}, {"weight": -1}):
+        with pytest.raises(ValueError, match=r"preferences\[0\]"):
+            preference_records([{"user_id": 3, "date": "2025-02-14", **bad}])
@@ -0,0 +1,42 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime
+
+from app import responses
+from app.solver.interfaces import DatedWindow
+
+
+def _call(app, accept_encoding):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding)]}
+    asyncio.run(app(scope, receive, send))
+    headers = {k.decode(): v.decode() for k, v in sent[0]["headers"]}
+    return headers, b"".join(m.get("body", b"") for m in sent[1:])
+
+
+def test_dumps_schemas_and_compression_threshold():
+    w = DatedWindow("2025-02-01", "17:00", "09:00", ["night"], "candidate:night_call")
+    big = responses.FastJSONResponse({"at": datetime(2025, 2, 1, 9), "windows": [w] * 200})
+    app = responses.CompressionMiddleware(big, minimum_size=1024)
+
+    headers, body = _call(app, b"gzip")
+    assert headers["content-encoding"] == "gzip"
+    data = json.loads(gzip.decompress(body))
+    assert data["at"] == "2025-02-01T09:00:00"
+    assert data["windows"][0] == {"date": "2025-02-01", "start": "17:00", "end": "09:00",
+                                  "tags": ["night"], "source": "candidate:night_call"}
+
+    headers, body = _call(app, b"identity")
+    assert "content-encoding" not in headers and json.loads(body) == data
+
+    small = responses.CompressionMiddleware(responses.FastJSONResponse({"ok": True}), minimum_size=1024)
+    headers, body = _call(small, b"gzip")
+    assert "content-encoding" not in headers and json.loads(body) == {"ok": True}
@@ -0,0 +1,81 @@
+import pytest
+
+from app.solver.engine import Solver
+from app.solver.interfaces import DatedWindow
+from app.solver.rules import RuleError, compile_rules, merge
+
+
+def test_seed_group_rules_compile():
+    pool = compile_rules({"shift": "night", "hours": [["17:00", "09:00"]], "cap_per_month": 7})
+    team = compile_rules({"clinic_days": ["Mon", "Thu"], "supervision": {"weekday": "Tue", "time": ["10:00", "11:00"]}})
+    assert pool.cap_for("night") == 7
+    assert [p.tags for p in team.protected] == [("clinic",), ("clinic",), ("supervision",)]
+
+
+def test_compile_is_cached_by_content():
+    a = compile_rules({"cap_per_month": 5, "shift": "night"})
+    b = compile_rules({"shift": "night", "cap_per_month": 5})
+    assert a is b
+
+
+@pytest.mark.parametrize("rules", [
+    {"cap_per_month": -1},
+    {"clinic_days": ["Funday"]},
+    {"hours": [["25:00", "09:00"]]},
+    {"nonsense": 1},
+])
+def test_invalid_rules_are_rejected(rules):
+    with pytest.raises(RuleError):
+        compile_rules(rules)
+
+
+def test_merge_takes_strictest_and_checks_in_batch():
+    rules = merge([compile_rules({"cap_per_month": 7}), compile_rules({"cap_per_month": 2, "min_rest_hours": 11})])
+    nights = [DatedWindow(date=f"2025-01-0{d}", start="17:00", end="09:00", tags=["night"], source="x") for d in (1, 3, 5)]
+    assert rules.check(nights) == ["night cap 2/month exceeded in 2025-01: 3"]
+    early = DatedWindow(date="2025-01-02", start="12:00", end="13:00", tags=["day"], source="x")
+    assert any(v.startswith("rest below 11h") for v in rules.check([nights[0], early]))
+
+
+def test_caps_are_per_assignee():
+    rules = compile_rules({"cap_per_month": 1})
+    nights = [DatedWindow(date=f"2025-01-0{d}", start="17:00", end="09:00", tags=["night"], source="x") for d in (1, 3)]
+    assert rules.check(nights, [1, 2]) == []
+    assert rules.check(nights, [1, 1]) == ["user 1: night cap 1/month exceeded in 2025-01: 2"]
+
+
+def test_back_to_back_duties_break_min_rest():
+    rules = compile_rules({"min_rest_hours": 11})
+    night = DatedWindow(date="2025-01-01", start="20:00", end="08:00", tags=["night"], source="x")
+    day = DatedWindow(date="2025-01-02", start="08:00", end="17:00", tags=["day"], source="x")
+    assert rules.check([night, day]) == ["rest below 11h before 2025-01-02 08:00: 0.0h"]
+
+
+class _NoActs:
+    def windows_for_post(self, post_id, month, year):
+        return []
+
+
+class _Doc:
+    def __init__(self, doc):
+        self.doc = doc
+
+    def rules_for_post(self, post_id):
+        return [self.doc]
+
+
+def test_forbidden_rest_tag_from_a_rule_blocks_the_night():
+    doc = {"hours": [["20:00", "08:00"]], "forbid_rest_on_tags": ["teaching"],
+           "weekday": "Tue", "time": ["10:00", "12:00"]}
+    out = Solver(_NoActs(), None, _Doc(doc)).solve_month(1, 2, 2025, [1, 2, 3], iterations=50)
+    sol = out["solutions"][0]
+    held = {w["date"]: u for w, u in zip(out["windows"], sol["assignment"])}
+    mondays = {"2025-02-03", "2025-02-10", "2025-02-17", "2025-02-24"}
+    assert all(held[d] is None for d in mondays)  # rest until Tue 19:00 would cover teaching 10:00-12:00
+    assert all(u is not None for d, u in held.items() if d not in mondays)
+    assert sol["violations"] == []
+
+    rules = compile_rules(doc)
+    monday = DatedWindow(date="2025-02-03", start="20:00", end="08:00", tags=["night"], source="x")
+    assert rules.check([monday], [1], rules.protected_windows(2, 2025)) == [
+        "user 1: post-call rest after 2025-02-03 overlaps teaching on 2025-02-04 10:00-12:00"]
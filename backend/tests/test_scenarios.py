@@ -0,0 +1,120 @@
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app import models
+from app.routers.scenarios import add_override
+from app.routers.solve import solve_month
+from app.services.scenarios import apply_overrides, check_override, compare, evaluate, load_base
+from app.solver.rules import RuleError
+
+
+def _roster(db, users=8):
+    """Two posts sharing a night pool (20:00-08:00) and one live night call on post 1."""
+    db.add_all([models.User(id=i, name=f"NCHD {i}") for i in range(1, users + 1)])
+    db.add(models.Group(id=1, name="Pool", kind="on_call_pool", rules={"hours": [["20:00", "08:00"]]}))
+    db.add_all([models.Post(id=1, title="Gen Adult 1", site="A"), models.Post(id=2, title="Gen Adult 2", site="B")])
+    db.add_all([models.PostGroup(post_id=1, group_id=1), models.PostGroup(post_id=2, group_id=1)])
+    db.add(models.RotaSlot(id=1, user_id=1, post_id=1, start=datetime(2025, 2, 3, 20), end=datetime(2025, 2, 4, 8),
+                           type="night_call"))
+    db.commit()
+
+
+def _scenario(db, *overrides):
+    sc = models.Scenario(name="what if")
+    sc.overrides = [models.ScenarioOverride(entity=e, entity_id=i, op=op, data=d) for e, i, op, d in overrides]
+    db.add(sc)
+    db.commit()
+    return sc
+
+
+def test_check_override_rejects_what_evaluate_cannot_apply():
+    check_override("rota_slot", "upsert", None,
+                   {"user_id": 1, "post_id": 2, "start": "2025-02-03T17:00", "end": "2025-02-04T09:00"})
+    check_override("rota_slot", "upsert", 7, {"user_id": None})  # unassign an existing slot
+    for data in ({"user_id": 1, "start": "2025-02-03T17:00"},           # new slot, incomplete
+                 {"post_id": 2, "start": "tomorrow", "end": "2025-02-04T09:00"},
+                 {"post_id": "2", "start": "2025-02-03T17:00", "end": "2025-02-03T09:00"},
+                 {"post_id": 2, "start": "2025-02-04T09:00", "end": "2025-02-03T17:00"},
+                 ["not", "an", "object"]):
+        with pytest.raises(ValueError):
+            check_override("rota_slot", "upsert", None, data)
+    with pytest.raises(RuleError):
+        check_override("group", "upsert", 1, {"rules": {"cap_per_month": -1}})
+    with pytest.raises(ValueError):
+        check_override("post", "delete", None, {})
+
+
+def test_add_override_answers_422_and_404(db):
+    scenario = models.Scenario(name="what if")
+    db.add(scenario)
+    db.commit()
+    with pytest.raises(HTTPException) as e:
+        add_override(scenario.id, {"entity": "rota_slot", "data": {"user_id": 1}}, db=db)
+    assert e.value.status_code == 422
+    with pytest.raises(HTTPException) as e:
+        add_override(scenario.id, {"entity": "rota_slot", "entity_id": 99, "data": {"user_id": 1}}, db=db)
+    assert e.value.status_code == 404
+    out = add_override(scenario.id, {"entity": "post", "data": {"title": "New post", "fte": 0.5}}, db=db)
+    assert out["entity"] == "post"
+
+
+def test_apply_overrides_copies_only_what_changes(db):
+    _roster(db)
+    base = load_base(db, 2, 2025)
+    sc = _scenario(db, ("post", 2, "upsert", {"status": "VACANT_UNROSTERABLE"}),
+                   ("group", 1, "upsert", {"rules": {"hours": [["20:00", "08:00"]], "cap_per_month": 3}}),
+                   ("post", None, "upsert", {"title": "New post"}),
+                   ("post_group", None, "delete", {"post_id": 2, "group_id": 1}),
+                   ("rota_slot", 1, "delete", {}))
+    snap = apply_overrides(base, sc)
+    assert snap.posts[2]["status"] == "VACANT_UNROSTERABLE" and base.posts[2]["status"] == "ACTIVE_ROSTERABLE"
+    assert snap.posts[1] is base.posts[1]
+    assert snap.groups[1]["rules"]["cap_per_month"] == 3 and "cap_per_month" not in base.groups[1]["rules"]
+    assert [p["title"] for pid, p in snap.posts.items() if pid < 0] == ["New post"]
+    assert snap.post_groups == {(1, 1)} and base.post_groups == {(1, 1), (2, 1)}
+    assert snap.slots == {} and 1 in base.slots
+
+
+def test_evaluate_solves_posts_and_counts_vacant_as_uncovered(db):
+    _roster(db)
+    base = load_base(db, 2, 2025)
+    live = evaluate(base, 2, 2025, list(range(1, 9)), iterations=50)
+    assert (live["posts_rostered"], live["posts_vacant"], live["night_coverage"]) == (2, 0, 1.0)
+    assert live["rule_violations"] == 0
+
+    vacant = apply_overrides(base, _scenario(db, ("post", 2, "upsert", {"status": "VACANT_UNROSTERABLE"})))
+    out = evaluate(vacant, 2, 2025, list(range(1, 9)), iterations=50)
+    assert (out["posts_rostered"], out["posts_vacant"], out["night_coverage"]) == (1, 1, 0.5)
+
+    capped = apply_overrides(base, _scenario(db, ("group", 1, "upsert",
+                                                  {"rules": {"hours": [["20:00", "08:00"]], "cap_per_month": 1}})))
+    assert evaluate(capped, 2, 2025, [1, 2, 3], iterations=50)["night_coverage"] == round(6 / 56, 4)  # cap x pool
+
+
+def test_compare_scores_live_and_scenarios_side_by_side(db):
+    _roster(db)
+    sc = _scenario(db, ("post", 2, "upsert", {"status": "VACANT_UNROSTERABLE"}))
+    live, what_if = compare(db, [None, sc.id], 2, 2025, max_workers=1, iterations=50)
+    assert (live["scenario_id"], live["night_coverage"]) == (None, 1.0)
+    assert (what_if["scenario_id"], what_if["name"], what_if["night_coverage"]) == (sc.id, "what if", 0.5)
+    with pytest.raises(KeyError):
+        compare(db, [999], 2, 2025, max_workers=1)
+
+
+def test_solve_month_runs_against_a_scenario(db):
+    _roster(db)
+    sc = _scenario(db, ("group", 1, "upsert", {"rules": {"hours": [["20:00", "08:00"]], "cap_per_month": 2}}))
+    request = Request({"type": "http", "method": "POST", "path": "/solve/month", "headers": [], "query_string": b""})
+    payload = {"post_id": 1, "month": 2, "year": 2025, "user_ids": [1, 2, 3]}
+    live = json.loads(solve_month(request, payload, db=db).body)
+    what_if = json.loads(solve_month(request, {**payload, "scenario_id": sc.id}, db=db).body)
+    assert all(u is not None for u in live["solutions"][0]["assignment"])
+    assert sum(u is not None for u in what_if["solutions"][0]["assignment"]) == 6  # 3 users x cap 2
+    for bad, status in ((999, 404), ("3", 422)):
+        with pytest.raises(HTTPException) as e:
+            solve_month(request, {**payload, "scenario_id": bad}, db=db)
+        assert e.value.status_code == status
@@ -0,0 +1,12 @@
+import json
+from datetime import date
+
+from app.seed import SeedScale
+
+
+def test_seed_scale_parse(tmp_path):
+    s = SeedScale.parse("users=400, posts=60,sites=4,start=2025-03-01,unknown=1")
+    assert (s.users, s.posts, s.sites, s.months, s.start) == (400, 60, 4, 1, date(2025, 3, 1))
+    path = tmp_path / "scale.json"
+    path.write_text(json.dumps({"users": 15, "months": 2, "shifts": 224}))
+    assert SeedScale.parse(str(path)) == SeedScale(users=15, months=2)
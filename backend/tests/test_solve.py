@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app import models, tenancy
+from app.routers import solve
+from app.solver import engine
+
+REQUEST = Request({"type": "http", "method": "POST", "path": "/solve/month", "headers": [], "query_string": b""})
+
+
+def _post(db):
+    db.add_all([models.User(id=i, name=f"NCHD {i}") for i in (1, 2, 3)])
+    db.add(models.Group(id=1, name="Pool", kind="on_call_pool", rules={"hours": [["20:00", "08:00"]]}))
+    db.add(models.Post(id=1, title="SHO nights"))
+    db.add(models.PostGroup(post_id=1, group_id=1))
+    db.commit()
+    return {"post_id": 1, "month": 2, "year": 2025}
+
+
+def test_solve_month_rejects_malformed_pareto(db):
+    payload = _post(db)
+    for pareto in ([["fairness"]], {"fairness": 1}, [{"nonsense": 1}]):
+        with pytest.raises(HTTPException) as e:
+            solve.solve_month(REQUEST, {**payload, "pareto": pareto}, db=db)
+        assert e.value.status_code == 422
+
+
+def test_solve_month_coerces_user_ids_or_answers_422(db):
+    payload = _post(db)
+    out = json.loads(solve.solve_month(REQUEST, {**payload, "user_ids": ["1", 2]}, db=db).body)
+    assert set(out["solutions"][0]["assignment"]) == {1, 2}
+    for bad in ("1,2", [1, None], [True], [1.5], [{"id": 1}]):
+        with pytest.raises(HTTPException) as e:
+            solve.solve_month(REQUEST, {**payload, "user_ids": bad}, db=db)
+        assert e.value.status_code == 422
+
+
+def test_pareto_runs_on_the_tenant_worker_budget(db, monkeypatch):
+    payload = _post(db)
+    seen = []
+    real = engine.pareto_front
+
+    def spy(model, specs, seed=0, iterations=2000, max_workers=None):
+        seen.append(max_workers)
+        return real(model, specs, seed=seed, iterations=iterations, max_workers=1)
+
+    monkeypatch.setattr(engine, "pareto_front", spy)
+    solve.solve_month(REQUEST, {**payload, "pareto": [{"fairness": 1}, {"continuity": 1}]}, db=db)
+    assert seen == [tenancy.current(db).solver_workers]
@@ -0,0 +1,89 @@
+import pytest
+
+from app.solver.cache import ResultCache, default_cache, tenant_cache
+from app.solver.engine import Solver
+from app.solver.rules import RuleError
+
+
+class _Acts:
+    def windows_for_post(self, post_id, month, year):
+        return []
+
+
+class _Rules:
+    def __init__(self, doc):
+        self.doc = doc
+        self.calls = 0
+
+    def rules_for_post(self, post_id):
+        self.calls += 1
+        return [self.doc]
+
+
+def test_repeat_preview_hits_and_rule_change_misses(tmp_path):
+    cache = ResultCache(path=str(tmp_path))
+    rules = _Rules({"hours": [["17:00", "09:00"]], "cap_per_month": 7})
+    s = Solver(_Acts(), None, rules, cache=cache)
+
+    first = s.preview_month(1, 2, 2025)
+    assert s.preview_month(1, 2, 2025) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    rules.doc = {"hours": [["20:00", "08:00"]], "cap_per_month": 7}
+    assert s.preview_month(1, 2, 2025) != first
+    assert cache.misses == 2
+
+
+def test_entries_survive_restart_via_disk(tmp_path):
+    s = Solver(_Acts(), None, _Rules({"hours": [["17:00", "09:00"]]}), cache=ResultCache(path=str(tmp_path)))
+    first = s.solve_month(1, 2, 2025, [3, 1, 2], iterations=50)
+
+    fresh = ResultCache(path=str(tmp_path))
+    s2 = Solver(_Acts(), None, _Rules({"hours": [["17:00", "09:00"]]}), cache=fresh)
+    assert s2.solve_month(1, 2, 2025, [1, 2, 3], iterations=50) == first
+    assert fresh.hits == 1
+
+
+def test_lru_bound():
+    cache = ResultCache(max_entries=2)
+    for k in "abc":
+        cache.put(k, {"k": k})
+    assert cache.get("a") is None and cache.get("c") == {"k": "c"}
+
+
+def test_invalid_stored_rules_name_the_post():
+    s = Solver(_Acts(), None, _Rules({"hours": [["17:00", "09:00"]], "legacy_key": 1}))
+    with pytest.raises(RuleError, match=r"post 4: stored group rules are invalid .*legacy_key"):
+        s.preview_month(4, 2, 2025)
+
+
+def test_miss_returns_what_a_hit_would(tmp_path):
+    s = Solver(_Acts(), None, _Rules({"hours": [["17:00", "09:00"]]}), cache=ResultCache(path=str(tmp_path)))
+    miss = s.solve_month(1, 2, 2025, [1, 2, 3], iterations=50)
+    hit = s.solve_month(1, 2, 2025, [1, 2, 3], iterations=50)
+    assert miss == hit
+    assert s.cache.stats()["hits"] == s.cache.stats()["misses"] == 1
+
+    cache = ResultCache()
+    assert cache.put("k", {1: (2, 3)}) == cache.get("k") == {"1": [2, 3]}
+
+
+def test_counters_are_exact_under_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = ResultCache()
+    cache.put("a", {"k": "a"})
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: cache.get("a" if i % 2 else "b"), range(4000)))
+    assert (cache.hits, cache.misses) == (2000, 2000)
+
+
+def test_tenant_cache_honours_max_mb_and_rebuilds_on_change():
+    small = tenant_cache("public", 1)
+    assert small is not default_cache() and small.max_bytes == 1024 * 1024
+    assert tenant_cache("public", 1) is small
+    assert tenant_cache("public", 2).max_bytes == 2 * 1024 * 1024
+    assert tenant_cache("public") is default_cache()
+    sized = tenant_cache("sized", 3)
+    assert sized.max_bytes == 3 * 1024 * 1024 and tenant_cache("sized", 3) is sized
+    assert tenant_cache("sized", 4) is not sized
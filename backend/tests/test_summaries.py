@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import models
+from app.services import summaries
+
+
+def test_overlapping_slots_count_once_and_rebuild_drops_stale_rows(session_factory):
+    summaries.install(session_factory)
+    with session_factory() as db:
+        db.add(models.User(id=1, name="NCHD 1"))
+        db.add_all([
+            models.RotaSlot(user_id=1, start=datetime(2025, 3, 3, 9), end=datetime(2025, 3, 3, 17), type="base"),
+            models.RotaSlot(user_id=1, start=datetime(2025, 3, 3, 13), end=datetime(2025, 3, 3, 21), type="day_call"),
+            models.RotaSlot(user_id=1, start=datetime(2025, 3, 12, 9), end=datetime(2025, 3, 12, 17), type="base"),
+        ])
+        db.commit()
+        assert db.get(models.WeeklySummary, (1, date(2025, 3, 3))).hours == 12.0
+
+        # out-of-band delete (bypasses the hooks), then a partial rebuild
+        db.query(models.RotaSlot).filter(models.RotaSlot.start >= datetime(2025, 3, 10)).delete()
+        db.commit()
+        assert db.get(models.WeeklySummary, (1, date(2025, 3, 10))) is not None
+        summaries.rebuild_all(db, since=date(2025, 3, 11))
+        assert db.get(models.WeeklySummary, (1, date(2025, 3, 10))) is None
+        assert db.get(models.WeeklySummary, (1, date(2025, 3, 3))).hours == 12.0
+        assert {(r.type, r.count) for r in db.query(models.MonthlyCallSummary)} == {("base", 1), ("day_call", 1)}
+
+
+def test_untyped_slots_update_their_month_row(session_factory):
+    with session_factory() as db:
+        db.add(models.User(id=1, name="NCHD 1"))
+        for day in (3, 4):  # legacy rows with no type (the ORM would apply its default)
+            db.execute(insert(models.RotaSlot).values(
+                user_id=1, start=datetime(2025, 3, day, 9), end=datetime(2025, 3, day, 17), type=None))
+            summaries.refresh(db, set(), {(1, date(2025, 3, 1))})
+            db.commit()
+        assert [(r.type, r.count) for r in db.query(models.MonthlyCallSummary)] == [("", 2)]
+
+
+def test_48h_breach_is_a_rolling_average(session_factory):
+    summaries.install(session_factory)
+    first = date(2025, 1, 6)
+    with session_factory() as db:
+        db.add(models.User(id=1, name="NCHD 1"))
+        for wk in range(summaries.REFERENCE_WEEKS):  # 5 x 10h days a week: 50h weeks
+            for day in range(5):
+                start = datetime.combine(first, datetime.min.time()) + summaries.WEEK * wk + timedelta(days=day, hours=8)
+                db.add(models.RotaSlot(user_id=1, start=start, end=start + timedelta(hours=10), type="base"))
+        db.commit()
+        breaches = {r.week_start: r.ewtd_breaches for r in db.query(models.WeeklySummary)}
+        last = first + summaries.WEEK * (summaries.REFERENCE_WEEKS - 1)
+        assert breaches[last] == 1  # the first week whose whole reference period averages over 48h
+        assert sum(breaches.values()) == 1
+
+        # one long week on its own is not a breach
+        db.query(models.RotaSlot).filter(models.RotaSlot.start < datetime.combine(last, datetime.min.time())).delete()
+        summaries.rebuild_all(db)
+        assert db.get(models.WeeklySummary, (1, last)).ewtd_breaches == 0
@@ -0,0 +1,179 @@
+import ast
+import asyncio
+import glob
+import os
+import threading
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app import models, tenancy
+from app.services.changefeed import ChangeBroker, Filter
+from app.solver.cache import default_cache, tenant_cache
+
+
+def _request(tenant=None):
+    headers = [(b"x-tenant", tenant.encode())] if tenant else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def test_resolve_routes_known_tenants_and_rejects_others():
+    reg = tenancy.Registry(loader=lambda: [tenancy.Tenant("acme", "tenant_acme", solver_workers=3)])
+    assert tenancy.resolve(_request(), reg) is tenancy.PUBLIC_TENANT
+    assert tenancy.resolve(_request("acme"), reg).schema == "tenant_acme"
+    with pytest.raises(HTTPException) as e:
+        tenancy.resolve(_request("other"), reg)
+    assert e.value.status_code == 404
+    with pytest.raises(HTTPException) as e:
+        tenancy.resolve(_request('x"; drop'), reg)
+    assert e.value.status_code == 422
+
+
+def test_solve_quota_is_per_tenant():
+    quotas = tenancy.Quotas(wait=0)
+    big, small = tenancy.Tenant("big", "tenant_big", solver_workers=1), tenancy.Tenant("small", "tenant_small")
+    held, release = threading.Event(), threading.Event()
+
+    def long_solve():
+        with quotas.slot(big, "solve"):
+            held.set()
+            release.wait(5)
+
+    t = threading.Thread(target=long_solve)
+    t.start()
+    held.wait(5)
+    with pytest.raises(HTTPException) as e:
+        with quotas.slot(big, "solve"):
+            pass
+    assert e.value.status_code == 429
+    with quotas.slot(small, "solve"):  # another tenant is unaffected
+        pass
+    release.set()
+    t.join()
+    with quotas.slot(big, "solve"):
+        pass
+
+
+def test_compliance_stream_holds_a_solve_slot(monkeypatch):
+    from app.routers.reports import compliance_csv
+
+    quotas = tenancy.Quotas(wait=0)
+    monkeypatch.setattr(tenancy, "quotas", quotas)
+    monkeypatch.setattr(tenancy, "PUBLIC_TENANT", tenancy.Tenant("public", "public", solver_workers=1))
+    monkeypatch.setattr("app.services.compliance.stream_csv", lambda *a, **kw: iter(["user_id\n"]))
+    args = dict(start=date(2025, 2, 3), end=date(2025, 2, 9), kind="findings", user_id=None)
+
+    resp = compliance_csv(_request(), **args)
+    with pytest.raises(HTTPException) as e:
+        compliance_csv(_request(), **args)
+    assert e.value.status_code == 429
+    async def body():
+        return [chunk async for chunk in resp.body_iterator]
+
+    assert asyncio.run(body()) == ["user_id\n"]  # streamed to the end: slot released
+    resp.background.func()  # the post-response release is a no-op now
+    abandoned = compliance_csv(_request(), **args)
+    abandoned.background.func()  # client left before the first row
+    compliance_csv(_request(), **args).background.func()
+
+
+def test_change_feed_and_caches_do_not_cross_tenants():
+    b = ChangeBroker()
+    acme, public = b.subscribe(Filter(tenant="acme")), b.subscribe(Filter())
+    b.publish([{"entity": "post", "op": "update", "id": 1, "tenant": "acme"},
+               {"entity": "post", "op": "update", "id": 2, "tenant": "public"}])
+    assert [e["id"] for e in acme.drain()] == [1]
+    assert [e["id"] for e in public.drain()] == [2]
+
+    assert tenant_cache("public") is default_cache()
+    assert tenant_cache("acme") is tenant_cache("acme") is not tenant_cache("beta")
+
+
+def test_migrations_form_one_chain():
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(tenancy.alembic_config("acme"))
+    assert script.get_bases() == ["0001"] and len(script.get_heads()) == 1
+    chain = [r.revision for r in script.walk_revisions()]  # head -> base, each revision once
+    assert chain.index("20251019_01") < chain.index("20251003_01") < chain.index("20240929_01")
+
+
+def test_tenant_tables_are_partitioned_like_public():
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateTable
+
+    meta = tenancy.tenant_metadata()
+    assert "tenants" not in meta.tables and {"users", "posts", "rota_slots", "preferences"} <= set(meta.tables)
+    ddl = str(CreateTable(meta.tables["rota_slots"]).compile(dialect=postgresql.dialect()))
+    assert "id SERIAL" in ddl and "PRIMARY KEY (id, start)" in ddl and 'PARTITION BY RANGE ("start")' in ddl
+    assert "REFERENCES users (id)" in ddl
+    assert {ix.name for ix in meta.tables["rota_slots"].indexes} == {"ix_rota_slots_user_start",
+                                                                   "ix_rota_slots_post_start"}
+
+
+def _migrated_columns() -> dict:
+    """{table: {column, ...}} that the migration chain's upgrade() steps create (op.create_table / add_column)."""
+    here = os.path.dirname(os.path.dirname(os.path.abspath(tenancy.__file__)))
+    out: dict = {}
+    for path in sorted(glob.glob(os.path.join(here, "migrations", "versions", "*.py"))):
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        upgrade = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "upgrade")
+        for call in ast.walk(upgrade):
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                    and call.func.attr in ("create_table", "add_column")):
+                continue
+            table = call.args[0].value
+            cols = [a.args[0].value for a in call.args[1:]
+                    if isinstance(a, ast.Call) and getattr(a.func, "attr", None) == "Column"]
+            out.setdefault(table, set()).update(cols)
+    return out
+
+
+def test_tenant_tables_match_public():
+    # public = the migration chain plus whatever the models add at startup (create_all)
+    migrated = _migrated_columns()
+    public = (set(migrated) | set(models.Base.metadata.tables)) - {"tenants"}
+    meta = tenancy.tenant_metadata()
+    assert set(meta.tables) == public
+    for table, cols in migrated.items():
+        if table != "tenants":
+            assert cols <= set(meta.tables[table].c.keys()), table
+
+
+@pytest.mark.postgres
+def test_create_provisions_a_schema_at_head(monkeypatch):
+    from alembic.script import ScriptDirectory
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.orm import sessionmaker
+
+    from app import db, models
+    from app.services import partitions
+
+    url = os.environ["TEST_POSTGRES_URL"]
+    engine = create_engine(url)
+    monkeypatch.setenv("DATABASE_URL", url)  # migrations/env.py connects on its own
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(bind=engine))
+    models.Tenant.__table__.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.exec_driver_sql('DROP SCHEMA IF EXISTS "tenant_pgtest" CASCADE')
+    try:
+        tenant = tenancy.create("pgtest", "Provisioning test")
+        assert tenant.schema == "tenant_pgtest"
+        tables = set(inspect(engine).get_table_names(schema="tenant_pgtest"))
+        assert {"users", "posts", "rota_slots", "preferences", "alembic_version"} <= tables
+        assert "tenants" not in tables
+        head = ScriptDirectory.from_config(tenancy.alembic_config("pgtest")).get_current_head()
+        with engine.begin() as conn:
+            assert conn.execute(text('SELECT version_num FROM "tenant_pgtest".alembic_version')).scalar() == head
+            conn.exec_driver_sql('SET LOCAL search_path TO "tenant_pgtest"')
+            assert partitions.is_partitioned(conn, "rota_slots") and partitions.is_partitioned(conn, "audits")
+        tenancy.migrate("pgtest")  # already at head: the upgrade path is a no-op
+    finally:
+        with engine.begin() as conn:
+            conn.exec_driver_sql('DROP SCHEMA IF EXISTS "tenant_pgtest" CASCADE')
+            conn.execute(models.Tenant.__table__.delete().where(models.Tenant.slug == "pgtest"))
+        engine.dispose()